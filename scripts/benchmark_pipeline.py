@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Performance benchmark suite for the ratings pipeline, on synthetic data.
+
+The checked-in data (about a hundred models and under two thousand scores)
+is too small to show how the pipeline scales. This script generates
+synthetic data.json / benchmarks.csv / benchmarks-meta.json inputs, and the
+benchmarks.xlsx workbook they are exported from, at any scale and runs the
+pipeline stages against them:
+- every stage of process_benchmarks.py: read_sheets (open_workbook and the
+  per-sheet parses), write_scores_csv, write_columnar_scores and
+  write_meta_json, writing real files to a temporary directory; the workbook
+  stages are skipped above --excel-max-rows, as writing the workbook is slow
+- load_data and every stage of run_ratings_pipeline, leaderboards and model
+  neighbours included
+
+Stages are measured with StageTimer, so the numbers are the same ones
+--report gives for real runs. For every scale the results table records
+wall time, CPU time, peak RSS, rows and rows per second of each stage (rows
+being what the stage produces: score rows, models or benchmarks), and a
+throughput summary is printed per stage across scales.
+
+Each scale is also checked for agreement between engine variants:
+- legacy: the per-row legacy engine gives the same ratings as the
+  vectorized one (skipped above --legacy-max-rows, as it is slow)
+- incremental: re-rating after perturbing 1% of the scores gives the same
+  ratings as a full run
+- stream: chunked loading (stream_scores.py) gives the same ratings as
+  deduplicate_scores on the full table
+- lite: the standard-library engine (ratings_lite.py) gives the same ratings
+  from the same files
+
+The script exits with status 1 if any check fails.
+
+Usage (from the project root):
+    python scripts/benchmark_pipeline.py --models 1000 10000 100000 --benchmarks 500
+    python scripts/benchmark_pipeline.py --models 2000 --write-dataset /tmp/synthetic
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from build_cache import BuildCache, file_sha256
+from calculate_model_ratings import (
+    StageTimer,
+    TARGET_MODEL_TYPES,
+    calculate_benchmark_category_ratings,
+    create_benchmark_category_mapping,
+    deduplicate_scores,
+    extract_target_models,
+    load_data,
+    normalize_and_rate_benchmarks,
+    run_ratings_pipeline,
+)
+
+CATEGORIES = ['General Intelligence', 'STEM', 'agentic', 'coding', 'reasoning']
+MODELS_PER_COMPANY = 20
+FIRST_DATE = np.datetime64('2023-01-01')
+DATE_SPAN_DAYS = 900
+
+def generate_dataset(n_models: int, n_benchmarks: int, coverage: float = 0.1,
+                     duplicate_ratio: float = 0.05, missing_price_ratio: float = 0.1,
+                     non_target_ratio: float = 0.05, seed: int = 0) -> Tuple[Dict, pd.DataFrame, List[Dict]]:
+    """Synthetic (companies_data, benchmarks_df, benchmarks_meta) in the shape of the real inputs.
+
+    About coverage * n_models * n_benchmarks model-benchmark pairs are scored.
+    duplicate_ratio of the score rows are extra rows for an already scored
+    pair, half dated the same day (exercising same-date tie handling) and
+    half earlier. missing_price_ratio of the models have no pricing, and
+    non_target_ratio have no model type, like the image and video models.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Models, grouped into companies
+    model_ids = np.array([f'model-{i}' for i in range(n_models)])
+    company_of = np.arange(n_models) // MODELS_PER_COMPANY
+    types = rng.choice(TARGET_MODEL_TYPES, size=n_models)
+    untyped = rng.random(n_models) < non_target_ratio
+    input_prices = np.round(rng.lognormal(0.0, 1.5, n_models), 3)
+    output_prices = np.round(input_prices * rng.uniform(2, 8, n_models), 3)
+    unpriced = rng.random(n_models) < missing_price_ratio
+
+    companies = []
+    for company in range(int(company_of[-1]) + 1 if n_models else 0):
+        models = []
+        for i in np.flatnonzero(company_of == company):
+            model = {'id': str(model_ids[i]), 'name': f'Model {i}', 'specs': {}}
+            if not untyped[i]:
+                model['type'] = str(types[i])
+            if not unpriced[i]:
+                model['specs'] = {
+                    'reasoningTokens': bool(types[i] in ('Large Reasoning Model', 'Large Hybrid Model')),
+                    'pricingInputPerM': float(input_prices[i]),
+                    'pricingCachedInputPerM': float(round(input_prices[i] / 10, 4)),
+                    'pricingOutputPerM': float(output_prices[i]),
+                }
+            models.append(model)
+        companies.append({'id': f'company-{company}', 'name': f'Company {company}', 'models': models})
+
+    # Benchmarks, spread over the categories
+    benchmark_ids = np.array([f'bench-{j}' for j in range(n_benchmarks)])
+    benchmarks_meta = [{
+        'benchmark_id': str(benchmark_id),
+        'benchmark_name': f'Benchmark {j}',
+        'benchmark_category': CATEGORIES[j % len(CATEGORIES)],
+        'featured_benchmark': False,
+        'benchmark_description': None,
+        'benchmark_paper': None,
+    } for j, benchmark_id in enumerate(benchmark_ids)]
+
+    # Scored pairs: sample with replacement and keep the distinct ones
+    n_pairs = int(n_models * n_benchmarks * coverage)
+    pairs = np.unique(rng.integers(0, n_models * n_benchmarks, n_pairs, dtype=np.int64))
+    models_idx, benchmarks_idx = pairs // n_benchmarks, pairs % n_benchmarks
+
+    # Scores driven by model skill and benchmark difficulty, so rankings correlate
+    skill = rng.normal(0, 1, n_models)
+    difficulty = rng.normal(0, 1, n_benchmarks)
+    logits = skill[models_idx] - difficulty[benchmarks_idx] + rng.normal(0, 0.5, len(pairs))
+    scores = np.round(100 / (1 + np.exp(-logits)), 1)
+    days = rng.integers(0, DATE_SPAN_DAYS, len(pairs))
+
+    # Extra rows for already scored pairs
+    n_duplicates = int(len(pairs) * duplicate_ratio)
+    dup = rng.integers(0, len(pairs), n_duplicates)
+    same_day = rng.random(n_duplicates) < 0.5
+    dup_days = np.where(same_day, days[dup], np.maximum(days[dup] - rng.integers(1, 90, n_duplicates), 0))
+    dup_scores = np.round(np.clip(scores[dup] + rng.normal(0, 3, n_duplicates), 0, 100), 1)
+
+    rows_model = np.r_[models_idx, models_idx[dup]]
+    rows_benchmark = np.r_[benchmarks_idx, benchmarks_idx[dup]]
+    order = rng.permutation(len(rows_model))
+
+    benchmarks_df = pd.DataFrame({
+        'model_id': model_ids[rows_model][order],
+        'company_id': np.char.add('company-', company_of[rows_model][order].astype(str)),
+        'benchmark_id': benchmark_ids[rows_benchmark][order],
+        'score': np.r_[scores, dup_scores][order],
+        'date': (FIRST_DATE + np.r_[days, dup_days][order]).astype(str),
+        'notes': np.nan,
+        'source_name': 'Synthetic harness run',
+        'source': 'https://example.com/synthetic',
+    })
+
+    return {'companies': companies}, benchmarks_df, benchmarks_meta
+
+def write_dataset(root: str, companies_data: Dict, benchmarks_df: pd.DataFrame,
+                  benchmarks_meta: List[Dict]) -> Dict[str, str]:
+    """Write the inputs under root in the project layout; returns their paths."""
+    paths = {
+        'data_file': os.path.join(root, 'data', 'data.json'),
+        'scores_file': os.path.join(root, 'public', 'data', 'benchmarks.csv'),
+        'meta_file': os.path.join(root, 'public', 'data', 'benchmarks-meta.json'),
+    }
+    for path in paths.values():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(paths['data_file'], 'w', encoding='utf-8') as f:
+        json.dump(companies_data, f, ensure_ascii=False, indent=2)
+    benchmarks_df.to_csv(paths['scores_file'], index=False)
+    with open(paths['meta_file'], 'w', encoding='utf-8') as f:
+        json.dump(benchmarks_meta, f, ensure_ascii=False, indent=2)
+    return paths
+
+def write_workbook(path: str, benchmarks_df: pd.DataFrame, benchmarks_meta: List[Dict]):
+    """Write the scores and meta as the two sheets process_benchmarks.py reads."""
+    from process_benchmarks import SHEET_META, SHEET_SCORES
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with pd.ExcelWriter(path) as writer:
+        benchmarks_df.to_excel(writer, sheet_name=SHEET_SCORES, index=False)
+        pd.DataFrame(benchmarks_meta).to_excel(writer, sheet_name=SHEET_META, index=False)
+
+def _ratings(deduplicated_df: pd.DataFrame, models: Dict, benchmark_categories: Dict,
+             engine: str = 'vectorized') -> Tuple[pd.DataFrame, Dict]:
+    rated_df, _ = normalize_and_rate_benchmarks(deduplicated_df, engine=engine)
+    return rated_df, calculate_benchmark_category_ratings(rated_df, models, benchmark_categories, engine=engine)
+
+def check_engines(benchmarks_df: pd.DataFrame, companies_data: Dict, benchmarks_meta: List[Dict],
+                  scores_file: str, work_dir: str, legacy_max_rows: int, seed: int = 0) -> Dict[str, Optional[bool]]:
+    """Compare engine variants against the vectorized engine; None means skipped."""
+    from incremental_ratings import rate_incrementally
+    from ratings_lite import category_ratings, latest_scores, load_scores, rate_scores
+    from stream_scores import load_latest_scores
+
+    models = extract_target_models(companies_data)
+    benchmark_categories = create_benchmark_category_mapping(benchmarks_meta)
+    deduplicated = deduplicate_scores(benchmarks_df, models)
+    rated_df, expected = _ratings(deduplicated, models, benchmark_categories)
+    results: Dict[str, Optional[bool]] = {}
+
+    # Legacy per-row engine
+    if len(deduplicated) <= legacy_max_rows:
+        legacy_rated, legacy_ratings = _ratings(deduplicated, models, benchmark_categories, engine='legacy')
+        results['legacy'] = (legacy_ratings == expected and legacy_rated['rating_1_to_5'].tolist()
+                             == rated_df['rating_1_to_5'].tolist())
+    else:
+        results['legacy'] = None
+
+    # Incremental re-rating after perturbing 1% of the scores
+    state_file = os.path.join(work_dir, 'incremental-state.pkl')
+    rate_incrementally(deduplicated, models, benchmark_categories, state_file=state_file)
+    rng = np.random.default_rng(seed)
+    perturbed = deduplicated.copy()
+    changed = rng.random(len(perturbed)) < 0.01
+    perturbed.loc[changed, 'score'] = np.round(rng.uniform(0, 100, int(changed.sum())), 1)
+    _, incremental = rate_incrementally(perturbed, models, benchmark_categories, state_file=state_file)
+    results['incremental'] = incremental == _ratings(perturbed, models, benchmark_categories)[1]
+
+    # Chunked loading, with several chunks per file
+    streamed = load_latest_scores(scores_file, model_ids=models.keys(),
+                                  chunk_rows=max(1000, len(benchmarks_df) // 7))
+    results['stream'] = _ratings(streamed, models, benchmark_categories)[1] == expected
+
+    # Standard-library engine on the same file
+    lite_rated = rate_scores(latest_scores(load_scores(scores_file), models))
+    results['lite'] = category_ratings(lite_rated, models, benchmark_categories) == expected
+
+    return results
+
+def run_scale(n_models: int, n_benchmarks: int, coverage: float, duplicate_ratio: float,
+              missing_price_ratio: float, legacy_max_rows: int, excel_max_rows: int, check: bool = True,
+              seed: int = 0) -> Tuple[List[Dict], Dict[str, Optional[bool]]]:
+    """Generate one dataset, time every stage on it and check engine parity."""
+    from process_benchmarks import export_sheets, read_sheets
+
+    companies_data, benchmarks_df, benchmarks_meta = generate_dataset(
+        n_models, n_benchmarks, coverage=coverage, duplicate_ratio=duplicate_ratio,
+        missing_price_ratio=missing_price_ratio, seed=seed)
+
+    with tempfile.TemporaryDirectory(prefix='ratings-benchmark-') as root:
+        paths = write_dataset(root, companies_data, benchmarks_df, benchmarks_meta)
+        public_dir = os.path.dirname(paths['scores_file'])
+        xlsx_file = os.path.join(root, 'data', 'benchmarks.xlsx')
+        with_excel = len(benchmarks_df) <= excel_max_rows
+        if with_excel:
+            write_workbook(xlsx_file, benchmarks_df, benchmarks_meta)
+
+        # process_benchmarks.py writes into an empty directory, so every write is a real one
+        export_dir = os.path.join(root, 'export')
+        os.makedirs(export_dir)
+        timer = StageTimer()
+
+        # The pipeline prints progress and summaries; keep the suite's output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            if with_excel:
+                with timer.stage('read_sheets') as stage:
+                    df_scores, df_meta = read_sheets(BuildCache(os.path.join(root, 'cache')),
+                                                     file_sha256(xlsx_file), timer, xlsx_file=xlsx_file)
+                    stage['rows'] = len(df_scores)
+            else:
+                df_scores, df_meta = benchmarks_df, pd.DataFrame(benchmarks_meta)
+            export_sheets(df_scores, df_meta, timer,
+                          csv_out=os.path.join(export_dir, 'benchmarks.csv'),
+                          json_out=os.path.join(export_dir, 'benchmarks-meta.json'),
+                          bin_out=os.path.join(export_dir, 'benchmarks.bin'))
+            with timer.stage('load_data') as stage:
+                companies_data, benchmarks_df, benchmarks_meta = load_data(**paths)
+                stage['rows'] = len(benchmarks_df)
+            run_ratings_pipeline(companies_data, benchmarks_df, benchmarks_meta,
+                                 data_file=paths['data_file'],
+                                 ratings_csv=os.path.join(public_dir, 'model_ratings.csv'),
+                                 timer=timer, leaderboard_dir=os.path.join(public_dir, 'leaderboards'),
+                                 neighbours_file=os.path.join(public_dir, 'model-neighbours.json'))
+
+            checks = (check_engines(benchmarks_df, companies_data, benchmarks_meta, paths['scores_file'],
+                                    root, legacy_max_rows, seed=seed) if check else {})
+
+    results = []
+    for record in timer.stages:
+        results.append({
+            'models': n_models,
+            'benchmarks': n_benchmarks,
+            'score_rows': len(benchmarks_df),
+            'stage': record['name'],
+            'wall_s': record['wall_s'],
+            'cpu_s': record['cpu_s'],
+            'peak_rss_mb': record['peak_rss_mb'],
+            'rows': record['rows'],
+            'rows_per_s': (record['rows'] / record['wall_s']
+                           if record['rows'] is not None and record['wall_s'] > 0 else None),
+        })
+    return results, checks
+
+def print_throughput(results: List[Dict]):
+    """Print rows per second of every stage across the scales run."""
+    scales = sorted({(row['models'], row['score_rows']) for row in results})
+    stages = list(dict.fromkeys(row['stage'] for row in results))
+    by_key = {(row['models'], row['stage']): row for row in results}
+    width = max(len(stage) for stage in stages)
+
+    print("\nThroughput (rows/s):")
+    print(f"  {'models':<{width}}" + ''.join(f"{models:>14,}" for models, _ in scales))
+    print(f"  {'score rows':<{width}}" + ''.join(f"{rows:>14,}" for _, rows in scales))
+    for stage in stages:
+        cells = []
+        for models, _ in scales:
+            rate = by_key.get((models, stage), {}).get('rows_per_s')
+            cells.append(f"{rate:>14,.0f}" if rate is not None else f"{'':>14}")
+        print(f"  {stage:<{width}}" + ''.join(cells))
+
+def main(argv: Optional[List[str]] = None):
+    """Run the benchmark suite over the requested scales."""
+    parser = argparse.ArgumentParser(description="Benchmark the ratings pipeline on synthetic data.")
+    parser.add_argument('--models', nargs='+', type=int, default=[1000, 3000, 10000],
+                        help="Model counts to benchmark (default: %(default)s)")
+    parser.add_argument('--benchmarks', type=int, default=200, help="Number of benchmarks (default: %(default)s)")
+    parser.add_argument('--coverage', type=float, default=0.1,
+                        help="Share of model-benchmark pairs with a score (default: %(default)s)")
+    parser.add_argument('--duplicate-ratio', type=float, default=0.05,
+                        help="Extra score rows for already scored pairs, as a share (default: %(default)s)")
+    parser.add_argument('--missing-price-ratio', type=float, default=0.1,
+                        help="Share of models without pricing (default: %(default)s)")
+    parser.add_argument('--legacy-max-rows', type=int, default=20000,
+                        help="Skip the legacy engine check above this many scores (default: %(default)s)")
+    parser.add_argument('--excel-max-rows', type=int, default=200000,
+                        help="Skip the workbook stages above this many scores (default: %(default)s)")
+    parser.add_argument('--no-check', action='store_true', help="Skip the engine parity checks")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: %(default)s)")
+    parser.add_argument('--output', default='benchmark-results.csv',
+                        help="Per-stage results table (default: %(default)s)")
+    parser.add_argument('--write-dataset', metavar='DIR',
+                        help="Only write a synthetic dataset for the first --models value to DIR")
+    args = parser.parse_args(argv)
+
+    if args.write_dataset:
+        dataset = generate_dataset(args.models[0], args.benchmarks, coverage=args.coverage,
+                                   duplicate_ratio=args.duplicate_ratio,
+                                   missing_price_ratio=args.missing_price_ratio, seed=args.seed)
+        paths = write_dataset(args.write_dataset, *dataset)
+        print(f"Synthetic dataset with {len(dataset[1])} score rows written to: " + ', '.join(paths.values()))
+        return
+
+    results = []
+    failed = []
+    for n_models in args.models:
+        print(f"Benchmarking {n_models:,} models x {args.benchmarks:,} benchmarks...")
+        scale_results, checks = run_scale(n_models, args.benchmarks, args.coverage, args.duplicate_ratio,
+                                          args.missing_price_ratio, args.legacy_max_rows, args.excel_max_rows,
+                                          check=not args.no_check, seed=args.seed)
+        results.extend(scale_results)
+        total = sum(row['wall_s'] for row in scale_results)
+        print(f"  {scale_results[0]['score_rows']:,} score rows in {total:.2f} s; checks: "
+              + (', '.join(f"{name} {'skipped' if ok is None else 'ok' if ok else 'FAILED'}"
+                           for name, ok in checks.items()) or 'skipped'))
+        failed += [f"{name} at {n_models} models" for name, ok in checks.items() if ok is False]
+
+    with open(args.output, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+
+    print_throughput(results)
+    print(f"\nResults written to {args.output}")
+
+    if failed:
+        print("Engine parity checks failed: " + ', '.join(failed))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+Content-hash build cache for the benchmark processing pipeline.
+
+The cache lets process_benchmarks.py skip work when nothing has changed:
+- Inputs are keyed on content hashes of data/benchmarks.xlsx, the non-ratings
+  portion of data/data.json and the pipeline scripts themselves
+- Input hashes are memoised on (size, mtime), so an untouched workbook is
+  not even re-read to be hashed
+- Parsed workbook sheets are pickled so an unchanged workbook is never
+  re-parsed with openpyxl
+- A manifest records the hash of every output written, so a no-op rebuild
+  only needs to hash the inputs and compare
+
+Outputs are written through write_if_changed(), which leaves files untouched
+when their bytes would not change (keeping mtimes and CDN caches stable) and
+otherwise replaces them atomically. Cached pickles go the same way, so an
+interrupted write never leaves a truncated one behind. A pickle that still
+cannot be loaded (written by other code, or naming classes that have since
+moved) counts as a cache miss and is rebuilt.
+
+This module only uses the standard library so the no-op check stays fast.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import pickle
+import stat
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Union
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Every module process_benchmarks.py and run_ratings_pipeline can import; the
+# stand-alone tools (model_query, ratings_history, ratings_sweep,
+# benchmark_pipeline) are left out so editing them keeps the cache. Add new
+# pipeline modules here.
+PIPELINE_MODULES = [
+    'build_cache.py',
+    'calculate_model_ratings.py',
+    'data_shards.py',
+    'export_scores.py',
+    'incremental_ratings.py',
+    'leaderboards.py',
+    'model_similarity.py',
+    'pairwise_ratings.py',
+    'pareto_frontier.py',
+    'pricing_profiles.py',
+    'process_benchmarks.py',
+    'rating_uncertainty.py',
+    'ratings_lite.py',
+    'score_completion.py',
+    'stream_scores.py',
+    'validate_scores.py',
+]
+
+# What pickle.load raises for a truncated, corrupt or outdated pickle (classes
+# or modules it names that are gone, a protocol this Python does not know)
+PICKLE_LOAD_ERRORS = (FileNotFoundError, pickle.UnpicklingError, EOFError, AttributeError,
+                      ImportError, IndexError, TypeError, ValueError)
+
+def file_sha256(path: str) -> str:
+    """Return the hex SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def data_json_inputs_hash(data: Dict) -> str:
+    """Hash data.json with every model's ratings removed.
+
+    Ratings are written back into data.json by the pipeline, so they are an
+    output rather than an input and must not invalidate the cache.
+    """
+    stripped = {**data, 'companies': []}
+    for company in data.get('companies', []):
+        company = dict(company)
+        if 'models' in company:
+            company['models'] = [{k: v for k, v in model.items() if k != 'ratings'}
+                                 for model in company['models']]
+        stripped['companies'].append(company)
+
+    encoded = json.dumps(stripped, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+def pipeline_code_hash() -> str:
+    """Hash the PIPELINE_MODULES so code changes invalidate cached outputs."""
+    digest = hashlib.sha256()
+    for name in PIPELINE_MODULES:
+        digest.update(name.encode('utf-8'))
+        digest.update(file_sha256(os.path.join(SCRIPTS_DIR, name)).encode('ascii'))
+    return digest.hexdigest()
+
+def write_if_changed(path: str, content: Union[str, bytes]) -> bool:
+    """Write content to path unless the file already holds exactly these bytes.
+
+    The write goes to a temporary file in the same directory which is then
+    renamed over path, so readers never see a partially written file.
+    Returns True if the file was written.
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == content:
+                return False
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                    prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+class BuildCache:
+    """Manifest of the last successful build plus the parsed-sheet cache."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.manifest_file = os.path.join(cache_dir, 'manifest.json')
+        self.file_hashes_file = os.path.join(cache_dir, 'file-hashes.json')
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def file_hash(self, path: str) -> str:
+        """SHA-256 of a file, reusing the recorded hash while its size and mtime are unchanged.
+
+        As in git's racy-timestamp rule, a hash is only trusted if the file's
+        mtime is older than the moment it was hashed, so an edit landing in the
+        same clock tick as the hash is never missed.
+        """
+        key = os.path.abspath(path)
+        info = os.stat(path)
+        try:
+            with open(self.file_hashes_file, 'r', encoding='utf-8') as f:
+                memo = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            memo = {}
+
+        entry = memo.get(key)
+        if (entry and entry['size'] == info.st_size and entry['mtime_ns'] == info.st_mtime_ns
+                and info.st_mtime_ns < entry['hashed_ns']):
+            return entry['sha256']
+
+        hashed_ns = time.time_ns()
+        digest = file_sha256(path)
+        memo[key] = {'size': info.st_size, 'mtime_ns': info.st_mtime_ns,
+                     'hashed_ns': hashed_ns, 'sha256': digest}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_if_changed(self.file_hashes_file, json.dumps(memo, indent=2, sort_keys=True))
+        return digest
+
+    def is_fresh(self, inputs_key: str, output_files: List[str]) -> bool:
+        """True if the last build used the same inputs and its outputs are intact."""
+        manifest = self._load_manifest()
+        if manifest.get('inputs_key') != inputs_key:
+            return False
+
+        recorded = manifest.get('outputs', {})
+        for path in set(output_files) | set(recorded):
+            if path not in recorded or not os.path.exists(path):
+                return False
+            if file_sha256(path) != recorded[path]:
+                return False
+        return True
+
+    def record(self, inputs_key: str, output_files: List[str]):
+        """Store the inputs key and output hashes of a successful build."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        manifest = {
+            'inputs_key': inputs_key,
+            'outputs': {path: file_sha256(path) for path in output_files if os.path.exists(path)},
+        }
+        write_if_changed(self.manifest_file, json.dumps(manifest, indent=2, sort_keys=True))
+
+    def _sheets_file(self, source_hash: str) -> str:
+        return os.path.join(self.cache_dir, f'sheets-{source_hash}.pkl')
+
+    def load_sheets(self, source_hash: str) -> Optional[Any]:
+        """Return the parsed sheets cached for this workbook hash, if any."""
+        try:
+            with open(self._sheets_file(source_hash), 'rb') as f:
+                return pickle.load(f)
+        except PICKLE_LOAD_ERRORS:
+            return None
+
+    def store_sheets(self, source_hash: str, sheets: Any):
+        """Cache parsed sheets for this workbook hash, replacing older entries."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        sheets_file = self._sheets_file(source_hash)
+        write_if_changed(sheets_file, pickle.dumps(sheets, protocol=pickle.HIGHEST_PROTOCOL))
+        for stale in glob.glob(os.path.join(self.cache_dir, 'sheets-*.pkl')):
+            if stale != sheets_file:
+                os.remove(stale)
@@ -12,20 +12,48 @@ Benchmark methodology:
 - Per-benchmark min-max normalization with half-up rounding
 - Averages ratings within categories without re-scaling
 
+The benchmark rating steps run on a vectorized engine by default; pass
+--engine legacy to use the original per-row loops for comparison. Pass
+--uncertainty to also report bootstrap confidence intervals for each
+category rating, or --rating-mode pairwise to rate categories by
+head-to-head wins instead of averaged min-max ratings (see
+pairwise_ratings.py). Pass --complete to predict missing benchmark scores
+and add category ratings over the completed score table (see
+score_completion.py).
+
 Pricing methodology:
 - Combines input/output pricing (70%/30% weighting)
 - Percentile-based ratings to handle outliers
 - Rating 5 = Most affordable, Rating 1 = Most expensive
+- Per usage profile (cache hits, input/output mix, reasoning tokens), see
+  pricing_profiles.py
+
+pandas and NumPy are imported inside the functions that use them, so the
+lite engine (--engine lite, see ratings_lite.py) runs without importing
+either.
 """
 
+from __future__ import annotations
+
+import argparse
+import io
 import json
 import csv
-import pandas as pd
 from collections import defaultdict
 from typing import Dict, List, Optional, Tuple
 from decimal import Decimal, ROUND_HALF_UP
 import sys
 import os
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from build_cache import write_if_changed
+from pricing_profiles import calculate_profile_pricing_ratings, profile_field_name
 
 # Target model types to include in analysis
 TARGET_MODEL_TYPES = [
@@ -35,19 +63,181 @@ TARGET_MODEL_TYPES = [
     "Large Multimodal Model"
 ]
 
-def load_data() -> Tuple[Dict, pd.DataFrame, Dict]:
-    """Load all required data files."""
+# Rating engines: 'vectorized' uses whole-column NumPy operations,
+# 'legacy' keeps the original per-row loops for comparison
+RATING_ENGINES = ['vectorized', 'legacy']
+DEFAULT_RATING_ENGINE = 'vectorized'
+
+# Standard-library engine of ratings_lite.py, selectable on the command line only
+LITE_ENGINE = 'lite'
+
+# Category rating modes: 'minmax' averages per-benchmark min-max ratings,
+# 'pairwise' fits Bradley-Terry strengths to head-to-head wins
+RATING_MODES = ['minmax', 'pairwise']
+DEFAULT_RATING_MODE = 'minmax'
+
+# Pricing rating parameters: composite cost weighting, log offset and curve exponent
+PRICING_INPUT_WEIGHT = 0.7
+PRICING_OUTPUT_WEIGHT = 0.3
+PRICING_LOG_OFFSET = 0.01
+PRICING_CURVE_EXPONENT = 0.8
+
+# Suffixes of the optional uncertainty fields written next to each category
+# rating (see rating_uncertainty.py)
+INTERVAL_FIELD_SUFFIXES = ('_ci_low', '_ci_high', '_n')
+
+# Suffixes of the optional completed-table fields (see score_completion.py)
+COMPLETION_FIELD_SUFFIXES = ('_completed', '_predicted_n')
+
+# Suffixes of the price-performance frontier fields (see pareto_frontier.py)
+FRONTIER_FIELD_SUFFIXES = ('_frontier', '_frontier_gap')
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class StageTimer:
+    """Record wall time, CPU time, peak memory and row counts of each named pipeline stage.
+    
+    Stages may be nested; nested stages are indented in the report and left
+    out of the totals. With profile=True each top-level stage also runs under
+    its own cProfile profiler so the slowest one can be dumped afterwards
+    (its timings then include the profiler's overhead).
+    """
+    
+    def __init__(self, profile: bool = False):
+        self.stages: List[Dict] = []
+        self.profile = profile
+        self._profilers: Dict[int, object] = {}
+        self._depth = 0
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Measure the enclosed block as one stage.
+        
+        Yields the stage's record; set record['rows'] to report how many rows
+        the stage produced.
+        """
+        # Reserve the slot now so stages are listed in the order they started
+        record = {'name': name, 'depth': self._depth, 'rows': None}
+        index = len(self.stages)
+        self.stages.append(record)
+        profiler = None
+        if self.profile and self._depth == 0:
+            import cProfile
+            profiler = cProfile.Profile()
+        
+        rss_before = peak_rss_mb()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        self._depth += 1
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            self._depth -= 1
+            record['wall_s'] = time.perf_counter() - wall_start
+            record['cpu_s'] = time.process_time() - cpu_start
+            record['peak_rss_mb'] = peak_rss_mb()
+            record['rss_growth_mb'] = (None if rss_before is None
+                                       else record['peak_rss_mb'] - rss_before)
+            if profiler is not None:
+                self._profilers[index] = profiler
+    
+    def totals(self) -> Dict[str, float]:
+        """Wall and CPU time summed over top-level stages."""
+        top_level = [record for record in self.stages if record['depth'] == 0]
+        return {'wall_s': sum(record['wall_s'] for record in top_level),
+                'cpu_s': sum(record['cpu_s'] for record in top_level)}
+    
+    def report(self):
+        """Print a table of stage timings."""
+        width = max([len(record['name']) + 2 * record['depth'] for record in self.stages] + [5])
+        print("\nStage timings:")
+        print(f"  {'':<{width}}  {'wall':>9}     {'cpu':>9}     {'peak RSS':>9}     {'rows':>9}")
+        for record in self.stages:
+            name = '  ' * record['depth'] + record['name']
+            rss = f"{record['peak_rss_mb']:9.1f} MB" if record['peak_rss_mb'] is not None else f"{'':>12}"
+            rows = f"{record['rows']:>9}" if record['rows'] is not None else ''
+            print(f"  {name:<{width}}  {record['wall_s'] * 1000:9.1f} ms  {record['cpu_s'] * 1000:9.1f} ms  "
+                  f"{rss}  {rows}".rstrip())
+        totals = self.totals()
+        print(f"  {'Total':<{width}}  {totals['wall_s'] * 1000:9.1f} ms  {totals['cpu_s'] * 1000:9.1f} ms")
+    
+    def write_report(self, report_file: str):
+        """Write the stage measurements as a JSON report."""
+        report = {
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'argv': sys.argv,
+            'totals': {**self.totals(), 'peak_rss_mb': peak_rss_mb()},
+            'stages': self.stages,
+        }
+        os.makedirs(os.path.dirname(report_file) or '.', exist_ok=True)
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Stage report written to {report_file}")
+    
+    def dump_slowest_profile(self, profile_file: str) -> Optional[str]:
+        """Dump the cProfile stats of the slowest profiled stage; returns its name."""
+        if not self._profilers:
+            return None
+        index = max(self._profilers, key=lambda i: self.stages[i]['wall_s'])
+        os.makedirs(os.path.dirname(profile_file) or '.', exist_ok=True)
+        self._profilers[index].dump_stats(profile_file)
+        name = self.stages[index]['name']
+        print(f"Profile of slowest stage '{name}' written to {profile_file} "
+              f"(view with: python -m pstats {profile_file})")
+        return name
+
+def load_data(data_file: str = 'data/data.json',
+              scores_file: str = 'public/data/benchmarks.csv',
+              meta_file: str = 'public/data/benchmarks-meta.json',
+              chunk_rows: Optional[int] = None,
+              score_dtype: str = 'float64',
+              chunk_reports: Optional[List[Dict]] = None) -> Tuple[Dict, pd.DataFrame, Dict]:
+    """Load all required data files.
+    
+    If chunk_rows is given, the scores are streamed in chunks of that many
+    rows and only the latest score per model-benchmark pair is kept (see
+    stream_scores.py), bounding memory for very large score tables. The
+    superseded rows are gone afterwards, so with chunk_reports each chunk is
+    validated as it is read and its report appended (pass them on to
+    run_ratings_pipeline).
+    """
     # Load models data
-    with open('data/data.json', 'r') as f:
+    with open(data_file, 'r') as f:
         companies_data = json.load(f)
     
-    # Load benchmark scores
-    benchmarks_df = pd.read_csv('public/data/benchmarks.csv')
-    
     # Load benchmark metadata
-    with open('public/data/benchmarks-meta.json', 'r') as f:
+    with open(meta_file, 'r') as f:
         benchmarks_meta = json.load(f)
     
+    # Load benchmark scores
+    if chunk_rows:
+        from stream_scores import LEADERBOARD_COLUMNS, load_latest_scores
+        
+        on_chunk = None
+        if chunk_reports is not None:
+            from validate_scores import validate_scores
+            
+            def on_chunk(chunk):
+                chunk_reports.append(validate_scores(chunk, companies_data, benchmarks_meta, fail_on='never',
+                                                     first_row=int(chunk.index[0]) if len(chunk) else 0))
+        
+        benchmarks_df = load_latest_scores(scores_file, extra_columns=LEADERBOARD_COLUMNS,
+                                           chunk_rows=chunk_rows, score_dtype=score_dtype, on_chunk=on_chunk,
+                                           rank_models=extract_target_models(companies_data))
+    else:
+        import pandas as pd
+        
+        benchmarks_df = pd.read_csv(scores_file)
+    
     return companies_data, benchmarks_df, benchmarks_meta
 
 def extract_target_models(companies_data: Dict) -> Dict[str, Dict]:
@@ -65,6 +255,7 @@ def extract_target_models(companies_data: Dict) -> Dict[str, Dict]:
                 # Extract pricing data if available
                 input_price = specs.get('pricingInputPerM')
                 output_price = specs.get('pricingOutputPerM')
+                cached_input_price = specs.get('pricingCachedInputPerM')
                 
                 models[model['id']] = {
                     'id': model['id'],
@@ -73,10 +264,16 @@ def extract_target_models(companies_data: Dict) -> Dict[str, Dict]:
                     'company': company['name'],
                     'input_price': float(input_price) if input_price is not None else None,
                     'output_price': float(output_price) if output_price is not None else None,
+                    'cached_input_price': float(cached_input_price) if cached_input_price is not None else None,
+                    'reasoning_tokens': bool(specs.get('reasoningTokens')),
                 }
     
     return models
 
+def rating_field_name(category: str) -> str:
+    """Map a benchmark category to its field name in a model's ratings object."""
+    return category.lower().replace(' ', '_').replace('general_intelligence', 'intelligence')
+
 def create_benchmark_category_mapping(benchmarks_meta: List[Dict]) -> Dict[str, str]:
     """Create mapping from benchmark_id to category."""
     mapping = {}
@@ -90,6 +287,8 @@ def create_benchmark_category_mapping(benchmarks_meta: List[Dict]) -> Dict[str,
 
 def deduplicate_scores(benchmarks_df: pd.DataFrame, models: Dict) -> pd.DataFrame:
     """Keep only the latest score per model-benchmark pair."""
+    import pandas as pd
+    
     # Filter for target models only
     target_model_ids = set(models.keys())
     filtered_df = benchmarks_df[benchmarks_df['model_id'].isin(target_model_ids)].copy()
@@ -97,13 +296,142 @@ def deduplicate_scores(benchmarks_df: pd.DataFrame, models: Dict) -> pd.DataFram
     # Convert date column to datetime
     filtered_df['date'] = pd.to_datetime(filtered_df['date'])
     
-    # Sort by date and keep last (latest) entry for each model-benchmark pair
+    # Sort by date and keep last (latest) entry for each model-benchmark pair;
+    # same-date ties go wherever NumPy's introsort leaves them, which
+    # ratings_lite.introsort_order reproduces
     deduplicated = filtered_df.sort_values('date').groupby(['model_id', 'benchmark_id']).tail(1)
     
     return deduplicated
 
-def normalize_and_rate_benchmarks(df: pd.DataFrame) -> pd.DataFrame:
+def normalize_and_rate_benchmarks(df: pd.DataFrame,
+                                  engine: str = DEFAULT_RATING_ENGINE) -> Tuple[pd.DataFrame, Dict]:
     """Normalize each benchmark to 0-1 scale and convert to 1-5 ratings."""
+    if engine == 'legacy':
+        return _normalize_and_rate_legacy(df)
+    if engine != 'vectorized':
+        raise ValueError(f"Unknown rating engine: {engine}")
+    return _normalize_and_rate_vectorized(df)
+
+def coerce_scores(scores: pd.Series) -> np.ndarray:
+    """Convert a score column to float64, with NaN for values float() rejects."""
+    import numpy as np
+    import pandas as pd
+    
+    if pd.api.types.is_numeric_dtype(scores):
+        return scores.to_numpy(dtype='float64', na_value=np.nan)
+    
+    # Parse each distinct value once, mirroring the float() call of the legacy loop
+    codes, uniques = pd.factorize(scores)
+    parsed = np.empty(len(uniques) + 1, dtype='float64')
+    parsed[-1] = np.nan  # factorize marks missing values with code -1
+    for i, value in enumerate(uniques):
+        try:
+            parsed[i] = float(value)
+        except (ValueError, TypeError):
+            parsed[i] = np.nan
+    return parsed[codes]
+
+def round_half_up(values: np.ndarray) -> np.ndarray:
+    """Round positive floats half-up, matching Decimal(str(x)).quantize(ROUND_HALF_UP)."""
+    import numpy as np
+    
+    # x - floor(x) is exact, so the 0.5 comparison never suffers from the
+    # x + 0.5 carry that makes np.floor(x + 0.5) disagree with Decimal
+    whole = np.floor(values)
+    return (whole + (values - whole >= 0.5)).astype('int64')
+
+def _normalize_and_rate_vectorized(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+    """Whole-column implementation producing the same ratings as the legacy loop.
+    
+    Non-finite scores (NaN, inf) are treated as invalid and left unrated,
+    where the legacy loop would abort on them.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    df = df.copy()
+    
+    scores = coerce_scores(df['score'])
+    benchmark_ids = df['benchmark_id']
+    valid = np.isfinite(scores) & benchmark_ids.notna().to_numpy()
+    
+    # Per-benchmark min/max/count over valid scores only
+    valid_scores = pd.Series(np.where(valid, scores, np.nan), index=df.index)
+    grouped = valid_scores.groupby(benchmark_ids)
+    min_score = grouped.transform('min').to_numpy()
+    max_score = grouped.transform('max').to_numpy()
+    counts = grouped.transform('count').to_numpy()
+    
+    # Degenerate cases (single score or no spread) get a neutral rating of 3
+    degenerate = valid & ((counts == 1) | (max_score == min_score))
+    regular = valid & ~degenerate
+    
+    normalized = np.zeros(len(df), dtype='float64')
+    ratings = np.zeros(len(df), dtype='int64')
+    
+    # Min-max normalization: (score - min) / (max - min)
+    normalized[regular] = ((scores[regular] - min_score[regular]) /
+                           (max_score[regular] - min_score[regular]))
+    ratings[regular] = np.clip(round_half_up(1 + 4 * normalized[regular]), 1, 5)
+    
+    normalized[degenerate] = 0.5
+    ratings[degenerate] = 3
+    
+    df['normalized_score'] = normalized
+    df['rating_1_to_5'] = ratings
+    
+    degenerate_by_benchmark = (pd.Series(degenerate[valid])
+                               .groupby(benchmark_ids.to_numpy()[valid], sort=False)
+                               .any())
+    benchmark_stats = {benchmark_id: {'degenerate': bool(is_degenerate)}
+                       for benchmark_id, is_degenerate in degenerate_by_benchmark.items()}
+    
+    return df, benchmark_stats
+
+def rate_benchmark_blocks(scores: np.ndarray, block_starts: np.ndarray) -> np.ndarray:
+    """1-5 ratings for scores laid out in contiguous per-benchmark blocks.
+    
+    block_starts holds the first index of each benchmark's block. NaN scores
+    are unrated (0). Uses the same arithmetic as the vectorized engine.
+    """
+    import numpy as np
+    
+    ratings = np.zeros(len(scores), dtype='int64')
+    if len(scores) == 0:
+        return ratings
+    
+    valid = np.isfinite(scores)
+    masked = np.where(valid, scores, np.nan)
+    sizes = np.diff(np.r_[block_starts, len(scores)])
+    min_score = np.repeat(np.fmin.reduceat(masked, block_starts), sizes)
+    max_score = np.repeat(np.fmax.reduceat(masked, block_starts), sizes)
+    counts = np.repeat(np.add.reduceat(valid.astype('int64'), block_starts), sizes)
+    
+    degenerate = valid & ((counts == 1) | (max_score == min_score))
+    regular = valid & ~degenerate
+    normalized = (scores[regular] - min_score[regular]) / (max_score[regular] - min_score[regular])
+    ratings[regular] = np.clip(round_half_up(1 + 4 * normalized), 1, 5)
+    ratings[degenerate] = 3
+    return ratings
+
+def category_means(model_codes: np.ndarray, category_codes: np.ndarray, ratings: np.ndarray,
+                   n_models: int, n_categories: int) -> np.ndarray:
+    """Mean rating per model x category (NaN where a model has none), as integer sum / count.
+    
+    Entries with a negative code or a rating of 0 are ignored.
+    """
+    import numpy as np
+    
+    rated = (ratings > 0) & (model_codes >= 0) & (category_codes >= 0)
+    cells = model_codes[rated] * n_categories + category_codes[rated]
+    sums = np.bincount(cells, weights=ratings[rated], minlength=n_models * n_categories)
+    counts = np.bincount(cells, minlength=n_models * n_categories)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    return means.reshape(n_models, n_categories)
+
+def _normalize_and_rate_legacy(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+    """Original per-row implementation, kept for comparison with the vectorized engine."""
     df = df.copy()
     df['normalized_score'] = 0.0
     df['rating_1_to_5'] = 0
@@ -162,8 +490,47 @@ def normalize_and_rate_benchmarks(df: pd.DataFrame) -> pd.DataFrame:
     return df, benchmark_stats
 
 def calculate_benchmark_category_ratings(df: pd.DataFrame, models: Dict, 
-                                       benchmark_categories: Dict) -> Dict[str, Dict[str, Optional[float]]]:
+                                       benchmark_categories: Dict,
+                                       engine: str = DEFAULT_RATING_ENGINE) -> Dict[str, Dict[str, Optional[float]]]:
     """Calculate category ratings by averaging 1-5 ratings within each category."""
+    if engine == 'legacy':
+        return _calculate_category_ratings_legacy(df, models, benchmark_categories)
+    if engine != 'vectorized':
+        raise ValueError(f"Unknown rating engine: {engine}")
+    return _calculate_category_ratings_grouped(df, models, benchmark_categories)
+
+def _calculate_category_ratings_grouped(df: pd.DataFrame, models: Dict,
+                                        benchmark_categories: Dict) -> Dict[str, Dict[str, Optional[float]]]:
+    """Compute every model x category mean in a single grouped pass over the rated scores."""
+    import pandas as pd
+    
+    all_categories = set(benchmark_categories.values())
+    
+    # Attach categories and keep valid ratings of known models only
+    categories = df['benchmark_id'].map(benchmark_categories)
+    mask = (df['model_id'].isin(models.keys()) & categories.notna() &
+            (df['rating_1_to_5'] > 0)).to_numpy()
+    rated = pd.DataFrame({
+        'model_id': df['model_id'].to_numpy()[mask],
+        'category': categories.to_numpy()[mask],
+        'rating': df['rating_1_to_5'].to_numpy()[mask],
+    })
+    
+    # Sum and count separately so the mean is computed exactly as sum / len
+    totals = rated.groupby(['model_id', 'category'], sort=False)['rating'].agg(['sum', 'count'])
+    averages = {key: int(row_sum) / int(row_count)
+                for key, row_sum, row_count in zip(totals.index, totals['sum'], totals['count'])}
+    
+    model_ratings = {}
+    for model_id in models.keys():
+        model_ratings[model_id] = {category: averages.get((model_id, category))
+                                   for category in all_categories}
+    
+    return model_ratings
+
+def _calculate_category_ratings_legacy(df: pd.DataFrame, models: Dict,
+                                       benchmark_categories: Dict) -> Dict[str, Dict[str, Optional[float]]]:
+    """Original per-model iterrows implementation, kept for comparison."""
     model_ratings = {}
     
     # Get all categories
@@ -194,7 +561,11 @@ def calculate_benchmark_category_ratings(df: pd.DataFrame, models: Dict,
     
     return model_ratings
 
-def calculate_pricing_ratings(models: Dict) -> Dict[str, Optional[float]]:
+def calculate_pricing_ratings(models: Dict,
+                              input_weight: float = PRICING_INPUT_WEIGHT,
+                              output_weight: float = PRICING_OUTPUT_WEIGHT,
+                              offset: float = PRICING_LOG_OFFSET,
+                              exponent: float = PRICING_CURVE_EXPONENT) -> Dict[str, Optional[float]]:
     """Calculate pricing cost ratings using logarithmic scaling to handle extreme outliers.
     
     Returns higher ratings (closer to 5) for more expensive models and lower ratings (closer to 1) for cheaper models.
@@ -208,8 +579,8 @@ def calculate_pricing_ratings(models: Dict) -> Dict[str, Optional[float]]:
         output_price = model_data['output_price']
         
         if input_price is not None and output_price is not None:
-            # Weighted composite cost (70% input, 30% output)
-            composite_cost = (0.7 * input_price) + (0.3 * output_price)
+            # Weighted composite cost (70% input, 30% output by default)
+            composite_cost = (input_weight * input_price) + (output_weight * output_price)
             composite_scores[model_id] = composite_cost
     
     if not composite_scores:
@@ -225,8 +596,7 @@ def calculate_pricing_ratings(models: Dict) -> Dict[str, Optional[float]]:
         # This gives more granular ratings in the lower price ranges where most models cluster
         import math
         
-        # Add small offset to avoid log(0) and handle very small prices
-        offset = 0.01
+        # Small offset avoids log(0) and handles very small prices
         log_costs = [math.log(cost + offset) for cost in costs]
         min_log = min(log_costs)
         max_log = max(log_costs)
@@ -247,7 +617,7 @@ def calculate_pricing_ratings(models: Dict) -> Dict[str, Optional[float]]:
             
             # Apply slight curve to spread out the middle range
             # This gives better distribution across the pricing spectrum
-            curved_score = cost_score ** 0.8
+            curved_score = cost_score ** exponent
             
             # Scale to 1-5 range
             rating = 1.0 + (4.0 * curved_score)
@@ -330,12 +700,43 @@ def print_category_distribution(category_name: str, ratings: List[float], indent
     print(f"{indent}  {percentages[0]:<3} {percentages[1]:<3} {percentages[2]:<3} {percentages[3]:<3} {percentages[4]}")
 
 def update_data_json_with_ratings(models: Dict, benchmark_ratings: Dict, pricing_ratings: Dict,
-                                 data_file: str = 'data/data.json'):
-    """Update the main data.json file with calculated ratings."""
+                                 data_file: str = 'data/data.json', data: Optional[Dict] = None,
+                                 rating_intervals: Optional[Dict] = None,
+                                 profile_ratings: Optional[Dict] = None,
+                                 completion: Optional[Dict] = None,
+                                 frontiers: Optional[Dict] = None) -> int:
+    """Update the main data.json file with calculated ratings.
+    
+    Only rating fields whose value changed are touched, and the file is
+    rewritten atomically only if at least one model moved, so unchanged
+    ratings produce no write and no diff. If ``data`` is given it is used
+    (and updated in place) instead of re-reading data_file.
+    
+    If ``rating_intervals`` is given (see rating_uncertainty.py), each
+    category rating also gets <field>_ci_low, <field>_ci_high and <field>_n;
+    otherwise interval fields left by an earlier run are removed.
+    
+    If ``profile_ratings`` is given (see pricing_profiles.py), each model also
+    gets pricing_cost_<profile> for every usage profile; profile fields that
+    are no longer produced are removed.
+    
+    If ``completion`` is given (see score_completion.py), each category
+    rating over the completed score table is added as <field>_completed with
+    <field>_predicted_n; otherwise such fields left by an earlier run are
+    removed.
+    
+    If ``frontiers`` is given (see pareto_frontier.py), each category rating
+    of a model with pricing also gets <field>_frontier (on the
+    price-performance frontier of its model type) and <field>_frontier_gap;
+    frontier fields without a current value are removed.
+    
+    Returns the number of models whose ratings changed.
+    """
     
     # Load the existing data.json
-    with open(data_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    if data is None:
+        with open(data_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
     
     # Get all benchmark categories
     all_categories = set()
@@ -343,11 +744,18 @@ def update_data_json_with_ratings(models: Dict, benchmark_ratings: Dict, pricing
         all_categories.update(ratings.keys())
     
     categories = sorted(list(all_categories))
+    interval_fields = {rating_field_name(category) + suffix
+                       for category in categories for suffix in INTERVAL_FIELD_SUFFIXES}
+    completion_fields = {rating_field_name(category) + suffix
+                         for category in categories for suffix in COMPLETION_FIELD_SUFFIXES}
+    frontier_fields = {rating_field_name(category) + suffix
+                       for category in categories for suffix in FRONTIER_FIELD_SUFFIXES}
     
     print(f"Updating ratings in {data_file}...")
     
     # Update each model with its ratings
     models_updated = 0
+    models_changed = 0
     for company in data['companies']:
         if 'models' not in company:
             continue
@@ -356,35 +764,91 @@ def update_data_json_with_ratings(models: Dict, benchmark_ratings: Dict, pricing
             model_id = model['id']
             
             if model_id in models:
-                # Ensure the model has a ratings object
-                if 'ratings' not in model:
-                    model['ratings'] = {}
+                new_ratings = {}
                 
                 # Add benchmark category ratings
                 for category in categories:
                     rating = benchmark_ratings[model_id].get(category)
                     if rating is not None:
                         # Map category names to shorter field names for consistency
-                        field_name = category.lower().replace(' ', '_').replace('general_intelligence', 'intelligence')
-                        model['ratings'][field_name] = round(rating, 2)
+                        new_ratings[rating_field_name(category)] = round(rating, 2)
+                
+                # Add bootstrap intervals for the category ratings
+                if rating_intervals is not None:
+                    for category, interval in rating_intervals[model_id].items():
+                        field = rating_field_name(category)
+                        if interval['low'] is not None:
+                            new_ratings[f'{field}_ci_low'] = round(interval['low'], 2)
+                            new_ratings[f'{field}_ci_high'] = round(interval['high'], 2)
+                        new_ratings[f'{field}_n'] = interval['n']
+                
+                # Add ratings over the completed score table, flagged by their predicted share
+                if completion is not None:
+                    for category, cell in completion['completed'].get(model_id, {}).items():
+                        field = rating_field_name(category)
+                        new_ratings[f'{field}_completed'] = round(cell['rating'], 2)
+                        new_ratings[f'{field}_predicted_n'] = cell['predicted_n']
+                
+                # Add price-performance frontier membership and distance
+                if frontiers is not None:
+                    for category, annotation in frontiers['annotations'].get(model_id, {}).items():
+                        field = rating_field_name(category)
+                        new_ratings[f'{field}_frontier'] = annotation['frontier']
+                        new_ratings[f'{field}_frontier_gap'] = annotation['gap']
                 
                 # Add pricing cost rating
                 pricing_rating = pricing_ratings.get(model_id)
                 if pricing_rating is not None:
-                    model['ratings']['pricing_cost'] = round(pricing_rating, 2)
+                    new_ratings['pricing_cost'] = round(pricing_rating, 2)
+                
+                # Add usage-profile pricing cost ratings
+                if profile_ratings is not None:
+                    for profile, rating in profile_ratings[model_id].items():
+                        if rating is not None:
+                            new_ratings[profile_field_name(profile)] = round(rating, 2)
+                
+                # Apply only the fields that actually changed
+                ratings = model.get('ratings', {})
+                changed = {field: value for field, value in new_ratings.items()
+                           if field not in ratings or ratings[field] != value}
+                stale = [field for field in ratings
+                         if (field in interval_fields or field in completion_fields
+                             or field in frontier_fields or field.startswith('pricing_cost_'))
+                         and field not in new_ratings]
+                if changed or stale:
+                    model['ratings'] = ratings
+                    ratings.update(changed)
+                    for field in stale:
+                        del ratings[field]
+                    models_changed += 1
                 
                 models_updated += 1
     
+    if models_changed == 0:
+        print(f"Ratings for {models_updated} models unchanged; {data_file} left untouched")
+        return 0
+    
     # Save the updated data.json
-    with open(data_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    write_if_changed(data_file, json.dumps(data, ensure_ascii=False, indent=2))
     
-    print(f"Updated {models_updated} models with ratings in {data_file}")
-    return models_updated
+    print(f"Updated {models_updated} models with ratings in {data_file} ({models_changed} changed)")
+    return models_changed
 
 def output_comprehensive_csv(models: Dict, benchmark_ratings: Dict, pricing_ratings: Dict,
-                           output_file: str = 'public/data/model_ratings.csv'):
-    """Output comprehensive ratings to CSV file."""
+                           output_file: str = 'public/data/model_ratings.csv',
+                           rating_intervals: Optional[Dict] = None,
+                           profile_ratings: Optional[Dict] = None,
+                           completion: Optional[Dict] = None,
+                           frontiers: Optional[Dict] = None):
+    """Output comprehensive ratings to CSV file.
+    
+    With ``profile_ratings``, a pricing_cost_<profile> column per usage
+    profile follows pricing_cost. With ``rating_intervals``, '<category>
+    ci_low', '<category> ci_high' and '<category> n' columns are appended.
+    With ``completion``, '<category> completed' and '<category> predicted_n'
+    columns are appended. With ``frontiers``, '<category> frontier' and
+    '<category> frontier_gap' columns are appended.
+    """
     
     # Get all benchmark categories
     all_categories = set()
@@ -392,45 +856,86 @@ def output_comprehensive_csv(models: Dict, benchmark_ratings: Dict, pricing_rati
         all_categories.update(ratings.keys())
     
     categories = sorted(list(all_categories))
+    profiles = list(next(iter(profile_ratings.values()))) if profile_ratings else []
     
     print(f"Writing comprehensive results to {output_file}...")
     
-    with open(output_file, 'w', newline='') as csvfile:
-        fieldnames = (['model_id', 'model_name', 'model_type', 'company'] + 
-                     categories + ['pricing_cost'])
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    csvfile = io.StringIO(newline='')
+    fieldnames = (['model_id', 'model_name', 'model_type', 'company'] + 
+                 categories + ['pricing_cost'] + [profile_field_name(profile) for profile in profiles])
+    if rating_intervals is not None:
+        fieldnames += [f'{category} {suffix.lstrip("_")}'
+                       for category in categories for suffix in INTERVAL_FIELD_SUFFIXES]
+    if completion is not None:
+        fieldnames += [f'{category} {suffix.lstrip("_")}'
+                       for category in categories for suffix in COMPLETION_FIELD_SUFFIXES]
+    if frontiers is not None:
+        fieldnames += [f'{category} {suffix.lstrip("_")}'
+                       for category in categories for suffix in FRONTIER_FIELD_SUFFIXES]
+    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    
+    writer.writeheader()
+    
+    # Sort models by company, then type, then name
+    sorted_models = sorted(models.items(), key=lambda x: (x[1]['company'], x[1]['type'], x[1]['name']))
+    
+    for model_id, model_info in sorted_models:
+        row = {
+            'model_id': model_id,
+            'model_name': model_info['name'],
+            'model_type': model_info['type'],
+            'company': model_info['company']
+        }
         
-        writer.writeheader()
+        # Add benchmark category ratings (rounded to 2 decimal places)
+        for category in categories:
+            rating = benchmark_ratings[model_id].get(category)
+            if rating is not None:
+                row[category] = round(rating, 2)
+            else:
+                row[category] = 'n/a'
         
-        # Sort models by company, then type, then name
-        sorted_models = sorted(models.items(), key=lambda x: (x[1]['company'], x[1]['type'], x[1]['name']))
+        # Add pricing cost rating (2 decimal places)
+        pricing_rating = pricing_ratings.get(model_id)
+        if pricing_rating is not None:
+            row['pricing_cost'] = round(pricing_rating, 2)
+        else:
+            row['pricing_cost'] = 'n/a'
         
-        for model_id, model_info in sorted_models:
-            row = {
-                'model_id': model_id,
-                'model_name': model_info['name'],
-                'model_type': model_info['type'],
-                'company': model_info['company']
-            }
-            
-            # Add benchmark category ratings (rounded to 2 decimal places)
+        # Add usage-profile pricing cost ratings
+        for profile in profiles:
+            rating = profile_ratings[model_id][profile]
+            row[profile_field_name(profile)] = round(rating, 2) if rating is not None else 'n/a'
+        
+        # Add bootstrap intervals (n/a where a rating has a single benchmark or none)
+        if rating_intervals is not None:
             for category in categories:
-                rating = benchmark_ratings[model_id].get(category)
-                if rating is not None:
-                    row[category] = round(rating, 2)
-                else:
-                    row[category] = 'n/a'
-            
-            # Add pricing cost rating (2 decimal places)
-            pricing_rating = pricing_ratings.get(model_id)
-            if pricing_rating is not None:
-                row['pricing_cost'] = round(pricing_rating, 2)
-            else:
-                row['pricing_cost'] = 'n/a'
-            
-            writer.writerow(row)
+                interval = rating_intervals[model_id].get(category)
+                has_interval = interval is not None and interval['low'] is not None
+                row[f'{category} ci_low'] = round(interval['low'], 2) if has_interval else 'n/a'
+                row[f'{category} ci_high'] = round(interval['high'], 2) if has_interval else 'n/a'
+                row[f'{category} n'] = interval['n'] if interval is not None else 0
+        
+        # Add completed-table ratings (n/a for models with too few scores to predict)
+        if completion is not None:
+            for category in categories:
+                cell = completion['completed'].get(model_id, {}).get(category)
+                row[f'{category} completed'] = round(cell['rating'], 2) if cell is not None else 'n/a'
+                row[f'{category} predicted_n'] = cell['predicted_n'] if cell is not None else 0
+        
+        # Add frontier membership (n/a without pricing or a rating in the category)
+        if frontiers is not None:
+            for category in categories:
+                annotation = frontiers['annotations'].get(model_id, {}).get(category)
+                row[f'{category} frontier'] = annotation['frontier'] if annotation is not None else 'n/a'
+                row[f'{category} frontier_gap'] = annotation['gap'] if annotation is not None else 'n/a'
+        
+        writer.writerow(row)
     
-    print(f"Results written to {output_file}")
+    if write_if_changed(output_file, csvfile.getvalue()):
+        print(f"Results written to {output_file}")
+    else:
+        print(f"Results unchanged; {output_file} left untouched")
     
     # Print simplified summary
     print("\n" + "="*50)
@@ -458,46 +963,357 @@ def output_comprehensive_csv(models: Dict, benchmark_ratings: Dict, pricing_rati
     
     print("\n" + "="*50)
 
-def main():
-    """Main execution function."""
-    try:
-        # Load data
-        companies_data, benchmarks_df, benchmarks_meta = load_data()
-        
-        # Extract target models
+def run_ratings_pipeline(companies_data: Dict, benchmarks_df: pd.DataFrame, benchmarks_meta: List[Dict],
+                         engine: str = DEFAULT_RATING_ENGINE,
+                         data_file: str = 'data/data.json',
+                         ratings_csv: str = 'public/data/model_ratings.csv',
+                         timer: Optional[StageTimer] = None,
+                         incremental_state: Optional[str] = None,
+                         leaderboard_dir: Optional[str] = None,
+                         shard_dir: Optional[str] = None,
+                         neighbours_file: Optional[str] = None,
+                         bootstrap_resamples: int = 0,
+                         bootstrap_confidence: float = 0.95,
+                         fail_on: str = 'error',
+                         validation_report: Optional[str] = None,
+                         chunk_reports: Optional[List[Dict]] = None,
+                         rating_mode: str = DEFAULT_RATING_MODE,
+                         pairwise_state: Optional[str] = None,
+                         completion_rank: int = 0,
+                         predictions_file: Optional[str] = None,
+                         frontier_dir: Optional[str] = None) -> Optional[Dict]:
+    """Run every ratings stage on already-loaded inputs and write the outputs.
+    
+    companies_data must be the parsed contents of data_file; it is updated in
+    place with the new ratings. If incremental_state is given, benchmark
+    ratings are patched from the state saved there by the previous run (see
+    incremental_ratings.py). If leaderboard_dir is given, per-benchmark
+    leaderboard files are written there (see leaderboards.py). If shard_dir is
+    given, per-company shards of data.json and a slim models index are
+    written there (see data_shards.py). If neighbours_file is given, the
+    nearest neighbours of every model are written there (see
+    model_similarity.py). If bootstrap_resamples is positive, bootstrap confidence intervals for the
+    category ratings are written too (see rating_uncertainty.py). Returns the
+    computed ratings, or None if no models of the target types were found.
+    
+    The score table is validated first (see validate_scores.py): a
+    ValidationError is raised, before anything is written, if it has issues
+    at or above the fail_on severity ('never' only reports). The validation
+    report is written to validation_report if given. A streamed table is
+    validated while it is loaded instead: pass the reports load_data
+    collected as chunk_reports.
+    
+    With rating_mode 'pairwise' the category ratings come from head-to-head
+    wins (see pairwise_ratings.py), warm-started from and saved to
+    pairwise_state if given; they are written to the same fields.
+    
+    If completion_rank is positive, missing scores are predicted by a
+    low-rank fit of that rank and category ratings over the completed table
+    are added (see score_completion.py); the predicted scores and the
+    held-out error are written to predictions_file if given.
+    
+    The price-performance frontier of every category and model type is
+    always added to data.json and the CSV, and written as one file per
+    category to frontier_dir if given (see pareto_frontier.py).
+    """
+    from validate_scores import ValidationError, combine_reports, print_report, validate_scores, write_report
+    
+    if rating_mode not in RATING_MODES:
+        raise ValueError(f"Unknown rating mode: {rating_mode}")
+    if rating_mode == 'pairwise' and bootstrap_resamples > 0:
+        raise ValueError("Bootstrap intervals are only available for the minmax rating mode")
+    if rating_mode == 'pairwise' and completion_rank > 0:
+        raise ValueError("Score completion is only available for the minmax rating mode")
+    
+    timer = timer or StageTimer()
+    
+    # Check ids, scores and dates before anything is rated
+    with timer.stage('validate_scores') as stage:
+        if chunk_reports is not None:
+            report = combine_reports(chunk_reports, fail_on=fail_on)
+        else:
+            report = validate_scores(benchmarks_df, companies_data, benchmarks_meta, fail_on=fail_on)
+        stage['rows'] = report['rows']
+    print_report(report)
+    if validation_report:
+        write_report(report, validation_report)
+    if report['failed']:
+        raise ValidationError(report)
+    
+    # Extract target models
+    with timer.stage('extract_target_models') as stage:
         models = extract_target_models(companies_data)
-        
-        if not models:
-            print("No models found of target types!")
-            return
-        
-        # === BENCHMARK RATINGS ===
-        # Create benchmark category mapping
+        stage['rows'] = len(models)
+    
+    if not models:
+        print("No models found of target types!")
+        return None
+    
+    # === BENCHMARK RATINGS ===
+    # Create benchmark category mapping
+    with timer.stage('create_benchmark_category_mapping') as stage:
         benchmark_categories = create_benchmark_category_mapping(benchmarks_meta)
-        
-        # Deduplicate scores
+        stage['rows'] = len(benchmark_categories)
+    
+    # Deduplicate scores
+    with timer.stage('deduplicate_scores') as stage:
         deduplicated_df = deduplicate_scores(benchmarks_df, models)
+        stage['rows'] = len(deduplicated_df)
+    
+    if incremental_state:
+        # Re-rate only what changed since the previous run
+        from incremental_ratings import rate_incrementally
         
+        with timer.stage('rate_incrementally') as stage:
+            rated_df, benchmark_ratings = rate_incrementally(deduplicated_df, models, benchmark_categories,
+                                                             state_file=incremental_state, engine=engine)
+            stage['rows'] = len(rated_df)
+    else:
         # Normalize and convert to ratings
-        rated_df, _ = normalize_and_rate_benchmarks(deduplicated_df)
+        with timer.stage('normalize_and_rate_benchmarks') as stage:
+            rated_df, _ = normalize_and_rate_benchmarks(deduplicated_df, engine=engine)
+            stage['rows'] = len(rated_df)
         
         # Calculate benchmark category ratings
-        benchmark_ratings = calculate_benchmark_category_ratings(rated_df, models, benchmark_categories)
+        if rating_mode == 'minmax':
+            with timer.stage('calculate_benchmark_category_ratings') as stage:
+                benchmark_ratings = calculate_benchmark_category_ratings(rated_df, models, benchmark_categories,
+                                                                         engine=engine)
+                stage['rows'] = len(benchmark_ratings)
+    
+    if rating_mode == 'pairwise':
+        # Replace the averaged min-max ratings by head-to-head strengths
+        from pairwise_ratings import calculate_pairwise_category_ratings
         
-        # === PRICING RATINGS ===
+        with timer.stage('calculate_pairwise_category_ratings') as stage:
+            benchmark_ratings = calculate_pairwise_category_ratings(rated_df, models, benchmark_categories,
+                                                                    state_file=pairwise_state)
+            stage['rows'] = len(benchmark_ratings)
+    
+    # === PRICING RATINGS ===
+    with timer.stage('calculate_pricing_ratings') as stage:
         pricing_ratings = calculate_pricing_ratings(models)
+        stage['rows'] = sum(rating is not None for rating in pricing_ratings.values())
+    
+    # Effective cost under each usage profile, for all models and profiles at once
+    with timer.stage('calculate_profile_pricing_ratings') as stage:
+        profile_ratings = calculate_profile_pricing_ratings(models, offset=PRICING_LOG_OFFSET,
+                                                            exponent=PRICING_CURVE_EXPONENT)
+        stage['rows'] = len(profile_ratings)
+    
+    # === UNCERTAINTY (optional) ===
+    rating_intervals = None
+    if bootstrap_resamples > 0:
+        from rating_uncertainty import bootstrap_category_intervals
         
-        # === OUTPUT COMBINED RESULTS ===
-        # Update the main data.json file with ratings
-        update_data_json_with_ratings(models, benchmark_ratings, pricing_ratings)
+        with timer.stage('bootstrap_category_intervals') as stage:
+            rating_intervals = bootstrap_category_intervals(rated_df, models, benchmark_categories,
+                                                            n_resamples=bootstrap_resamples,
+                                                            confidence=bootstrap_confidence)
+            stage['rows'] = sum(len(cells) for cells in rating_intervals.values())
+        single = sum(interval['n'] == 1 for cells in rating_intervals.values() for interval in cells.values())
+        print(f"Bootstrap intervals: {bootstrap_resamples} resamples at {bootstrap_confidence:.0%} confidence "
+              f"({single} ratings rest on a single benchmark)")
+    
+    # === SCORE COMPLETION (optional) ===
+    completion = None
+    if completion_rank > 0:
+        from score_completion import complete_scores, write_predicted_scores
         
-        # Also output CSV for backwards compatibility (optional)
-        output_comprehensive_csv(models, benchmark_ratings, pricing_ratings)
+        with timer.stage('complete_scores') as stage:
+            completion = complete_scores(rated_df, models, benchmark_categories, rank=completion_rank,
+                                         keep_scores=bool(predictions_file))
+            stage['rows'] = len(completion['completed'])
+        holdout = completion['holdout']
+        print(f"Score completion (rank {completion_rank}): held-out RMSE {holdout['rmse']} on {holdout['n']} "
+              f"normalized scores (benchmark means: {holdout['baseline_rmse']})")
+        if predictions_file:
+            with timer.stage('write_predicted_scores') as stage:
+                changed = write_predicted_scores(completion, predictions_file)
+                stage['rows'] = len(completion['scores'])
+            print(f"Predicted scores for {len(completion['scores'])} models in {predictions_file}"
+                  f"{'' if changed else ' (unchanged)'}")
+    
+    # === PRICE-PERFORMANCE FRONTIERS ===
+    from pareto_frontier import compute_frontiers, write_frontiers
+    
+    with timer.stage('compute_frontiers') as stage:
+        frontiers = compute_frontiers(models, benchmark_ratings)
+        stage['rows'] = sum(len(cells) for cells in frontiers['annotations'].values())
+    
+    # === OUTPUT COMBINED RESULTS ===
+    # Update the main data.json file with ratings
+    with timer.stage('update_data_json_with_ratings') as stage:
+        stage['rows'] = update_data_json_with_ratings(models, benchmark_ratings, pricing_ratings,
+                                      data_file=data_file, data=companies_data,
+                                      rating_intervals=rating_intervals, profile_ratings=profile_ratings,
+                                      completion=completion, frontiers=frontiers)
+    
+    # Also output CSV for backwards compatibility (optional)
+    with timer.stage('output_comprehensive_csv') as stage:
+        output_comprehensive_csv(models, benchmark_ratings, pricing_ratings, output_file=ratings_csv,
+                                 rating_intervals=rating_intervals, profile_ratings=profile_ratings,
+                                 completion=completion, frontiers=frontiers)
+        stage['rows'] = len(models)
+    
+    # Frontier files for the price-performance charts
+    if frontier_dir:
+        with timer.stage('write_frontiers') as stage:
+            changed = write_frontiers(frontiers['frontiers'], frontier_dir)
+            stage['rows'] = len(frontiers['frontiers'])
+        print(f"Frontiers for {len(frontiers['frontiers'])} categories in {frontier_dir} ({changed} files changed)")
+    
+    # Per-benchmark leaderboards for the benchmark detail pages
+    if leaderboard_dir:
+        from leaderboards import build_leaderboards, write_leaderboards
+        
+        with timer.stage('write_leaderboards') as stage:
+            leaderboards = build_leaderboards(benchmarks_df, rated_df, benchmarks_meta)
+            changed = write_leaderboards(leaderboards, leaderboard_dir)
+            stage['rows'] = len(leaderboards)
+        print(f"Leaderboards for {len(leaderboards)} benchmarks in {leaderboard_dir} ({changed} files changed)")
+    
+    # Comparable models for the compare view
+    if neighbours_file:
+        from model_similarity import build_neighbour_index, write_neighbour_index
+        
+        with timer.stage('build_neighbour_index') as stage:
+            neighbour_index = build_neighbour_index(rated_df, benchmark_ratings)
+            changed = write_neighbour_index(neighbour_index, neighbours_file)
+            stage['rows'] = len(neighbour_index['neighbours'])
+        print(f"Nearest neighbours of {len(neighbour_index['neighbours'])} models in {neighbours_file}"
+              f"{'' if changed else ' (unchanged)'}")
+    
+    # Per-company shards of data.json for pages that need only one company
+    if shard_dir:
+        from data_shards import write_shards
+        
+        with timer.stage('write_shards') as stage:
+            changed = write_shards(companies_data, shard_dir)
+            stage['rows'] = len(companies_data['companies'])
+        print(f"Shards for {len(companies_data['companies'])} companies in {shard_dir} ({changed} files changed)")
+    
+    return {
+        'models': models,
+        'rated_df': rated_df,
+        'benchmark_ratings': benchmark_ratings,
+        'pricing_ratings': pricing_ratings,
+        'profile_ratings': profile_ratings,
+        'rating_intervals': rating_intervals,
+        'completion': completion,
+        'frontiers': frontiers,
+    }
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Calculate model ratings from benchmark scores and pricing.")
+    parser.add_argument('--engine', choices=RATING_ENGINES + [LITE_ENGINE], default=DEFAULT_RATING_ENGINE,
+                        help="Rating engine to use; 'lite' runs without pandas or NumPy but skips score "
+                             "validation, leaderboards and model neighbours (default: %(default)s)")
+    parser.add_argument('--timings', action='store_true',
+                        help="Print a per-stage timing report")
+    parser.add_argument('--report', metavar='REPORT_FILE',
+                        help="Write wall time, CPU time, peak RSS and row counts per stage as JSON")
+    parser.add_argument('--cprofile', metavar='PROFILE_FILE',
+                        help="Profile every stage and dump the cProfile stats of the slowest one")
+    parser.add_argument('--incremental', nargs='?', const='.cache/ratings/incremental-state.pkl',
+                        metavar='STATE_FILE',
+                        help="Only re-rate scores that changed since the previous incremental run "
+                             "(state kept in %(const)s by default)")
+    parser.add_argument('--uncertainty', nargs='?', type=int, const=2000, default=0, metavar='RESAMPLES',
+                        help="Add bootstrap confidence intervals to the category ratings "
+                             "(%(const)s resamples by default)")
+    parser.add_argument('--confidence', type=float, default=0.95,
+                        help="Confidence level of the bootstrap intervals (default: %(default)s)")
+    parser.add_argument('--stream', nargs='?', type=int, const=1_000_000, default=None, metavar='CHUNK_ROWS',
+                        help="Stream benchmarks.csv in chunks, keeping only the latest score per "
+                             "model-benchmark pair (%(const)s rows per chunk by default)")
+    parser.add_argument('--score-dtype', choices=['float64', 'float32'], default='float64',
+                        help="Score precision while streaming; float32 halves score memory but rounds "
+                             "scores to 7 significant digits (default: %(default)s)")
+    parser.add_argument('--fail-on', choices=['warning', 'error', 'never'], default='error',
+                        help="Stop before rating if score validation finds issues of this severity "
+                             "or worse (default: %(default)s)")
+    parser.add_argument('--validation-report', metavar='REPORT_FILE',
+                        help="Write the score validation report as JSON")
+    parser.add_argument('--rating-mode', choices=RATING_MODES, default=DEFAULT_RATING_MODE,
+                        help="How category ratings are computed: 'minmax' averages per-benchmark ratings, "
+                             "'pairwise' fits Bradley-Terry strengths to head-to-head wins "
+                             "(default: %(default)s)")
+    parser.add_argument('--pairwise-state', default='.cache/ratings/pairwise-state.json', metavar='STATE_FILE',
+                        help="Strengths saved by the previous pairwise run, to warm-start the next one "
+                             "(default: %(default)s)")
+    parser.add_argument('--complete', nargs='?', type=int, const=4, default=0, metavar='RANK',
+                        help="Predict missing benchmark scores with a low-rank fit and add category ratings "
+                             "over the completed table (rank %(const)s by default)")
+    args = parser.parse_args(argv)
+    
+    if args.engine == LITE_ENGINE:
+        unsupported = [flag for flag, value in [('--incremental', args.incremental),
+                                                ('--uncertainty', args.uncertainty),
+                                                ('--stream', args.stream),
+                                                ('--rating-mode pairwise', args.rating_mode == 'pairwise'),
+                                                ('--complete', args.complete)]
+                       if value]
+        if unsupported:
+            parser.error(f"--engine {LITE_ENGINE} does not support {', '.join(unsupported)}")
+    if args.rating_mode == 'pairwise' and args.uncertainty:
+        parser.error("--uncertainty is only available with --rating-mode minmax")
+    if args.rating_mode == 'pairwise' and args.complete:
+        parser.error("--complete is only available with --rating-mode minmax")
+    if args.complete < 0:
+        parser.error("--complete RANK must be at least 1")
+    return args
+
+def main(argv: Optional[List[str]] = None):
+    """Main execution function."""
+    from validate_scores import ValidationError
+    
+    args = parse_args(argv)
+    timer = StageTimer(profile=bool(args.cprofile))
+    
+    try:
+        if args.engine == LITE_ENGINE:
+            from ratings_lite import run_lite_pipeline
+            
+            run_lite_pipeline(timer=timer, shard_dir='public/data', frontier_dir='public/data/frontiers',
+                              fail_on=args.fail_on, validation_report=args.validation_report)
+        else:
+            # Load data (a streamed table is validated chunk by chunk while loading)
+            chunk_reports = [] if args.stream else None
+            with timer.stage('load_data') as stage:
+                companies_data, benchmarks_df, benchmarks_meta = load_data(chunk_rows=args.stream,
+                                                                           score_dtype=args.score_dtype,
+                                                                           chunk_reports=chunk_reports)
+                stage['rows'] = len(benchmarks_df)
+            
+            run_ratings_pipeline(companies_data, benchmarks_df, benchmarks_meta,
+                                 engine=args.engine, timer=timer, incremental_state=args.incremental,
+                                 leaderboard_dir='public/data/leaderboards', shard_dir='public/data',
+                                 neighbours_file='public/data/model-neighbours.json',
+                                 frontier_dir='public/data/frontiers',
+                                 bootstrap_resamples=args.uncertainty, bootstrap_confidence=args.confidence,
+                                 fail_on=args.fail_on, validation_report=args.validation_report,
+                                 chunk_reports=chunk_reports,
+                                 rating_mode=args.rating_mode, pairwise_state=args.pairwise_state,
+                                 completion_rank=args.complete,
+                                 predictions_file='public/data/predicted-scores.json' if args.complete else None)
+        
+        if args.timings:
+            timer.report()
+        if args.report:
+            timer.write_report(args.report)
+        if args.cprofile:
+            timer.dump_slowest_profile(args.cprofile)
         
     except FileNotFoundError as e:
         print(f"Error: Could not find required data file - {e}")
         print("Make sure you're running this script from the project root directory.")
         sys.exit(1)
+    except ValidationError as e:
+        # The report has already been printed by run_ratings_pipeline or run_lite_pipeline
+        print(f"Error: {e}")
+        sys.exit(1)
     except Exception as e:
         print(f"Error: {e}")
         import traceback
@@ -505,4 +1321,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,60 @@
+"""
+Sharded copies of data.json for pages that render only part of it.
+
+data.json stays the source of truth; alongside it the pipeline writes
+
+    companies/<company_id>.json   the company's full entry from data.json
+                                  (models, products, subscriptions, ...)
+    models-index.json             one slim row per model across all companies:
+
+    {"models": [{"id": "gpt-5", "name": "GPT-5", "type": "Large Hybrid Model",
+                 "company_id": "openai", "ratings": {"coding": 5, ...}}, ...]}
+
+so a company page can fetch a single shard and lists or pickers can fetch
+the index instead of the whole document. Shards of companies removed from
+data.json are deleted.
+"""
+
+import glob
+import json
+import os
+from typing import Dict
+
+from build_cache import write_if_changed
+
+MODELS_INDEX_FILE = 'models-index.json'
+COMPANY_SHARD_DIR = 'companies'
+
+def build_models_index(companies_data: Dict) -> Dict:
+    """Build the slim index of every model in data.json."""
+    return {'models': [{'id': model['id'],
+                        'name': model.get('name'),
+                        'type': model.get('type'),
+                        'company_id': company['id'],
+                        'ratings': model.get('ratings', {})}
+                       for company in companies_data['companies']
+                       for model in company.get('models', [])]}
+
+def write_shards(companies_data: Dict, output_dir: str) -> int:
+    """Write the company shards and the models index under output_dir.
+
+    Returns the number of files written or removed.
+    """
+    shard_dir = os.path.join(output_dir, COMPANY_SHARD_DIR)
+    os.makedirs(shard_dir, exist_ok=True)
+    changed = 0
+
+    expected = set()
+    for company in companies_data['companies']:
+        path = os.path.join(shard_dir, f"{company['id']}.json")
+        expected.add(path)
+        changed += write_if_changed(path, json.dumps(company, ensure_ascii=False, separators=(',', ':')))
+
+    for stale in set(glob.glob(os.path.join(shard_dir, '*.json'))) - expected:
+        os.remove(stale)
+        changed += 1
+
+    index = build_models_index(companies_data)
+    changed += write_if_changed(os.path.join(output_dir, MODELS_INDEX_FILE),
+                                json.dumps(index, ensure_ascii=False, separators=(',', ':')))
+    return changed
@@ -0,0 +1,132 @@
+"""
+Columnar binary export of the benchmark score table for the web front-end.
+
+benchmarks.csv is kept for compatibility, but the browser has to download and
+CSV-parse the whole file. benchmarks.bin holds the same rows in a compact
+columnar layout that can be decoded with typed-array views and no parsing.
+
+File layout (all integers little-endian):
+
+    offset 0   magic      4 bytes  b'GXSC'
+    offset 4   version    uint32   currently 1
+    offset 8   header_len uint32   length of the JSON header in bytes
+    offset 12  header     UTF-8 JSON, padded with spaces to an 8-byte boundary
+    ...        columns    one after another, each starting on an 8-byte boundary
+
+The header looks like:
+
+    {"rows": 1734,
+     "epoch": "1970-01-01",
+     "tables": {"model_id": ["claude-3-opus", ...], ...},
+     "columns": [{"name": "model_id", "type": "uint16", "offset": 4096,
+                  "null": 65535, "table": "model_id"}, ...]}
+
+String columns (model_id, company_id, benchmark_id, source_name, source,
+notes) are dictionary-encoded: each row stores an index into the column's
+string table, with the largest value of the index type meaning null. The
+score column is float32 with NaN for missing values, and the date column is
+int32 days since the epoch with -2147483648 for missing dates.
+
+A gzip copy (benchmarks.bin.gz) is always written next to the file, and a
+brotli copy (benchmarks.bin.br) when the optional brotli package is installed.
+"""
+
+import gzip
+import json
+import os
+import struct
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from build_cache import write_if_changed
+from calculate_model_ratings import coerce_scores
+
+MAGIC = b'GXSC'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+DATE_NULL = np.iinfo(np.int32).min
+
+STRING_COLUMNS = ['model_id', 'company_id', 'benchmark_id', 'source_name', 'source', 'notes']
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+def _pad(length: int) -> int:
+    return -length % ALIGNMENT
+
+def _encode_strings(values: pd.Series):
+    """Dictionary-encode a string column into (codes, table, null_code)."""
+    codes, uniques = pd.factorize(values, sort=True)
+    table = [str(value) for value in uniques]
+    dtype = np.uint16 if len(table) < np.iinfo(np.uint16).max else np.uint32
+    null_code = int(np.iinfo(dtype).max)
+    codes = np.where(codes < 0, null_code, codes).astype(dtype)
+    return codes, table, null_code
+
+def encode_columnar_scores(df_scores: pd.DataFrame) -> bytes:
+    """Encode the score table in the columnar binary format described above."""
+    tables: Dict[str, List[str]] = {}
+    columns = []
+    arrays = []
+
+    for name in STRING_COLUMNS:
+        if name not in df_scores.columns:
+            continue
+        codes, table, null_code = _encode_strings(df_scores[name])
+        tables[name] = table
+        columns.append({'name': name, 'type': codes.dtype.name, 'null': null_code, 'table': name})
+        arrays.append(codes)
+
+    scores = coerce_scores(df_scores['score']).astype('<f4')
+    columns.append({'name': 'score', 'type': 'float32'})
+    arrays.append(scores)
+
+    dates = pd.to_datetime(df_scores['date'], errors='coerce')
+    days = dates.to_numpy(dtype='datetime64[D]').astype('int64')
+    days = np.where(dates.isna().to_numpy(), DATE_NULL, days).astype('<i4')
+    columns.append({'name': 'date', 'type': 'int32', 'null': DATE_NULL})
+    arrays.append(days)
+
+    # Lay out the columns after the header; offsets depend on the header length,
+    # so reserve room for the offset digits before serialising it
+    header = {'rows': len(df_scores), 'epoch': '1970-01-01', 'tables': tables, 'columns': columns}
+    for column in columns:
+        column['offset'] = 0
+    provisional = len(json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    data_start = 12 + provisional + 16 * len(columns)
+    data_start += _pad(data_start)
+
+    offset = data_start
+    for column, array in zip(columns, arrays):
+        column['offset'] = offset
+        offset += array.nbytes + _pad(array.nbytes)
+
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    assert len(header_bytes) <= data_start - 12, "header outgrew its reserved space"
+    header_bytes += b' ' * (data_start - 12 - len(header_bytes))
+
+    parts = [MAGIC, struct.pack('<II', FORMAT_VERSION, len(header_bytes)), header_bytes]
+    for array in arrays:
+        data = array.astype(array.dtype.newbyteorder('<'), copy=False).tobytes()
+        parts.append(data + b'\0' * _pad(len(data)))
+    return b''.join(parts)
+
+def write_columnar_scores(df_scores: pd.DataFrame, bin_file: str) -> Dict[str, int]:
+    """Write the columnar file plus its precompressed variants.
+
+    Returns the size in bytes of each file, keyed by path.
+    """
+    os.makedirs(os.path.dirname(bin_file), exist_ok=True)
+    encoded = encode_columnar_scores(df_scores)
+
+    variants = {bin_file: encoded, bin_file + '.gz': gzip.compress(encoded, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[bin_file + '.br'] = brotli.compress(encoded, quality=11)
+
+    for path, content in variants.items():
+        write_if_changed(path, content)
+    return {path: len(content) for path, content in variants.items()}
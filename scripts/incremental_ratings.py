@@ -0,0 +1,139 @@
+"""
+Incremental re-rating for calculate_model_ratings.py.
+
+A full run re-normalizes every benchmark and re-averages every model's
+categories. When only a handful of scores change between runs, most of that
+work reproduces the previous result. This module persists the rated score
+table and category ratings of the last run and, on the next run:
+- Diffs the deduplicated scores against the previous run by model-benchmark pair
+- Re-rates only the benchmarks that gained, lost or changed a score
+- Re-averages only the models whose per-benchmark ratings moved
+- Patches those entries into the previous results
+
+The state is discarded (and a full computation done) whenever the category
+mapping or the pipeline code changes, so results always match a full run.
+"""
+
+import os
+import pickle
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from build_cache import PICKLE_LOAD_ERRORS, pipeline_code_hash, write_if_changed
+from calculate_model_ratings import (
+    DEFAULT_RATING_ENGINE,
+    coerce_scores,
+    calculate_benchmark_category_ratings,
+    normalize_and_rate_benchmarks,
+)
+
+STATE_VERSION = 1
+DEFAULT_STATE_FILE = os.path.join('.cache', 'ratings', 'incremental-state.pkl')
+
+PAIR_KEY = ['model_id', 'benchmark_id']
+RATING_COLUMNS = ['normalized_score', 'rating_1_to_5']
+
+def load_state(state_file: str) -> Optional[Dict]:
+    """Load the state saved by the previous run, or None if it is missing, unreadable or stale."""
+    try:
+        with open(state_file, 'rb') as f:
+            state = pickle.load(f)
+    except PICKLE_LOAD_ERRORS:
+        return None
+
+    if not isinstance(state, dict) or state.get('version') != STATE_VERSION or state.get('code_hash') != pipeline_code_hash():
+        return None
+    return state
+
+def save_state(state_file: str, rated_df: pd.DataFrame, benchmark_ratings: Dict,
+               benchmark_categories: Dict, engine: str):
+    """Persist this run's results for the next incremental run."""
+    os.makedirs(os.path.dirname(state_file) or '.', exist_ok=True)
+    state = {
+        'version': STATE_VERSION,
+        'code_hash': pipeline_code_hash(),
+        'engine': engine,
+        'benchmark_categories': benchmark_categories,
+        'rated': rated_df,
+        'benchmark_ratings': benchmark_ratings,
+    }
+    # Replaced atomically, so an interrupted run leaves the previous state intact
+    write_if_changed(state_file, pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+
+def _pair_index(df: pd.DataFrame) -> pd.MultiIndex:
+    return pd.MultiIndex.from_frame(df[PAIR_KEY])
+
+def _changed_pairs(previous: pd.DataFrame, current: pd.DataFrame) -> pd.DataFrame:
+    """Return the model-benchmark pairs that were added, removed or re-scored."""
+    prev_scores = pd.Series(coerce_scores(previous['score']), index=_pair_index(previous))
+    curr_scores = pd.Series(coerce_scores(current['score']), index=_pair_index(current))
+
+    prev_aligned, curr_aligned = prev_scores.align(curr_scores, join='outer')
+    in_both = (prev_aligned.index.isin(prev_scores.index) & prev_aligned.index.isin(curr_scores.index))
+    same_score = ((prev_aligned == curr_aligned) | (prev_aligned.isna() & curr_aligned.isna())).to_numpy()
+    return prev_aligned.index[~(in_both & same_score)].to_frame(index=False)
+
+def rate_incrementally(deduplicated_df: pd.DataFrame, models: Dict, benchmark_categories: Dict,
+                       state_file: str = DEFAULT_STATE_FILE,
+                       engine: str = DEFAULT_RATING_ENGINE) -> Tuple[pd.DataFrame, Dict]:
+    """Rate scores and average categories, reusing the previous run where possible.
+
+    Returns the same (rated_df, benchmark_ratings) as running
+    normalize_and_rate_benchmarks and calculate_benchmark_category_ratings.
+    """
+    state = load_state(state_file)
+
+    if (state is None or state['engine'] != engine
+            or state['benchmark_categories'] != benchmark_categories):
+        print("Incremental re-rating: no usable previous state, computing all ratings")
+        rated_df, _ = normalize_and_rate_benchmarks(deduplicated_df, engine=engine)
+        benchmark_ratings = calculate_benchmark_category_ratings(rated_df, models, benchmark_categories,
+                                                                 engine=engine)
+        save_state(state_file, rated_df, benchmark_ratings, benchmark_categories, engine)
+        return rated_df, benchmark_ratings
+
+    previous = state['rated']
+    changed = _changed_pairs(previous, deduplicated_df)
+    affected_benchmarks = set(changed['benchmark_id'])
+
+    # Re-rate only the benchmarks whose membership or scores changed
+    in_affected = deduplicated_df['benchmark_id'].isin(affected_benchmarks).to_numpy()
+    rerated, _ = normalize_and_rate_benchmarks(deduplicated_df[in_affected], engine=engine)
+
+    # Everything else keeps its previous normalized score and rating
+    previous_ratings = previous.set_index(PAIR_KEY)[RATING_COLUMNS]
+    reused = previous_ratings.reindex(_pair_index(deduplicated_df[~in_affected]))
+
+    rated_df = deduplicated_df.copy()
+    for column in RATING_COLUMNS:
+        values = np.empty(len(rated_df), dtype=previous_ratings[column].dtype)
+        values[in_affected] = rerated[column].to_numpy()
+        values[~in_affected] = reused[column].to_numpy()
+        rated_df[column] = values
+
+    # Models whose ratings moved, plus models that joined or left the target set
+    old_ratings = previous_ratings['rating_1_to_5'].reindex(_pair_index(rerated))
+    moved = rerated['model_id'][old_ratings.to_numpy() != rerated['rating_1_to_5'].to_numpy()]
+    affected_models = set(moved) | set(changed['model_id'])
+
+    benchmark_ratings = {model_id: ratings for model_id, ratings in state['benchmark_ratings'].items()
+                         if model_id in models}
+    affected_models |= set(models) - set(benchmark_ratings)
+    affected_models &= set(models)
+
+    if affected_models:
+        affected_rows = rated_df[rated_df['model_id'].isin(affected_models)]
+        benchmark_ratings.update(calculate_benchmark_category_ratings(
+            affected_rows, {model_id: models[model_id] for model_id in affected_models},
+            benchmark_categories, engine=engine))
+
+    # Keep the model order of a full run
+    benchmark_ratings = {model_id: benchmark_ratings[model_id] for model_id in models}
+
+    print(f"Incremental re-rating: {len(changed)} changed score pairs, "
+          f"{len(affected_benchmarks)} benchmarks re-rated, {len(affected_models)} models re-averaged")
+
+    save_state(state_file, rated_df, benchmark_ratings, benchmark_categories, engine)
+    return rated_df, benchmark_ratings
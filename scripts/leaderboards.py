@@ -0,0 +1,125 @@
+"""
+Precomputed per-benchmark leaderboards for the benchmark detail pages.
+
+Each benchmark in benchmarks-meta.json gets a small JSON file,
+<benchmark_id>.json, with the latest score per model sorted best first, so a
+page can fetch only the benchmark it shows instead of the full score table:
+
+    {"benchmark_id": "mmlu",
+     "benchmark_name": "MMLU",
+     "benchmark_category": "General Intelligence",
+     "count": 42,            # models with a score (before top-N truncation)
+     "min": 54.1, "max": 92.3,
+     "last_updated": "2025-08-07",
+     "rows": [{"rank": 1, "model_id": "...", "company_id": "...", "score": 92.3,
+               "date": "2025-08-07", "source_name": "...", "source": "...",
+               "rating": 5, "normalized_score": 1.0}, ...]}
+
+Rows come from deduplicate_scores over every model with a score; rating and
+normalized_score are taken from normalize_and_rate_benchmarks and are null
+for models outside TARGET_MODEL_TYPES.
+"""
+
+import glob
+import json
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from build_cache import write_if_changed
+from calculate_model_ratings import coerce_scores, deduplicate_scores
+
+LEADERBOARD_TOP_N = 100
+
+def _clean(value):
+    """Convert pandas/NumPy scalars to JSON-friendly Python values."""
+    if value is None or pd.isna(value):
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+def _format_dates(dates: pd.Series) -> pd.Series:
+    return pd.to_datetime(dates, errors='coerce').dt.strftime('%Y-%m-%d').astype(object).where(dates.notna(), None)
+
+def build_leaderboards(benchmarks_df: pd.DataFrame, rated_df: pd.DataFrame, benchmarks_meta: List[Dict],
+                       top_n: Optional[int] = LEADERBOARD_TOP_N) -> Dict[str, Dict]:
+    """Build the leaderboard document for every benchmark in the metadata."""
+    all_models = dict.fromkeys(benchmarks_df['model_id'].dropna().unique())
+    latest = deduplicate_scores(benchmarks_df, all_models)
+    latest = latest.assign(score=coerce_scores(latest['score']))
+    latest = latest[latest['score'].notna()]
+
+    # Attach the per-model ratings of the rating step where available
+    ratings = rated_df.set_index(['model_id', 'benchmark_id'])[['rating_1_to_5', 'normalized_score']]
+    latest = latest.join(ratings, on=['model_id', 'benchmark_id'])
+    latest = latest.sort_values(['benchmark_id', 'score', 'model_id'], ascending=[True, False, True])
+
+    # Per-benchmark summary statistics in one grouped pass
+    stats = latest.groupby('benchmark_id')['score'].agg(['count', 'min', 'max'])
+    last_updated = _format_dates(
+        pd.to_datetime(benchmarks_df['date'], errors='coerce').groupby(benchmarks_df['benchmark_id']).max())
+
+    # Top-N rows of every benchmark, converted to records once
+    shown = latest if top_n is None else latest.groupby('benchmark_id', sort=False).head(top_n)
+    shown = pd.DataFrame({
+        'benchmark_id': shown['benchmark_id'],
+        'rank': shown.groupby('benchmark_id', sort=False).cumcount() + 1,
+        'model_id': shown['model_id'],
+        'company_id': shown.get('company_id'),
+        'score': shown['score'],
+        'date': _format_dates(shown['date']),
+        'source_name': shown.get('source_name'),
+        'source': shown.get('source'),
+        'rating': shown['rating_1_to_5'].astype('Int64'),
+        'normalized_score': shown['normalized_score'],
+    })
+
+    rows_by_benchmark: Dict[str, List[Dict]] = {}
+    for record in shown.to_dict(orient='records'):
+        benchmark_id = record.pop('benchmark_id')
+        rows_by_benchmark.setdefault(benchmark_id, []).append(
+            {key: _clean(value) for key, value in record.items()})
+
+    leaderboards = {}
+    for benchmark in benchmarks_meta:
+        benchmark_id = benchmark['benchmark_id']
+        has_scores = benchmark_id in stats.index
+        leaderboards[benchmark_id] = {
+            'benchmark_id': benchmark_id,
+            'benchmark_name': benchmark.get('benchmark_name'),
+            'benchmark_category': benchmark.get('benchmark_category'),
+            'count': int(stats.at[benchmark_id, 'count']) if has_scores else 0,
+            'min': _clean(stats.at[benchmark_id, 'min']) if has_scores else None,
+            'max': _clean(stats.at[benchmark_id, 'max']) if has_scores else None,
+            'last_updated': _clean(last_updated.get(benchmark_id)),
+            'rows': rows_by_benchmark.get(benchmark_id, []),
+        }
+
+    return leaderboards
+
+def write_leaderboards(leaderboards: Dict[str, Dict], output_dir: str) -> int:
+    """Write one file per benchmark and remove files for benchmarks that no longer exist.
+
+    Returns the number of files written or removed.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    changed = 0
+
+    expected = set()
+    for benchmark_id, leaderboard in leaderboards.items():
+        path = os.path.join(output_dir, f'{benchmark_id}.json')
+        expected.add(path)
+        content = json.dumps(leaderboard, ensure_ascii=False, separators=(',', ':'))
+        changed += write_if_changed(path, content)
+
+    for stale in set(leaderboard_files(output_dir)) - expected:
+        os.remove(stale)
+        changed += 1
+
+    return changed
+
+def leaderboard_files(output_dir: str) -> List[str]:
+    """List the leaderboard files currently in output_dir."""
+    return sorted(glob.glob(os.path.join(output_dir, '*.json')))
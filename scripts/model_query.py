@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Indexed in-memory queries over models, benchmark scores and ratings.
+
+Consumers of the generated files tend to re-scan benchmarks.csv or walk
+data['companies'][*]['models'] for every question. ModelIndex loads the same
+inputs once (through load_data) and builds indexes up front:
+- models by id, company and type, and scores by model and by benchmark
+  (dicts: O(1) lookups)
+- benchmarks by category (dict)
+- models sorted by input, output and blended price, and by every numeric
+  rating field (sorted lists: O(log n) range lookups with bisect; top-n walks
+  a rating index from the top and stops after n matches)
+
+Ratings are read from each model's ``ratings`` in data.json, so run the
+ratings pipeline first. Blended prices use the pricing_cost weights.
+
+Example:
+    index = ModelIndex.load()
+    index.top_models('coding', n=10, max_price=2.0)      # top coding models under $2/M input
+    index.scores_for_model('gpt-5', latest_only=True)
+
+The index can also be served read-only over HTTP for dashboards:
+    python scripts/model_query.py serve --port 8765
+    curl 'http://127.0.0.1:8765/top?field=coding&n=10&max_price=2'
+
+Routes (all GET, JSON):
+    /models?min_price=&max_price=&price=input|output|blended&type=
+    /models/<model_id>
+    /models/<model_id>/scores?latest=1
+    /companies/<company_id>/models
+    /benchmarks/<benchmark_id>/scores?latest=1
+    /categories/<category>/benchmarks
+    /top?field=<rating field>&n=10&max_price=&price=input|output|blended&type=
+"""
+
+import argparse
+import json
+import numbers
+import sys
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pandas as pd
+
+from calculate_model_ratings import (
+    PRICING_INPUT_WEIGHT,
+    PRICING_OUTPUT_WEIGHT,
+    deduplicate_scores,
+    load_data,
+)
+
+PRICE_KINDS = ['input', 'output', 'blended']
+SCORE_COLUMNS = ['model_id', 'company_id', 'benchmark_id', 'score', 'date', 'source_name', 'source']
+
+def _records(df: pd.DataFrame) -> List[Dict]:
+    """JSON-friendly row dicts: dates as YYYY-MM-DD, missing values as None."""
+    df = df[[column for column in SCORE_COLUMNS if column in df.columns]].copy()
+    df['date'] = pd.to_datetime(df['date'], errors='coerce').dt.strftime('%Y-%m-%d')
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict(orient='records')
+
+def _group(records: List[Dict], key: str) -> Dict[str, List[Dict]]:
+    grouped: Dict[str, List[Dict]] = {}
+    for record in records:
+        grouped.setdefault(record[key], []).append(record)
+    return grouped
+
+class SortedIndex:
+    """Model ids sorted by a numeric value, for range and top-n lookups."""
+
+    def __init__(self, values: Dict[str, float]):
+        pairs = sorted((value, model_id) for model_id, value in values.items() if value is not None)
+        self.values = [value for value, _ in pairs]
+        self.model_ids = [model_id for _, model_id in pairs]
+
+    def between(self, low: Optional[float] = None, high: Optional[float] = None) -> List[str]:
+        """Model ids with low <= value <= high, in ascending order of value."""
+        start = 0 if low is None else bisect_left(self.values, low)
+        end = len(self.values) if high is None else bisect_right(self.values, high)
+        return self.model_ids[start:end]
+
+    def descending(self) -> Iterator[str]:
+        """Model ids from the highest value to the lowest, without copying the index."""
+        return reversed(self.model_ids)
+
+class ModelIndex:
+    """Models, scores and ratings with precomputed lookup indexes."""
+
+    def __init__(self, companies_data: Dict, benchmarks_df: pd.DataFrame, benchmarks_meta: List[Dict]):
+        # Models by id, company and type
+        self.models: Dict[str, Dict] = {}
+        self.companies: Dict[str, Dict] = {}
+        self.models_by_company: Dict[str, List[str]] = {}
+        self.models_by_type: Dict[str, List[str]] = {}
+        for company in companies_data['companies']:
+            self.companies[company['id']] = {'id': company['id'], 'name': company['name']}
+            for model in company.get('models', []):
+                specs = model.get('specs') or {}
+                record = {
+                    'id': model['id'],
+                    'name': model['name'],
+                    'type': model.get('type'),
+                    'company_id': company['id'],
+                    'company': company['name'],
+                    'input_price': specs.get('pricingInputPerM'),
+                    'output_price': specs.get('pricingOutputPerM'),
+                    'ratings': dict(model.get('ratings') or {}),
+                }
+                self.models[model['id']] = record
+                self.models_by_company.setdefault(company['id'], []).append(model['id'])
+                self.models_by_type.setdefault(record['type'], []).append(model['id'])
+
+        # Benchmarks by id and category
+        self.benchmarks = {benchmark['benchmark_id']: benchmark for benchmark in benchmarks_meta}
+        self.benchmarks_by_category: Dict[str, List[str]] = {}
+        for benchmark in benchmarks_meta:
+            self.benchmarks_by_category.setdefault(benchmark['benchmark_category'], []).append(
+                benchmark['benchmark_id'])
+
+        # Scores by model and benchmark: every row, and the latest per pair
+        # (as used for the ratings and leaderboards)
+        all_scores = _records(benchmarks_df)
+        latest = _records(deduplicate_scores(benchmarks_df, dict.fromkeys(benchmarks_df['model_id'].dropna())))
+        self.scores_by_model = _group(all_scores, 'model_id')
+        self.scores_by_benchmark = _group(all_scores, 'benchmark_id')
+        self.latest_by_model = _group(latest, 'model_id')
+        self.latest_by_benchmark = _group(latest, 'benchmark_id')
+
+        # Sorted indexes over prices and the numeric rating fields (not the
+        # boolean *_frontier flags)
+        self.prices = {kind: {model_id: self._price(model, kind) for model_id, model in self.models.items()}
+                       for kind in PRICE_KINDS}
+        self.price_indexes = {kind: SortedIndex(prices) for kind, prices in self.prices.items()}
+        fields = sorted({field for model in self.models.values() for field, value in model['ratings'].items()
+                         if isinstance(value, numbers.Real) and not isinstance(value, bool)})
+        self.rating_indexes = {field: SortedIndex({model_id: model['ratings'].get(field)
+                                                   for model_id, model in self.models.items()})
+                               for field in fields}
+
+    @classmethod
+    def load(cls, data_file: str = 'data/data.json', scores_file: str = 'public/data/benchmarks.csv',
+             meta_file: str = 'public/data/benchmarks-meta.json') -> 'ModelIndex':
+        """Build the index from the project's data files."""
+        return cls(*load_data(data_file, scores_file, meta_file))
+
+    @staticmethod
+    def _price(model: Dict, kind: str) -> Optional[float]:
+        input_price, output_price = model['input_price'], model['output_price']
+        if kind == 'input':
+            return input_price
+        if kind == 'output':
+            return output_price
+        if input_price is None or output_price is None:
+            return None
+        return (PRICING_INPUT_WEIGHT * input_price) + (PRICING_OUTPUT_WEIGHT * output_price)
+
+    def model(self, model_id: str) -> Optional[Dict]:
+        return self.models.get(model_id)
+
+    def company_models(self, company_id: str) -> List[Dict]:
+        return [self.models[model_id] for model_id in self.models_by_company.get(company_id, [])]
+
+    def scores_for_model(self, model_id: str, latest_only: bool = False) -> List[Dict]:
+        return (self.latest_by_model if latest_only else self.scores_by_model).get(model_id, [])
+
+    def scores_for_benchmark(self, benchmark_id: str, latest_only: bool = False) -> List[Dict]:
+        return (self.latest_by_benchmark if latest_only else self.scores_by_benchmark).get(benchmark_id, [])
+
+    def category_benchmarks(self, category: str) -> List[Dict]:
+        return [self.benchmarks[benchmark_id] for benchmark_id in self.benchmarks_by_category.get(category, [])]
+
+    def models_in_price_range(self, min_price: Optional[float] = None, max_price: Optional[float] = None,
+                              price: str = 'input', model_type: Optional[str] = None) -> List[Dict]:
+        """Models priced within [min_price, max_price] per million tokens, cheapest first."""
+        if price not in PRICE_KINDS:
+            raise ValueError(f"Unknown price kind: {price}")
+        model_ids = self.price_indexes[price].between(min_price, max_price)
+        return [self.models[model_id] for model_id in model_ids
+                if model_type is None or self.models[model_id]['type'] == model_type]
+
+    def top_models(self, field: str, n: int = 10, max_price: Optional[float] = None, price: str = 'input',
+                   model_type: Optional[str] = None) -> List[Dict]:
+        """The n highest-rated models on a rating field, optionally under a price and of one type.
+
+        Walks the field's sorted index from the top, checking each model's
+        price and type as it goes, and stops at the n-th match.
+        """
+        if field not in self.rating_indexes:
+            raise ValueError(f"Unknown rating field: {field}")
+        if price not in PRICE_KINDS:
+            raise ValueError(f"Unknown price kind: {price}")
+
+        prices = self.prices[price]
+        top = []
+        for model_id in self.rating_indexes[field].descending():
+            if max_price is not None and (prices[model_id] is None or prices[model_id] > max_price):
+                continue
+            if model_type is not None and self.models[model_id]['type'] != model_type:
+                continue
+            top.append(self.models[model_id])
+            if len(top) == n:
+                break
+        return top
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """Read-only JSON routes over a ModelIndex (set as the server's ``index``)."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            status, body = self._route(self.server.index, parts, query)
+        except ValueError as e:
+            status, body = 400, {'error': str(e)}
+
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    @staticmethod
+    def _number(query: Dict[str, str], key: str) -> Optional[float]:
+        return float(query[key]) if query.get(key) else None
+
+    def _route(self, index: ModelIndex, parts: List[str], query: Dict[str, str]) -> Tuple[int, object]:
+        latest = query.get('latest') in ('1', 'true')
+        price = query.get('price', 'input')
+
+        if parts == ['models']:
+            return 200, index.models_in_price_range(self._number(query, 'min_price'),
+                                                    self._number(query, 'max_price'),
+                                                    price=price, model_type=query.get('type'))
+        if len(parts) == 2 and parts[0] == 'models':
+            model = index.model(parts[1])
+            return (200, model) if model else (404, {'error': f"Unknown model: {parts[1]}"})
+        if len(parts) == 3 and parts[0] == 'models' and parts[2] == 'scores':
+            return 200, index.scores_for_model(parts[1], latest_only=latest)
+        if len(parts) == 3 and parts[0] == 'companies' and parts[2] == 'models':
+            if parts[1] not in index.companies:
+                return 404, {'error': f"Unknown company: {parts[1]}"}
+            return 200, index.company_models(parts[1])
+        if len(parts) == 3 and parts[0] == 'benchmarks' and parts[2] == 'scores':
+            return 200, index.scores_for_benchmark(parts[1], latest_only=latest)
+        if len(parts) == 3 and parts[0] == 'categories' and parts[2] == 'benchmarks':
+            return 200, index.category_benchmarks(parts[1])
+        if parts == ['top']:
+            return 200, index.top_models(query.get('field', ''), n=int(query.get('n', 10)),
+                                         max_price=self._number(query, 'max_price'), price=price,
+                                         model_type=query.get('type'))
+        return 404, {'error': f"Unknown route: /{'/'.join(parts)}"}
+
+    def log_message(self, format, *args):
+        print(f"{self.address_string()} {format % args}")
+
+def serve(index: ModelIndex, host: str = '127.0.0.1', port: int = 8765):
+    """Serve the index over HTTP until interrupted."""
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.index = index
+    print(f"Serving {len(index.models)} models on http://{host}:{port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        server.server_close()
+
+def main(argv: Optional[List[str]] = None):
+    """Answer a query from the command line, or serve the index over HTTP."""
+    parser = argparse.ArgumentParser(description="Query models, scores and ratings.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="Serve the query API over HTTP")
+    serve_parser.add_argument('--host', default='127.0.0.1', help="Interface to bind (default: %(default)s)")
+    serve_parser.add_argument('--port', type=int, default=8765, help="Port (default: %(default)s)")
+
+    top_parser = commands.add_parser('top', help="Highest-rated models on a rating field")
+    top_parser.add_argument('field', help="Rating field, e.g. coding or pricing_cost")
+    top_parser.add_argument('-n', type=int, default=10, help="Number of models (default: %(default)s)")
+    top_parser.add_argument('--max-price', type=float, help="Maximum price per million tokens")
+    top_parser.add_argument('--price', choices=PRICE_KINDS, default='input',
+                            help="Price used for --max-price (default: %(default)s)")
+    top_parser.add_argument('--type', help="Only models of this type")
+
+    scores_parser = commands.add_parser('scores', help="Benchmark scores of a model")
+    scores_parser.add_argument('model_id')
+    scores_parser.add_argument('--latest', action='store_true', help="Only the latest score per benchmark")
+    args = parser.parse_args(argv)
+
+    try:
+        index = ModelIndex.load()
+    except FileNotFoundError as e:
+        print(f"Error: Could not find required data file - {e}")
+        print("Make sure you're running this script from the project root directory.")
+        sys.exit(1)
+
+    if args.command == 'serve':
+        serve(index, args.host, args.port)
+    elif args.command == 'top':
+        for rank, model in enumerate(index.top_models(args.field, n=args.n, max_price=args.max_price,
+                                                      price=args.price, model_type=args.type), start=1):
+            print(f"{rank:>3}. {model['name']:<32} {model['ratings'][args.field]:>5}  "
+                  f"${model['input_price']}/${model['output_price']} per M  ({model['company']})")
+    else:
+        for score in index.scores_for_model(args.model_id, latest_only=args.latest):
+            print(f"{score['benchmark_id']:<28} {score['score']!s:>8}  {score['date']}  {score['source_name']}")
+
+if __name__ == '__main__':
+    main()
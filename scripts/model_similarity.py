@@ -0,0 +1,144 @@
+"""
+Nearest-neighbour index of comparable models for the compare view.
+
+Each rated model is described by a feature vector:
+- its normalized score (0-1) on every benchmark, from normalize_and_rate_benchmarks
+- its category ratings, rescaled from 1-5 to 0-1
+
+Most models have scores on only some benchmarks, so every pair is compared
+on the features both have. Similarity is one minus the root mean squared
+difference over those shared features, shrunk towards 0 when they are few:
+
+    similarity = (1 - rms) * overlap / (overlap + OVERLAP_SHRINKAGE)
+
+so two models agreeing on three benchmarks rank below two agreeing on
+thirty. Pairs sharing fewer than MIN_OVERLAP features are not neighbours.
+
+The masked sums come from two matrix products per block of rows:
+
+    overlap                       = M M^T
+    sum (xi - xj)^2 over shared   = X2 M^T + M X2^T - 2 X X^T
+                                  = [X2 M X] [M X2 -2X]^T
+
+with X the features (0 where missing), X2 its square and M the 0/1 mask. The
+matrix is never held whole: rows are processed in blocks of about
+BLOCK_ELEMENTS / models rows against all models, and each block keeps only
+its top-k. Memory is a few copies of the feature matrix plus a few
+BLOCK_ELEMENTS-sized blocks, never models x models: 20,000 models with 500
+benchmarks take about 40 s and 1 GB on one core.
+
+The output is a small JSON file:
+
+    {"k": 10, "neighbours": {"gpt-5": [{"id": "o3", "similarity": 0.8123, "overlap": 31}, ...], ...}}
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from build_cache import write_if_changed
+
+DEFAULT_NEIGHBOURS = 10
+MIN_OVERLAP = 3
+OVERLAP_SHRINKAGE = 3.0
+BLOCK_ELEMENTS = 4_000_000
+
+def build_features(rated_df: pd.DataFrame, benchmark_ratings: Dict[str, Dict[str, float]]
+                   ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Model ids, feature matrix (0 where missing) and 0/1 mask of present features."""
+    model_ids = list(benchmark_ratings)
+    model_index = pd.Index(model_ids)
+
+    # Normalized scores of valid ratings, one column per benchmark
+    rated = rated_df[rated_df['rating_1_to_5'] > 0]
+    rows = model_index.get_indexer(rated['model_id'])
+    benchmark_codes, benchmarks = pd.factorize(rated['benchmark_id'], sort=True)
+    known = rows >= 0
+
+    categories = sorted({category for ratings in benchmark_ratings.values() for category in ratings})
+    n_features = len(benchmarks) + len(categories)
+    features = np.zeros((len(model_ids), n_features))
+    mask = np.zeros((len(model_ids), n_features))
+    features[rows[known], benchmark_codes[known]] = rated['normalized_score'].to_numpy()[known]
+    mask[rows[known], benchmark_codes[known]] = 1.0
+
+    # Category ratings rescaled to 0-1
+    for offset, category in enumerate(categories, start=len(benchmarks)):
+        values = np.array([np.nan if benchmark_ratings[model_id].get(category) is None
+                           else benchmark_ratings[model_id][category] for model_id in model_ids])
+        present = ~np.isnan(values)
+        features[present, offset] = (values[present] - 1) / 4
+        mask[present, offset] = 1.0
+
+    return model_ids, features, mask
+
+def nearest_neighbours(features: np.ndarray, mask: np.ndarray, k: int = DEFAULT_NEIGHBOURS,
+                       block_rows: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Top-k neighbours of every row as (indices, similarities, overlaps), best first.
+
+    Entries without a neighbour (fewer than k models share MIN_OVERLAP
+    features with the row) have index -1.
+    """
+    n_models = len(features)
+    k = min(k, max(n_models - 1, 0))
+    block_rows = block_rows or max(1, BLOCK_ELEMENTS // max(n_models, 1))
+
+    # Left and right factors of the masked squared-difference product
+    squares = features * features
+    left = np.hstack([squares, mask, features])
+    right = np.hstack([mask, squares, -2 * features]).T
+    del squares
+    mask_t = mask.T
+    indices = np.full((n_models, k), -1, dtype='int64')
+    similarities = np.zeros((n_models, k))
+    overlaps = np.zeros((n_models, k), dtype='int64')
+
+    for start in range(0, n_models, block_rows):
+        stop = min(start + block_rows, n_models)
+        block = slice(start, stop)
+
+        overlap = mask[block] @ mask_t
+        squared_diff = left[block] @ right
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rms = np.sqrt(np.maximum(squared_diff, 0) / overlap)
+        similarity = (1 - rms) * overlap / (overlap + OVERLAP_SHRINKAGE)
+
+        # Exclude the model itself and pairs with too little in common
+        similarity[overlap < MIN_OVERLAP] = -np.inf
+        similarity[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+        if k == 0:
+            continue
+        # Top-k per row: partition, then sort the k candidates (ties by index for stable output)
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        top_similarity = np.take_along_axis(similarity, top, axis=1)
+        order = np.lexsort((top, -top_similarity), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_similarity = np.take_along_axis(top_similarity, order, axis=1)
+
+        found = np.isfinite(top_similarity)
+        indices[block] = np.where(found, top, -1)
+        similarities[block] = np.where(found, top_similarity, 0.0)
+        overlaps[block] = np.where(found, np.take_along_axis(overlap, top, axis=1), 0)
+
+    return indices, similarities, overlaps
+
+def build_neighbour_index(rated_df: pd.DataFrame, benchmark_ratings: Dict[str, Dict[str, float]],
+                          k: int = DEFAULT_NEIGHBOURS, block_rows: Optional[int] = None) -> Dict:
+    """The neighbour document (see module docstring) for every rated model."""
+    model_ids, features, mask = build_features(rated_df, benchmark_ratings)
+    indices, similarities, overlaps = nearest_neighbours(features, mask, k=k, block_rows=block_rows)
+
+    neighbours = {}
+    for model_id, row_indices, row_similarities, row_overlaps in zip(model_ids, indices, similarities, overlaps):
+        neighbours[model_id] = [{'id': model_ids[index], 'similarity': round(float(similarity), 4),
+                                 'overlap': int(overlap)}
+                                for index, similarity, overlap in zip(row_indices, row_similarities, row_overlaps)
+                                if index >= 0]
+    return {'k': k, 'neighbours': neighbours}
+
+def write_neighbour_index(index: Dict, output_file: str) -> bool:
+    """Write the neighbour index; returns True if the file changed."""
+    return write_if_changed(output_file, json.dumps(index, ensure_ascii=False, separators=(',', ':')))
@@ -0,0 +1,280 @@
+"""
+Head-to-head (Bradley-Terry) category ratings (--rating-mode pairwise).
+
+The default category rating averages per-benchmark min-max ratings, so a
+single outlier stretches a benchmark's scale and a model's rating depends on
+which benchmarks it happened to be run on. This mode rates models by whom
+they beat instead:
+- every two models scored on the same benchmark play one game, won by the
+  higher score (a tie is half a win each)
+- within a category, each model gets a Bradley-Terry strength p so that
+  P(i beats j) = p_i / (p_i + p_j) best explains all its games
+
+Games are aggregated into a sparse table of distinct model pairs (games
+played per pair) plus wins per model; per-benchmark wins come from score
+ranks without enumerating pairs. The log-strengths theta maximize
+
+    sum_i W_i theta_i - sum_(i<j) n_ij log(e^theta_i + e^theta_j)
+        - PRIOR_GAMES * (log(e^theta_i + 1) - theta_i / 2)
+
+by Newton's method. The Hessian is a weighted graph Laplacian over the pair
+table plus a diagonal, so each Newton step is solved by preconditioned
+conjugate gradients whose products are two bincounts over the pair table;
+nothing models x models is ever formed. (The classic MM iteration needs tens
+of thousands of passes here, because models that win nearly every game
+have very large strengths.)
+
+The prior is one virtual drawn game per model against a reference model of
+strength 1. It keeps models that won (or lost) every game finite and pins
+the scale. Strengths are saved in a state file and the next run starts
+from them: unchanged scores need no Newton step at all, a few changed
+scores a handful.
+
+A strength is reported on the usual 1-5 scale as the chance of beating a
+model of the category's geometric-mean strength:
+
+    rating = 1 + 4 * p_i / (p_i + g) = 1 + 4 / (1 + exp(mean(theta) - theta_i))
+
+Models without a game in a category get no rating there. Games grow with
+the square of the models per benchmark, while each step costs a few passes
+over the distinct pairs, at most models^2 / 2 per category. The checked-in
+data takes about 40 ms; 10,000 models with 1,000 scores per benchmark
+(7.6 million distinct pairs per category) take about 80 s cold and 10 s
+warm on one core.
+"""
+
+import json
+import os
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from build_cache import write_if_changed
+from calculate_model_ratings import coerce_scores
+
+STATE_VERSION = 1
+DEFAULT_STATE_FILE = os.path.join('.cache', 'ratings', 'pairwise-state.json')
+
+PRIOR_GAMES = 1.0
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 100
+PAIR_BUFFER = 20_000_000
+
+def load_state(state_file: Optional[str]) -> Dict[str, Dict[str, float]]:
+    """Log-strengths per category and model from the previous run ({} if missing or stale)."""
+    if not state_file:
+        return {}
+    try:
+        with open(state_file, 'r') as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return state.get('strengths', {}) if state.get('version') == STATE_VERSION else {}
+
+def save_state(state_file: str, strengths: Dict[str, Dict[str, float]]):
+    """Persist this run's log-strengths to warm-start the next run."""
+    os.makedirs(os.path.dirname(state_file) or '.', exist_ok=True)
+    write_if_changed(state_file, json.dumps({'version': STATE_VERSION, 'strengths': strengths}))
+
+def _merge_pairs(keys: np.ndarray, games: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum the games of repeated pair keys."""
+    keys, inverse = np.unique(keys, return_inverse=True)
+    return keys, np.bincount(inverse.ravel(), weights=games, minlength=len(keys))
+
+def _pair_blocks(codes: np.ndarray, n_models: int, max_pairs: int) -> Iterator[np.ndarray]:
+    """Keys min * n_models + max of every two codes, in blocks of whole rows of about max_pairs pairs.
+
+    Row i pairs with every later row, so a block of rows never holds more
+    than max_pairs pairs unless a single row does.
+    """
+    n = len(codes)
+    per_row = np.arange(n - 1, 0, -1)
+    ends = np.cumsum(per_row)
+    start = 0
+    while start < n - 1:
+        done = ends[start - 1] if start else 0
+        stop = max(start + 1, int(np.searchsorted(ends, done + max_pairs, side='right')))
+        counts = per_row[start:stop]
+        first = np.repeat(np.arange(start, stop), counts)
+        # Within row i the partners run i + 1, i + 2, ...
+        second = np.arange(len(first)) - np.repeat(np.cumsum(counts) - counts, counts) + first + 1
+        a, b = codes[first], codes[second]
+        yield np.minimum(a, b) * n_models + np.maximum(a, b)
+        start = stop
+
+def build_games(scores: pd.DataFrame, n_models: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Wins per model and the (i, j, games) table of distinct pairs with i < j.
+
+    scores has one row per model and benchmark with integer model codes
+    below n_models; scores that do not parse as numbers play no games.
+    Pairs are generated and merged in blocks of about PAIR_BUFFER, so that
+    is the most pairs held besides the distinct ones.
+    """
+    wins = np.zeros(n_models)
+    keys = np.empty(0, dtype='int64')
+    games = np.empty(0)
+    pending_keys, pending = [], 0
+
+    scores = scores.assign(score=coerce_scores(scores['score']))
+    ordered = scores[scores['score'].notna()].sort_values(['benchmark_id', 'score'], kind='stable')
+    for _, block in ordered.groupby('benchmark_id', sort=False):
+        codes = block['code'].to_numpy().astype('int64')
+        if len(codes) < 2:
+            continue
+
+        # Wins from ranks: every lower score is a win, every other equal score half a win
+        values = block['score'].to_numpy()
+        below = np.searchsorted(values, values, side='left')
+        equal = np.searchsorted(values, values, side='right') - below - 1
+        np.add.at(wins, codes, below + 0.5 * equal)
+
+        for pair_keys in _pair_blocks(codes, n_models, PAIR_BUFFER):
+            pending_keys.append(pair_keys)
+            pending += len(pair_keys)
+            if pending >= PAIR_BUFFER:
+                pending_keys.append(keys)
+                keys, games = _merge_pairs(np.concatenate(pending_keys),
+                                           np.concatenate([np.ones(pending), games]))
+                pending_keys, pending = [], 0
+
+    if pending:
+        pending_keys.append(keys)
+        keys, games = _merge_pairs(np.concatenate(pending_keys), np.concatenate([np.ones(pending), games]))
+    return wins, keys // n_models, keys % n_models, games
+
+def _log_likelihood(theta: np.ndarray, wins: np.ndarray, first: np.ndarray, second: np.ndarray,
+                    games: np.ndarray) -> float:
+    """Penalized Bradley-Terry log-likelihood of the log-strengths (see module docstring)."""
+    return float(wins @ theta - games @ np.logaddexp(theta[first], theta[second])
+                 - PRIOR_GAMES * np.sum(np.logaddexp(theta, 0.0) - theta / 2))
+
+def _solve_newton_step(gradient: np.ndarray, first: np.ndarray, second: np.ndarray, weights: np.ndarray,
+                       diagonal: np.ndarray, curvature: np.ndarray, tolerance: float) -> np.ndarray:
+    """Solve (L + diag) x = gradient by Jacobi-preconditioned conjugate gradients.
+
+    L is the graph Laplacian of the pair table with the given edge weights
+    and curvature the diagonal of L + diag.
+    """
+    n_models = len(gradient)
+
+    def product(x):
+        flow = weights * (x[first] - x[second])
+        return (np.bincount(first, weights=flow, minlength=n_models)
+                - np.bincount(second, weights=flow, minlength=n_models) + diagonal * x)
+
+    x = gradient / curvature
+    residual = gradient - product(x)
+    z = residual / curvature
+    direction = z
+    rz = residual @ z
+    for _ in range(n_models):
+        if np.max(np.abs(residual)) < tolerance:
+            break
+        step = product(direction)
+        alpha = rz / (direction @ step)
+        x += alpha * direction
+        residual -= alpha * step
+        z = residual / curvature
+        rz, previous_rz = residual @ z, rz
+        direction = z + (rz / previous_rz) * direction
+    return x
+
+def fit_strengths(wins: np.ndarray, first: np.ndarray, second: np.ndarray, games: np.ndarray,
+                  initial: Optional[np.ndarray] = None, tolerance: float = TOLERANCE,
+                  max_iterations: int = MAX_ITERATIONS) -> Tuple[np.ndarray, int]:
+    """Bradley-Terry log-strengths by Newton-CG (see module docstring); returns (log-strengths, steps).
+
+    Entries of initial that are NaN (or all of them, without initial) start
+    from the log of the model's win-loss ratio.
+    """
+    n_models = len(wins)
+    played = (np.bincount(first, weights=games, minlength=n_models)
+              + np.bincount(second, weights=games, minlength=n_models))
+    theta = np.log((wins + 0.5) / (played - wins + 0.5))
+    if initial is not None:
+        theta = np.where(np.isnan(initial), theta, initial)
+    likelihood = _log_likelihood(theta, wins, first, second, games)
+
+    steps = 0
+    while steps < max_iterations:
+        # P(first beats second) per pair and of beating the reference per model
+        pair_win = 1 / (1 + np.exp(theta[second] - theta[first]))
+        reference_win = 1 / (1 + np.exp(-theta))
+        expected = games * pair_win
+        gradient = (wins - np.bincount(first, weights=expected, minlength=n_models)
+                    - np.bincount(second, weights=games - expected, minlength=n_models)
+                    - PRIOR_GAMES * (reference_win - 0.5))
+        weights = games * pair_win * (1 - pair_win)
+        diagonal = PRIOR_GAMES * reference_win * (1 - reference_win)
+        curvature = (np.bincount(first, weights=weights, minlength=n_models)
+                     + np.bincount(second, weights=weights, minlength=n_models) + diagonal)
+
+        # Converged once the step would be below tolerance; the likelihood change is rounding noise there
+        if not n_models or np.max(np.abs(gradient) / curvature) < tolerance:
+            break
+
+        # Inexact Newton: solve loosely while far from the optimum, tightly near it
+        largest = np.max(np.abs(gradient))
+        delta = _solve_newton_step(gradient, first, second, weights, diagonal, curvature,
+                                   largest * min(0.5, np.sqrt(largest)))
+
+        # Halve the step until the likelihood does not decrease (beyond rounding)
+        scale = 1.0
+        candidate = theta + delta
+        candidate_likelihood = _log_likelihood(candidate, wins, first, second, games)
+        while candidate_likelihood < likelihood - 1e-12 * abs(likelihood):
+            scale /= 2
+            if scale < 1e-6:
+                return theta, steps
+            candidate = theta + scale * delta
+            candidate_likelihood = _log_likelihood(candidate, wins, first, second, games)
+        theta, likelihood = candidate, candidate_likelihood
+        steps += 1
+    return theta, steps
+
+def calculate_pairwise_category_ratings(rated_df: pd.DataFrame, models: Dict, benchmark_categories: Dict,
+                                        state_file: Optional[str] = DEFAULT_STATE_FILE
+                                        ) -> Dict[str, Dict[str, Optional[float]]]:
+    """Bradley-Terry 1-5 rating per model and category, like calculate_benchmark_category_ratings.
+
+    rated_df is the output of normalize_and_rate_benchmarks; only rows with
+    a valid rating play. With state_file, the fit starts from the strengths
+    saved there and the new strengths are saved back.
+    """
+    previous = load_state(state_file)
+    all_categories = set(benchmark_categories.values())
+    benchmark_ratings: Dict[str, Dict[str, Optional[float]]] = {
+        model_id: {category: None for category in all_categories} for model_id in models}
+
+    valid = rated_df[(rated_df['rating_1_to_5'] > 0) & rated_df['model_id'].isin(models.keys())]
+    valid = valid.assign(category=valid['benchmark_id'].map(benchmark_categories)).dropna(subset=['category'])
+
+    strengths_by_category = {}
+    total_steps = 0
+    for category, scores in valid.groupby('category', sort=True):
+        codes, model_ids = pd.factorize(scores['model_id'])
+        wins, first, second, games = build_games(
+            scores[['benchmark_id', 'score']].assign(code=codes), len(model_ids))
+
+        # Warm start from the previous run's strengths where there are any
+        known = previous.get(category, {})
+        initial = np.array([known.get(model_id, np.nan) for model_id in model_ids])
+        log_strengths, steps = fit_strengths(wins, first, second, games, initial=initial)
+        total_steps += steps
+
+        played = (np.bincount(first, weights=games, minlength=len(model_ids))
+                  + np.bincount(second, weights=games, minlength=len(model_ids))) > 0
+        typical = log_strengths[played].mean() if played.any() else 0.0
+        ratings = 1 + 4 / (1 + np.exp(typical - log_strengths))
+        for model_id, rating, has_games in zip(model_ids, ratings, played):
+            if has_games:
+                benchmark_ratings[model_id][category] = float(rating)
+        strengths_by_category[category] = {model_id: float(value)
+                                           for model_id, value in zip(model_ids, log_strengths)}
+
+    if state_file:
+        save_state(state_file, strengths_by_category)
+    print(f"Pairwise ratings: {len(strengths_by_category)} categories fitted in {total_steps} Newton steps"
+          f"{' (warm start)' if previous else ''}")
+    return benchmark_ratings
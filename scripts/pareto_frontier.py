@@ -0,0 +1,151 @@
+"""
+Price-performance Pareto frontiers per category and model type.
+
+A model is on the frontier of its (category, model type) group when no other
+model of the group is at least as good on both axes and better on one:
+
+- price: the blended list price of pricing_cost, input_weight * input +
+  output_weight * output in USD per million tokens (lower is better)
+- rating: the category rating as published, rounded to 2 decimals
+  (higher is better)
+
+Each group is one sort by (price, -rating) and one scan keeping the best
+rating seen at a lower price, so O(n log n) overall. Models of the group
+without a price or a rating are left out. Every model in a group gets:
+
+- frontier: whether it is on the frontier
+- gap: rating points below the best model at the same or a lower price (0
+  on the frontier)
+- price_ratio: price of the cheapest frontier model rated at least as high,
+  as a share of its own price (1 on the frontier; 0.25 means the same
+  rating is available for a quarter of the price)
+
+data.json gets <field>_frontier and <field>_frontier_gap per category, and
+one file per category, frontiers/<field>.json, holds the frontier and every
+plotted model of each model type, so the front end does no dominance
+checks:
+
+    {"category": "coding", "field": "coding",
+     "types": {"Large Language Model": {"frontier": ["gemini-2-5-flash", "o3"],
+                                        "models": [{"id": "gemini-2-5-flash", "name": "...",
+                                                    "company": "...", "price": 0.9, "rating": 4.2,
+                                                    "frontier": true, "gap": 0.0,
+                                                    "price_ratio": 1.0}, ...]}, ...}}
+
+Standard library only, so the lite engine writes the same annotations.
+"""
+
+import glob
+import json
+import os
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from build_cache import write_if_changed
+from calculate_model_ratings import (
+    PRICING_INPUT_WEIGHT,
+    PRICING_OUTPUT_WEIGHT,
+    TARGET_MODEL_TYPES,
+    rating_field_name,
+)
+
+def blended_price(model: Dict, input_weight: float = PRICING_INPUT_WEIGHT,
+                  output_weight: float = PRICING_OUTPUT_WEIGHT) -> Optional[float]:
+    """The composite list price behind pricing_cost, or None without pricing."""
+    if model['input_price'] is None or model['output_price'] is None:
+        return None
+    return input_weight * model['input_price'] + output_weight * model['output_price']
+
+def skyline(points: List[Tuple[str, float, float]]) -> Tuple[List[str], Dict[str, Dict]]:
+    """Frontier of (id, price, rating) points: the frontier ids by price and each point's annotation.
+
+    Lower price and higher rating are better; models with the same price and
+    rating are either all on the frontier or all off it.
+    """
+    ordered = sorted(points, key=lambda point: (point[1], -point[2], point[0]))
+    frontier: List[Tuple[str, float, float]] = []
+    annotations: Dict[str, Dict] = {}
+
+    best_cheaper = float('-inf')
+    start = 0
+    while start < len(ordered):
+        # One group of equal prices; its first point has the group's best rating
+        stop = start
+        while stop < len(ordered) and ordered[stop][1] == ordered[start][1]:
+            stop += 1
+        group_best = ordered[start][2]
+        best_here = max(best_cheaper, group_best)
+        for model_id, price, rating in ordered[start:stop]:
+            on_frontier = rating == group_best and group_best > best_cheaper
+            if on_frontier:
+                frontier.append((model_id, price, rating))
+            annotations[model_id] = {'frontier': on_frontier, 'gap': round(best_here - rating, 2)}
+        best_cheaper = best_here
+        start = stop
+
+    # Cheapest frontier model rated at least as high: frontier ratings rise with price
+    frontier_ratings = [rating for _, _, rating in frontier]
+    for model_id, price, rating in ordered:
+        match = frontier[bisect_left(frontier_ratings, rating)]
+        annotations[model_id]['price_ratio'] = round(match[1] / price, 4) if price > 0 else 1.0
+    return [model_id for model_id, _, _ in frontier], annotations
+
+def compute_frontiers(models: Dict, benchmark_ratings: Dict[str, Dict[str, Optional[float]]]) -> Dict:
+    """Frontier of every category and model type, and each model's annotations.
+
+    Returns {"frontiers": {category: {model_type: {"frontier": [ids],
+    "models": [...]}}}, "annotations": {model_id: {category: {"frontier",
+    "gap", "price_ratio"}}}}; see the module docstring.
+    """
+    prices = {model_id: blended_price(model) for model_id, model in models.items()}
+    categories = sorted({category for ratings in benchmark_ratings.values() for category in ratings})
+
+    frontiers: Dict[str, Dict[str, Dict]] = {}
+    annotations: Dict[str, Dict[str, Dict]] = {}
+    for category in categories:
+        frontiers[category] = {}
+        for model_type in TARGET_MODEL_TYPES:
+            points = [(model_id, prices[model_id], round(benchmark_ratings[model_id][category], 2))
+                      for model_id, model in models.items()
+                      if model['type'] == model_type and prices[model_id] is not None
+                      and benchmark_ratings[model_id].get(category) is not None]
+            if not points:
+                continue
+
+            frontier_ids, group = skyline(points)
+            for model_id, annotation in group.items():
+                annotations.setdefault(model_id, {})[category] = annotation
+            frontiers[category][model_type] = {
+                'frontier': frontier_ids,
+                'models': [{'id': model_id, 'name': models[model_id]['name'],
+                            'company': models[model_id]['company'], 'price': round(price, 4),
+                            'rating': rating, **group[model_id]}
+                           for model_id, price, rating in sorted(points, key=lambda point: (point[1], -point[2],
+                                                                                            point[0]))],
+            }
+    return {'frontiers': frontiers, 'annotations': annotations}
+
+def frontier_files(output_dir: str) -> List[str]:
+    """Frontier files currently in output_dir."""
+    return sorted(glob.glob(os.path.join(output_dir, '*.json')))
+
+def write_frontiers(frontiers: Dict[str, Dict[str, Dict]], output_dir: str) -> int:
+    """Write one file per category and remove files for categories that no longer exist.
+
+    Returns the number of files written or removed.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    changed = 0
+
+    expected = set()
+    for category, types in frontiers.items():
+        field = rating_field_name(category)
+        path = os.path.join(output_dir, f'{field}.json')
+        expected.add(path)
+        document = {'category': category, 'field': field, 'types': types}
+        changed += write_if_changed(path, json.dumps(document, ensure_ascii=False, separators=(',', ':')))
+
+    for stale in set(frontier_files(output_dir)) - expected:
+        os.remove(stale)
+        changed += 1
+    return changed
@@ -0,0 +1,101 @@
+"""
+Effective API cost of each model under named usage profiles.
+
+pricing_cost rates the list price (70% input + 30% output per million
+tokens). Real bills depend on how a model is used, so each profile describes
+a workload per million visible tokens:
+
+- input_share: fraction of the tokens that are input (the rest is output)
+- cache_hit_ratio: fraction of the input billed at pricingCachedInputPerM
+  (models without a cached price pay pricingInputPerM for all input)
+- reasoning_overhead: hidden reasoning tokens billed per visible output
+  token, for models with reasoningTokens set
+
+Effective cost per million tokens is then
+
+    input_share * (hit * cached + (1 - hit) * input)
+        + (1 - input_share) * output * (1 + overhead * reasoning)
+
+The costs of every model under every profile are computed as one
+models x profiles matrix and rated per profile with the same log curve as
+pricing_cost, giving pricing_cost_<profile> fields (5 = expensive, 1 = cheap).
+NumPy is imported on first use, so the profiles and field names are
+available to the pandas-free lite engine.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+PRICING_PROFILES = {
+    # Interactive chat: balanced turns, little prompt reuse
+    'chat': {'input_share': 0.5, 'cache_hit_ratio': 0.0, 'reasoning_overhead': 0.0},
+    # Retrieval-augmented generation: long shared contexts, short answers
+    'rag': {'input_share': 0.9, 'cache_hit_ratio': 0.5, 'reasoning_overhead': 0.0},
+    # Agent loops: the growing transcript is re-sent and mostly cached
+    'agentic': {'input_share': 0.85, 'cache_hit_ratio': 0.8, 'reasoning_overhead': 1.0},
+    # Hard problems: short prompts, long hidden chains of thought
+    'reasoning': {'input_share': 0.5, 'cache_hit_ratio': 0.2, 'reasoning_overhead': 3.0},
+}
+
+def profile_field_name(profile: str) -> str:
+    """Field name of a profile's rating in data.json and the CSV."""
+    return f'pricing_cost_{profile}'
+
+def effective_costs(models: Dict, profiles: Dict[str, Dict] = PRICING_PROFILES) -> np.ndarray:
+    """Effective cost per million tokens as a models x profiles matrix (NaN without pricing)."""
+    import numpy as np
+
+    def column(key):
+        return np.array([np.nan if model.get(key) is None else model[key] for model in models.values()],
+                        dtype='float64')
+
+    input_price = column('input_price')
+    output_price = column('output_price')
+    cached_price = column('cached_input_price')
+    cached_price = np.where(np.isnan(cached_price), input_price, cached_price)
+    reasoning = np.array([bool(model.get('reasoning_tokens')) for model in models.values()], dtype='float64')
+
+    # Profile parameters as row vectors, broadcast against model columns
+    input_share = np.array([profile['input_share'] for profile in profiles.values()])
+    hit = np.array([profile['cache_hit_ratio'] for profile in profiles.values()])
+    overhead = np.array([profile['reasoning_overhead'] for profile in profiles.values()])
+
+    input_cost = hit * cached_price[:, None] + (1 - hit) * input_price[:, None]
+    output_cost = output_price[:, None] * (1 + overhead * reasoning[:, None])
+    return input_share * input_cost + (1 - input_share) * output_cost
+
+def rate_costs(costs: np.ndarray, offset: float, exponent: float) -> np.ndarray:
+    """Rate every column of a cost matrix like calculate_pricing_ratings (NaN if unpriced)."""
+    import numpy as np
+
+    priced = np.isfinite(costs)
+    log_costs = np.log(np.where(priced, costs, 1.0) + offset)
+    min_log = np.min(np.where(priced, log_costs, np.inf), axis=0)
+    max_log = np.max(np.where(priced, log_costs, -np.inf), axis=0)
+    span = max_log - min_log
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        normalized = np.where(span > 0, (log_costs - min_log) / span, 0.0)
+    ratings = 1.0 + (4.0 * normalized ** exponent)
+
+    # A single priced model sits in the middle, as in calculate_pricing_ratings
+    ratings[:, priced.sum(axis=0) == 1] = 3.0
+    return np.where(priced, ratings, np.nan)
+
+def calculate_profile_pricing_ratings(models: Dict, offset: float, exponent: float,
+                                      profiles: Dict[str, Dict] = PRICING_PROFILES
+                                      ) -> Dict[str, Dict[str, Optional[float]]]:
+    """Rate every model's effective cost under every profile.
+
+    Returns {model_id: {profile: rating or None}}.
+    """
+    import numpy as np
+
+    if not models:
+        return {}
+    ratings = rate_costs(effective_costs(models, profiles), offset, exponent)
+    names: List[str] = list(profiles)
+    return {model_id: {profile: (None if np.isnan(value) else float(value))
+                       for profile, value in zip(names, row)}
+            for model_id, row in zip(models, ratings)}
@@ -6,10 +6,25 @@ This script:
 1. Reads benchmark data from Excel file and converts to CSV and JSON formats
 2. Automatically runs model ratings calculation to generate comprehensive ratings
 3. Provides a complete data processing pipeline for the web application
+
+The ratings step runs in-process: the DataFrames read from the workbook are
+handed straight to calculate_model_ratings, so nothing is re-read from disk.
+
+Builds are cached on content hashes of the inputs (see build_cache.py): a run
+with unchanged inputs exits without importing pandas, and outputs are only
+rewritten when their bytes change. Pass --force to rebuild regardless.
+
+With --watch the script keeps running, polls the workbook and data.json for
+changes and rebuilds after each burst of saves, with pandas, the parsed
+sheets and the incremental ratings state kept warm between rebuilds.
 """
+import argparse
+import glob
 import os
-import pandas as pd
 import json
+import time
+
+from build_cache import BuildCache, data_json_inputs_hash, pipeline_code_hash, write_if_changed
 
 # ─── CONFIG ─────────────────────────────────────────────────────────────────────
 # Adjust these if your folder layout differs
@@ -21,23 +36,96 @@ XLSX_FILE         = os.path.join(DATA_DIR, 'benchmarks.xlsx')
 # Output paths
 CSV_OUT           = os.path.join(PUBLIC_DATA_DIR, 'benchmarks.csv')
 JSON_OUT          = os.path.join(PUBLIC_DATA_DIR, 'benchmarks-meta.json')
+BIN_OUT           = os.path.join(PUBLIC_DATA_DIR, 'benchmarks.bin')
+LEADERBOARD_DIR   = os.path.join(PUBLIC_DATA_DIR, 'leaderboards')
+FRONTIER_DIR      = os.path.join(PUBLIC_DATA_DIR, 'frontiers')
+MODELS_INDEX      = os.path.join(PUBLIC_DATA_DIR, 'models-index.json')
+NEIGHBOURS_JSON   = os.path.join(PUBLIC_DATA_DIR, 'model-neighbours.json')
+PREDICTED_SCORES  = os.path.join(PUBLIC_DATA_DIR, 'predicted-scores.json')
+COMPANY_SHARD_DIR = os.path.join(PUBLIC_DATA_DIR, 'companies')
+DATA_JSON         = os.path.join(DATA_DIR, 'data.json')
+RATINGS_CSV       = os.path.join(PUBLIC_DATA_DIR, 'model_ratings.csv')
+
+# Build cache (parsed sheets + manifest of the last successful build)
+CACHE_DIR         = os.path.join(PROJECT_ROOT, '.cache', 'benchmarks')
+RATINGS_STATE     = os.path.join(PROJECT_ROOT, '.cache', 'ratings', 'incremental-state.pkl')
+OUTPUT_FILES      = [CSV_OUT, JSON_OUT, DATA_JSON, RATINGS_CSV, MODELS_INDEX, NEIGHBOURS_JSON]
 
 # Sheet names
 SHEET_SCORES      = 'benchmarks'
 SHEET_META        = 'benchmark-meta'
 
 # ─── SCRIPT ─────────────────────────────────────────────────────────────────────
-def main():
+def excel_engine():
+    """Use the Rust calamine reader when installed, otherwise pandas' default (openpyxl)."""
+    try:
+        import python_calamine  # noqa: F401  (optional dependency)
+        return 'calamine'
+    except ImportError:
+        return None
+
+def read_sheets(cache, xlsx_hash, timer, xlsx_file=XLSX_FILE):
+    """Return the raw (scores, meta) sheets, from the build cache when possible.
+
+    On a cache miss the workbook is opened and its archive indexed once, and
+    each sheet is parsed from that open handle.
+    """
+    cached = cache.load_sheets(xlsx_hash)
+    if cached is not None:
+        print(f'✔ Using cached sheets for {os.path.basename(xlsx_file)}')
+        return cached
+
+    import pandas as pd
+
+    engine = excel_engine()
+    sheets = {}
+    with timer.stage('open_workbook'):
+        workbook = pd.ExcelFile(xlsx_file, engine=engine)
+    with workbook:
+        for sheet_name in (SHEET_SCORES, SHEET_META):
+            start = time.perf_counter()
+            with timer.stage(f'read_sheet_{sheet_name}') as stage:
+                sheets[sheet_name] = workbook.parse(sheet_name)
+                stage['rows'] = len(sheets[sheet_name])
+            print(f'✔ Parsed sheet "{sheet_name}": {len(sheets[sheet_name])} rows '
+                  f'in {(time.perf_counter() - start) * 1000:.1f} ms ({workbook.engine})')
+
+    df_scores, df_meta = sheets[SHEET_SCORES], sheets[SHEET_META]
+    cache.store_sheets(xlsx_hash, (df_scores, df_meta))
+    return df_scores, df_meta
+
+def main(timer, cache, xlsx_hash):
+    """Convert the workbook to CSV/JSON and return the scores DataFrame and meta records."""
     # Ensure the output directory exists
     os.makedirs(PUBLIC_DATA_DIR, exist_ok=True)
 
-    # 1) Read the "scores" sheet and dump to CSV
-    df_scores = pd.read_excel(XLSX_FILE, sheet_name=SHEET_SCORES)
-    df_scores.to_csv(CSV_OUT, index=False)
-    print(f'✔ Written {len(df_scores)} rows to {CSV_OUT}')
+    with timer.stage('read_sheets') as stage:
+        df_scores, df_meta = read_sheets(cache, xlsx_hash, timer)
+        stage['rows'] = len(df_scores)
+
+    return export_sheets(df_scores, df_meta, timer)
+
+def export_sheets(df_scores, df_meta, timer, csv_out=CSV_OUT, json_out=JSON_OUT, bin_out=BIN_OUT):
+    """Write the scores CSV, the columnar scores and the meta JSON; return the scores and meta records."""
+    import pandas as pd
 
-    # 2) Read the "meta" sheet
-    df_meta = pd.read_excel(XLSX_FILE, sheet_name=SHEET_META)
+    # 1) Dump the "scores" sheet to CSV
+    with timer.stage('write_scores_csv') as stage:
+        written = write_if_changed(csv_out, df_scores.to_csv(index=False))
+        stage['rows'] = len(df_scores)
+    print(f'✔ {"Written" if written else "Unchanged"} {len(df_scores)} rows to {csv_out}')
+
+    # Compact columnar copy of the scores for the front-end
+    from export_scores import write_columnar_scores
+
+    with timer.stage('write_columnar_scores') as stage:
+        sizes = write_columnar_scores(df_scores, bin_out)
+        stage['rows'] = len(df_scores)
+    print('✔ Columnar scores: ' + ', '.join(f'{os.path.basename(path)} {size / 1024:.1f} KB'
+                                          for path, size in sizes.items()))
+
+    # 2) Process the "meta" sheet
+    df_meta = df_meta.copy()
 
     # Handle featured_benchmark as boolean
     if 'featured_benchmark' in df_meta.columns:
@@ -55,63 +143,124 @@ def main():
         # Convert empty strings to None
         df_meta['benchmark_description'] = df_meta['benchmark_description'].replace('', None)
 
-    # Normalize other missing values to None (null in JSON)
-    df_meta = df_meta.where(pd.notnull(df_meta), None)
+    # Score ranges: whole numbers stay integers, a blank side is unbounded (see validate_scores.py)
+    for column in ('score_min', 'score_max'):
+        if column in df_meta.columns:
+            df_meta[column] = pd.Series([None if pd.isna(value) else int(value) if float(value).is_integer()
+                                         else float(value) for value in df_meta[column]],
+                                        index=df_meta.index, dtype=object)
+
+    # Normalize other missing values to None (null in JSON); object dtype so
+    # float columns cannot turn None back into NaN
+    df_meta = df_meta.astype(object).where(pd.notnull(df_meta), None)
 
     # Convert to records and write JSON
     records = df_meta.to_dict(orient='records')
-    with open(JSON_OUT, 'w', encoding='utf-8') as f:
-        json.dump(records, f, ensure_ascii=False, indent=2)
-    print(f'✔ Written {len(records)} meta entries to {JSON_OUT}')
-
-def run_model_ratings():
-    """Run the model ratings calculation after processing benchmarks."""
-    import subprocess
-    import sys
+    with timer.stage('write_meta_json') as stage:
+        written = write_if_changed(json_out, json.dumps(records, ensure_ascii=False, indent=2))
+        stage['rows'] = len(records)
+    print(f'✔ {"Written" if written else "Unchanged"} {len(records)} meta entries to {json_out}')
+
+    return df_scores, records
+
+def run_model_ratings(df_scores, meta_records, companies_data, timer, incremental=False, uncertainty=0,
+                      complete=0, fail_on='error', validation_report=None):
+    """Run the model ratings calculation in-process on the freshly processed benchmarks.
+
+    The scores are validated first; issues of the fail_on severity or worse
+    stop the ratings (see validate_scores.py).
+    """
+    from calculate_model_ratings import run_ratings_pipeline
     
     print("\n" + "="*60)
     print("Running model ratings calculation...")
     print("="*60)
     
     try:
-        # Run the model ratings script
-        result = subprocess.run([
-            sys.executable, 
-            'scripts/calculate_model_ratings.py'
-        ], capture_output=True, text=True, check=True)
-        
-        # Print the output
-        print(result.stdout)
-        if result.stderr:
-            print("Warnings/Errors:")
-            print(result.stderr)
+        run_ratings_pipeline(companies_data, df_scores, meta_records,
+                             data_file=DATA_JSON, ratings_csv=RATINGS_CSV, timer=timer,
+                             incremental_state=RATINGS_STATE if incremental else None,
+                             leaderboard_dir=LEADERBOARD_DIR, shard_dir=PUBLIC_DATA_DIR,
+                             neighbours_file=NEIGHBOURS_JSON, frontier_dir=FRONTIER_DIR,
+                             bootstrap_resamples=uncertainty,
+                             completion_rank=complete, predictions_file=PREDICTED_SCORES if complete else None,
+                             fail_on=fail_on, validation_report=validation_report)
             
         print("Model ratings calculation completed successfully!")
         
-    except subprocess.CalledProcessError as e:
-        print(f"Error running model ratings calculation: {e}")
-        print(f"Return code: {e.returncode}")
-        if e.stdout:
-            print(f"Output: {e.stdout}")
-        if e.stderr:
-            print(f"Error output: {e.stderr}")
-        return False
     except Exception as e:
-        print(f"Unexpected error: {e}")
+        print(f"Error running model ratings calculation: {e}")
+        import traceback
+        traceback.print_exc()
         return False
     
     return True
 
-if __name__ == '__main__':
+def output_files():
+    """List every output of the pipeline that currently exists or must exist."""
+    return (OUTPUT_FILES
+            + sorted(glob.glob(BIN_OUT + '*'))
+            + sorted(glob.glob(PREDICTED_SCORES))
+            + sorted(glob.glob(os.path.join(LEADERBOARD_DIR, '*.json')))
+            + sorted(glob.glob(os.path.join(FRONTIER_DIR, '*.json')))
+            + sorted(glob.glob(os.path.join(COMPANY_SHARD_DIR, '*.json'))))
+
+def build_key(xlsx_hash, companies_data, uncertainty=0, code_hash=None, complete=0, fail_on='error'):
+    """Key a build on the content of every input."""
+    key = '-'.join([xlsx_hash, data_json_inputs_hash(companies_data), code_hash or pipeline_code_hash()])
+    if uncertainty:
+        # Interval fields change the outputs, so they are part of the build key
+        key += f'-bootstrap{uncertainty}'
+    if complete:
+        key += f'-complete{complete}'
+    if fail_on != 'error':
+        # A build that let validation issues through must not count as checked at a stricter level
+        key += f'-failon-{fail_on}'
+    return key
+
+def run_pipeline(force=False, incremental=False, uncertainty=0, report_file=None, profile_file=None, complete=0,
+                 fail_on='error', validation_report=None):
+    """Run the full pipeline unless the build cache shows the outputs are current.
+
+    report_file receives the per-stage JSON report, profile_file the
+    cProfile stats of the slowest stage (see StageTimer) and
+    validation_report the score validation report; none of them is written
+    when the build cache makes the run a no-op.
+    """
+    start = time.perf_counter()
+    cache = BuildCache(CACHE_DIR)
+
+    xlsx_hash = cache.file_hash(XLSX_FILE)
+    with open(DATA_JSON, 'r', encoding='utf-8') as f:
+        companies_data = json.load(f)
+    inputs_key = build_key(xlsx_hash, companies_data, uncertainty, complete=complete, fail_on=fail_on)
+
+    if not force and cache.is_fresh(inputs_key, output_files()):
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f'✔ Inputs unchanged since the last build; outputs are up to date ({elapsed:.1f} ms)')
+        return True
+
+    from calculate_model_ratings import StageTimer
+
+    timer = StageTimer(profile=bool(profile_file))
+
     # Process benchmarks first
-    main()
+    df_scores, meta_records = main(timer, cache, xlsx_hash)
     
     # Then run model ratings calculation
     print("\n" + "="*60)
     print("Benchmark processing completed. Starting model ratings calculation...")
-    success = run_model_ratings()
+    success = run_model_ratings(df_scores, meta_records, companies_data, timer, incremental, uncertainty,
+                                complete, fail_on, validation_report)
     
+    timer.report()
+    if report_file:
+        timer.write_report(report_file)
+    if profile_file:
+        timer.dump_slowest_profile(profile_file)
+
     if success:
+        cache.record(inputs_key, output_files())
         print("\n" + "="*60)
         print("✅ Complete pipeline finished successfully!")
         print("- Benchmarks processed and saved to public/data/")
@@ -123,3 +272,123 @@ if __name__ == '__main__':
         print("- Benchmarks were processed successfully")
         print("- Model ratings calculation failed - check output above")
         print("="*60)
+
+    return success
+
+def input_signatures():
+    """(mtime_ns, size) of each watched input, or None if it is missing."""
+    signatures = {}
+    for path in (XLSX_FILE, DATA_JSON):
+        try:
+            info = os.stat(path)
+            signatures[path] = (info.st_mtime_ns, info.st_size)
+        except FileNotFoundError:
+            signatures[path] = None
+    return signatures
+
+def wait_until_quiet(poll_interval, debounce):
+    """Poll until the inputs have stayed unchanged for `debounce` seconds."""
+    last = input_signatures()
+    quiet_since = time.monotonic()
+    while time.monotonic() - quiet_since < debounce:
+        time.sleep(poll_interval)
+        current = input_signatures()
+        if current != last:
+            last, quiet_since = current, time.monotonic()
+    return last
+
+def rebuild(warm, cache, code_hash, uncertainty=0, complete=0, fail_on='error'):
+    """Rebuild the outputs affected by input changes since the previous rebuild.
+
+    ``warm`` carries the parsed sheets and input hashes between calls. A
+    changed workbook is re-read and re-exported; a change to data.json only
+    re-runs the ratings. Changes to data.json's ratings alone, including the
+    pipeline's own writes, are ignored. Returns True if anything was rebuilt.
+    """
+    from calculate_model_ratings import StageTimer
+
+    xlsx_hash = cache.file_hash(XLSX_FILE)
+    try:
+        with open(DATA_JSON, 'r', encoding='utf-8') as f:
+            companies_data = json.load(f)
+    except json.JSONDecodeError as e:
+        # Usually an editor caught mid-save; the next change triggers a retry
+        print(f'✘ {os.path.basename(DATA_JSON)} is not valid JSON yet ({e}); waiting for the next change')
+        return False
+    data_hash = data_json_inputs_hash(companies_data)
+
+    workbook_changed = xlsx_hash != warm.get('xlsx_hash')
+    if not workbook_changed and data_hash == warm.get('data_hash'):
+        return False
+
+    timer = StageTimer()
+    if workbook_changed:
+        warm['df_scores'], warm['meta_records'] = main(timer, cache, xlsx_hash)
+    if run_model_ratings(warm['df_scores'], warm['meta_records'], companies_data, timer,
+                         incremental=True, uncertainty=uncertainty, complete=complete, fail_on=fail_on):
+        cache.record(build_key(xlsx_hash, companies_data, uncertainty, code_hash, complete, fail_on), output_files())
+        warm.update(xlsx_hash=xlsx_hash, data_hash=data_hash)
+    return True
+
+def watch(poll_interval=0.2, debounce=0.3, uncertainty=0, complete=0, fail_on='error'):
+    """Rebuild whenever the workbook or data.json changes, until interrupted."""
+    cache = BuildCache(CACHE_DIR)
+    code_hash = pipeline_code_hash()
+    warm = {}
+
+    signatures = input_signatures()
+    rebuild(warm, cache, code_hash, uncertainty, complete, fail_on)
+    print(f'\n👀 Watching {os.path.relpath(XLSX_FILE)} and {os.path.relpath(DATA_JSON)} '
+          f'(every {poll_interval:g} s, {debounce:g} s debounce); Ctrl+C to stop')
+
+    try:
+        while True:
+            time.sleep(poll_interval)
+            if input_signatures() == signatures:
+                continue
+
+            detected = time.perf_counter()
+            signatures = wait_until_quiet(poll_interval, debounce)
+            if rebuild(warm, cache, code_hash, uncertainty, complete, fail_on):
+                print(f'\n✔ Rebuilt {(time.perf_counter() - detected) * 1000:.0f} ms after the change was detected')
+            # The pipeline's own write to data.json shows up on the next poll;
+            # rebuild() then finds its inputs unchanged and does nothing
+    except KeyboardInterrupt:
+        print('\nStopped watching')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Process benchmarks.xlsx and recalculate model ratings.")
+    parser.add_argument('--force', action='store_true',
+                        help="Rebuild even if the inputs are unchanged since the last build")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only re-rate scores that changed since the previous incremental run")
+    parser.add_argument('--uncertainty', nargs='?', type=int, const=2000, default=0, metavar='RESAMPLES',
+                        help="Add bootstrap confidence intervals to the category ratings "
+                             "(%(const)s resamples by default)")
+    parser.add_argument('--complete', nargs='?', type=int, const=4, default=0, metavar='RANK',
+                        help="Predict missing benchmark scores with a low-rank fit and add category ratings "
+                             "over the completed table (rank %(const)s by default)")
+    parser.add_argument('--fail-on', choices=['warning', 'error', 'never'], default='error',
+                        help="Stop before rating if score validation finds issues of this severity "
+                             "or worse; 'never' only reports them (default: %(default)s)")
+    parser.add_argument('--validation-report', metavar='REPORT_FILE',
+                        help="Write the full score validation report as JSON")
+    parser.add_argument('--report', metavar='REPORT_FILE',
+                        help="Write wall time, CPU time, peak RSS and row counts per stage as JSON")
+    parser.add_argument('--cprofile', metavar='PROFILE_FILE',
+                        help="Profile every stage and dump the cProfile stats of the slowest one")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and rebuild whenever the workbook or data.json changes")
+    parser.add_argument('--poll-interval', type=float, default=0.2,
+                        help="Seconds between input checks in watch mode (default: %(default)s)")
+    parser.add_argument('--debounce', type=float, default=0.3,
+                        help="Seconds the inputs must stay unchanged before a rebuild (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.watch:
+        watch(poll_interval=args.poll_interval, debounce=args.debounce, uncertainty=args.uncertainty,
+              complete=args.complete, fail_on=args.fail_on)
+    else:
+        run_pipeline(force=args.force, incremental=args.incremental, uncertainty=args.uncertainty,
+                     report_file=args.report, profile_file=args.cprofile, complete=args.complete,
+                     fail_on=args.fail_on, validation_report=args.validation_report)
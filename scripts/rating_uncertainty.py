@@ -0,0 +1,110 @@
+"""
+Bootstrap confidence intervals for the benchmark category ratings.
+
+A category rating is the mean of a model's 1-5 benchmark ratings in that
+category, so a rating resting on two benchmarks is far less certain than one
+resting on ten. This module resamples each model's benchmark ratings within
+every category, with replacement, and reports percentile intervals of the
+resampled means alongside the number of benchmarks behind each rating.
+
+Model x category cells are resampled many at a time:
+- Rated pairs are sorted into contiguous per-cell blocks
+- Cells are taken in groups of about BATCH_ELEMENTS / n_resamples rated
+  pairs; each batch of resamples draws a random position inside its own
+  block for every pair of the group at once (one rng.integers call)
+- np.add.reduceat sums every block of every resample in a single call, and
+  the group's percentiles are taken before moving on to the next group
+
+Memory is therefore a few arrays of BATCH_ELEMENTS draws and resampled
+means (about 150 MB), whatever the number of resamples and cells; only a
+cell with more than BATCH_ELEMENTS / n_resamples benchmarks makes its group
+larger. Draws come from a fixed seed, so the same data always gives the
+same intervals and the outputs are not rewritten between identical runs. A
+cell with a single benchmark has no spread to resample; it gets no
+interval, only its count of 1.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_RESAMPLES = 2000
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_SEED = 0
+BATCH_ELEMENTS = 4_000_000
+
+def bootstrap_category_intervals(rated_df: pd.DataFrame, models: Dict, benchmark_categories: Dict,
+                                 n_resamples: int = DEFAULT_RESAMPLES,
+                                 confidence: float = DEFAULT_CONFIDENCE,
+                                 seed: int = DEFAULT_SEED) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+    """Percentile bootstrap intervals for every model x category rating.
+
+    Returns {model_id: {category: {'low': ..., 'high': ..., 'n': ...}}} for the
+    cells that have at least one rated benchmark; low/high are None when n is 1.
+    """
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be between 0 and 1, got {confidence}")
+
+    categories = sorted(set(benchmark_categories.values()))
+    model_ids = list(models.keys())
+    n_categories = len(categories)
+
+    model_codes = pd.Index(model_ids).get_indexer(rated_df['model_id'])
+    category_codes = pd.Index(categories).get_indexer(rated_df['benchmark_id'].map(benchmark_categories))
+    ratings = rated_df['rating_1_to_5'].to_numpy()
+
+    # Same selection as the category averages: known models and categories, valid ratings
+    rated = (ratings > 0) & (model_codes >= 0) & (category_codes >= 0)
+    cells = model_codes[rated] * n_categories + category_codes[rated]
+    order = np.argsort(cells, kind='stable')
+    cells = cells[order]
+    values = ratings[rated][order].astype('float64')
+
+    intervals: Dict[str, Dict[str, Dict[str, Optional[float]]]] = {model_id: {} for model_id in model_ids}
+    if len(values) == 0:
+        return intervals
+
+    starts = np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]])
+    sizes = np.diff(np.r_[starts, len(values)])
+
+    # Groups of whole cells, starting a new group every group_pairs pairs
+    group_pairs = max(1, BATCH_ELEMENTS // n_resamples)
+    group_bounds = np.r_[np.flatnonzero(np.diff(starts // group_pairs)) + 1, len(starts)]
+
+    rng = np.random.default_rng(seed)
+    tail = (1 - confidence) / 2
+    low = np.empty(len(starts))
+    high = np.empty(len(starts))
+    first_cell = 0
+    for end_cell in group_bounds:
+        first_pair = starts[first_cell]
+        end_pair = starts[end_cell] if end_cell < len(starts) else len(values)
+        group_starts = starts[first_cell:end_cell] - first_pair
+        group_sizes = sizes[first_cell:end_cell]
+        group_values = values[first_pair:end_pair]
+
+        # Every pair position draws uniformly from its own cell's block
+        block_starts = np.repeat(group_starts, group_sizes)
+        block_sizes = np.repeat(group_sizes, group_sizes)
+
+        means = np.empty((n_resamples, len(group_starts)))
+        batch = max(1, BATCH_ELEMENTS // len(group_values))
+        for first in range(0, n_resamples, batch):
+            count = min(batch, n_resamples - first)
+            draws = block_starts + rng.integers(0, block_sizes, size=(count, len(group_values)))
+            means[first:first + count] = np.add.reduceat(group_values[draws], group_starts, axis=1) / group_sizes
+
+        low[first_cell:end_cell], high[first_cell:end_cell] = np.quantile(means, [tail, 1 - tail], axis=0)
+        first_cell = end_cell
+
+    for cell, size, cell_low, cell_high in zip(cells[starts], sizes, low, high):
+        model_id = model_ids[cell // n_categories]
+        category = categories[cell % n_categories]
+        intervals[model_id][category] = {
+            'low': float(cell_low) if size > 1 else None,
+            'high': float(cell_high) if size > 1 else None,
+            'n': int(size),
+        }
+
+    return intervals
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Historical category ratings: what each model's ratings were as of past dates.
+
+deduplicate_scores keeps only the latest score per model-benchmark pair, so
+the published ratings reflect today's min/max for every benchmark. This
+script recomputes the ratings as of any set of dates, using only scores dated
+on or before each date, to show how ratings drift as new models arrive.
+
+Rather than rerunning the pipeline per date, the scores are sorted once (in
+the same order deduplicate_scores uses, so the last snapshot reproduces the
+published ratings) and swept forward in time:
+- Each snapshot advances a pointer through the sorted rows, updating a
+  latest-score-per-pair array
+- Ratings are computed with rate_benchmark_blocks over pairs grouped by
+  benchmark, and category means with category_means (bincount)
+
+Each snapshot therefore costs O(pairs) NumPy work, independent of how many
+dates came before it. Same-date duplicates of a pair resolve in the order of
+the full-table sort, which can differ from deduplicating only the rows up to
+that date.
+
+Usage (from the project root):
+    python scripts/ratings_history.py --monthly
+    python scripts/ratings_history.py --dates 2024-12-31 2025-06-30
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from build_cache import write_if_changed
+from calculate_model_ratings import (
+    category_means,
+    coerce_scores,
+    create_benchmark_category_mapping,
+    extract_target_models,
+    load_data,
+    rate_benchmark_blocks,
+    rating_field_name,
+)
+
+DEFAULT_OUTPUT = 'public/data/ratings-history.json'
+
+def monthly_snapshot_dates(benchmarks_df: pd.DataFrame) -> List[pd.Timestamp]:
+    """Month-end dates from the first to the last scored month."""
+    dates = pd.to_datetime(benchmarks_df['date'], errors='coerce').dropna()
+    if dates.empty:
+        return []
+    return list(pd.date_range(dates.min(), dates.max() + pd.offsets.MonthEnd(0), freq='ME'))
+
+def compute_ratings_history(benchmarks_df: pd.DataFrame, models: Dict, benchmark_categories: Dict,
+                            snapshot_dates: List[pd.Timestamp]) -> Dict[pd.Timestamp, Dict[str, Dict[str, Optional[float]]]]:
+    """Category ratings per model as of each snapshot date.
+
+    Returns {date: {model_id: {category: rating or None}}}, matching the shape
+    of calculate_benchmark_category_ratings for every date.
+    """
+    all_categories = sorted(set(benchmark_categories.values()))
+    snapshot_dates = sorted(pd.Timestamp(date) for date in snapshot_dates)
+
+    # Same filtering and sort as deduplicate_scores, done once
+    filtered = benchmarks_df[benchmarks_df['model_id'].isin(models.keys())
+                             & benchmarks_df['benchmark_id'].notna()].copy()
+    filtered['date'] = pd.to_datetime(filtered['date'])
+    filtered = filtered.sort_values('date')
+
+    row_dates = filtered['date'].to_numpy()
+    row_scores = coerce_scores(filtered['score'])
+
+    # Pair ids, ordered so each benchmark's pairs are contiguous
+    pair_keys = pd.MultiIndex.from_frame(filtered[['benchmark_id', 'model_id']])
+    pair_codes, pairs = pd.factorize(pair_keys, sort=True)
+    pair_benchmarks = pairs.get_level_values(0).to_numpy()
+    pair_models = pairs.get_level_values(1).to_numpy()
+    n_pairs = len(pairs)
+
+    benchmark_starts = np.flatnonzero(np.r_[True, pair_benchmarks[1:] != pair_benchmarks[:-1]])[:n_pairs]
+
+    model_ids = list(models.keys())
+    model_codes = pd.Index(model_ids).get_indexer(pair_models)
+    category_codes = pd.Index(all_categories).get_indexer(pd.Series(pair_benchmarks).map(benchmark_categories))
+
+    latest = np.full(n_pairs, np.nan)
+    position = 0
+    history = {}
+
+    for snapshot in snapshot_dates:
+        # Advance through rows dated on or before the snapshot; the last row
+        # per pair in sort order is the latest score, as in deduplicate_scores
+        end = int(np.searchsorted(row_dates, np.datetime64(snapshot), side='right'))
+        if end > position:
+            codes = pair_codes[position:end][::-1]
+            _, last = np.unique(codes, return_index=True)
+            latest[codes[last]] = row_scores[position:end][::-1][last]
+            position = end
+
+        ratings = rate_benchmark_blocks(latest, benchmark_starts)
+        means = category_means(model_codes, category_codes, ratings, len(model_ids), len(all_categories))
+
+        history[snapshot] = {
+            model_id: {category: None if np.isnan(means[i, j]) else float(means[i, j])
+                       for j, category in enumerate(all_categories)}
+            for i, model_id in enumerate(model_ids)
+        }
+
+    return history
+
+def history_document(history: Dict[pd.Timestamp, Dict[str, Dict[str, Optional[float]]]]) -> Dict:
+    """Compact columnar form: one value list per model and rating field, aligned with dates."""
+    dates = sorted(history)
+    categories = sorted({category for snapshot in history.values()
+                         for ratings in snapshot.values() for category in ratings})
+    model_ids = list(next(iter(history.values()), {}).keys())
+
+    models = {}
+    for model_id in model_ids:
+        series = {}
+        for category in categories:
+            values = [history[date][model_id].get(category) for date in dates]
+            if any(value is not None for value in values):
+                series[rating_field_name(category)] = [round(value, 2) if value is not None else None
+                                                       for value in values]
+        if series:
+            models[model_id] = series
+
+    return {
+        'dates': [date.strftime('%Y-%m-%d') for date in dates],
+        'fields': [rating_field_name(category) for category in categories],
+        'models': models,
+    }
+
+def main(argv: Optional[List[str]] = None):
+    """Compute ratings snapshots and write the history file."""
+    parser = argparse.ArgumentParser(description="Compute historical model ratings as of past dates.")
+    when = parser.add_mutually_exclusive_group(required=True)
+    when.add_argument('--monthly', action='store_true', help="Snapshot at every month end")
+    when.add_argument('--dates', nargs='+', metavar='YYYY-MM-DD', help="Snapshot at these dates")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="History file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    try:
+        companies_data, benchmarks_df, benchmarks_meta = load_data()
+    except FileNotFoundError as e:
+        print(f"Error: Could not find required data file - {e}")
+        print("Make sure you're running this script from the project root directory.")
+        sys.exit(1)
+
+    models = extract_target_models(companies_data)
+    benchmark_categories = create_benchmark_category_mapping(benchmarks_meta)
+
+    if args.monthly:
+        snapshot_dates = monthly_snapshot_dates(benchmarks_df)
+    else:
+        snapshot_dates = [pd.Timestamp(date) for date in args.dates]
+
+    history = compute_ratings_history(benchmarks_df, models, benchmark_categories, snapshot_dates)
+    document = history_document(history)
+
+    written = write_if_changed(args.output, json.dumps(document, ensure_ascii=False, separators=(',', ':')))
+    print(f"{'Written' if written else 'Unchanged'} {len(document['dates'])} snapshots "
+          f"for {len(document['models'])} models to {args.output}")
+
+if __name__ == '__main__':
+    main()
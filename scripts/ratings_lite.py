@@ -0,0 +1,346 @@
+"""
+Pandas-free ratings engine for fast cold starts (--engine lite).
+
+The checked-in score table has under two thousand rows, so importing pandas
+and NumPy costs far more than the ratings themselves. This engine computes
+the same ratings with the standard library only:
+- benchmarks.csv is read with csv, data.json and benchmarks-meta.json with json
+- the score table is checked by validate_score_rows, which gives the same
+  report as the pandas validation (fail_on and validation_report as there)
+- the latest score per model-benchmark pair is kept in one pass over the rows
+  in the order deduplicate_scores sorts them (introsort_order)
+- per-benchmark min-max normalization, half-up rounding and category means
+  use the same arithmetic as the vectorized engine (integer sum / count)
+- pricing_cost comes from calculate_pricing_ratings, which is pure Python,
+  and the usage-profile ratings from the formula of pricing_profiles.py
+
+deduplicate_scores sorts by date with NumPy's unstable introsort, so which of
+several same-date scores of a pair it keeps depends on the whole date
+column. introsort_order replays that algorithm (NumPy's generic argsort,
+used for datetime64 columns) in pure Python, so same-date duplicates
+resolve to the same row here. data.json, model_ratings.csv, the price-performance
+frontiers and the data.json shards are written with the same functions as
+the pandas path, so the outputs are byte-identical. The leaderboards and
+the model neighbours need pandas and are skipped; process_benchmarks.py,
+which rebuilds benchmarks.csv, still produces them.
+"""
+
+import csv
+import json
+import math
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from calculate_model_ratings import (
+    PRICING_CURVE_EXPONENT,
+    PRICING_LOG_OFFSET,
+    StageTimer,
+    calculate_pricing_ratings,
+    create_benchmark_category_mapping,
+    extract_target_models,
+    output_comprehensive_csv,
+    update_data_json_with_ratings,
+)
+from pareto_frontier import compute_frontiers, write_frontiers
+from pricing_profiles import PRICING_PROFILES
+from validate_scores import DEFAULT_FAIL_ON, ValidationError, print_report, validate_score_rows, write_report
+
+def load_scores(scores_file: str = 'public/data/benchmarks.csv') -> List[Dict[str, str]]:
+    """Read the score table as a list of row dicts (all values are strings)."""
+    with open(scores_file, 'r', encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+def parse_score(value: str) -> Optional[float]:
+    """The score as a float, or None where float() rejects it or it is not finite."""
+    try:
+        score = float(value)
+    except (ValueError, TypeError):
+        return None
+    return score if math.isfinite(score) else None
+
+# Partitions of up to this many elements beyond the first are insertion sorted
+SMALL_QUICKSORT = 15
+
+def _heapsort(values: List, order: List[int], start: int, n: int):
+    """NumPy's aheapsort of order[start:start + n] by values (depth-limit fallback of introsort)."""
+    def at(k):  # 1-based heap position
+        return order[start + k - 1]
+
+    def put(k, item):
+        order[start + k - 1] = item
+
+    def sift(item, i, n):
+        j = 2 * i
+        while j <= n:
+            if j < n and values[at(j)] < values[at(j + 1)]:
+                j += 1
+            if not values[item] < values[at(j)]:
+                break
+            put(i, at(j))
+            i, j = j, 2 * j
+        put(i, item)
+
+    for first in range(n >> 1, 0, -1):
+        sift(at(first), first, n)
+    while n > 1:
+        item = at(n)
+        put(n, at(1))
+        n -= 1
+        sift(item, 1, n)
+
+def introsort_order(values: List) -> List[int]:
+    """Positions of values in sorted order, exactly as NumPy's argsort(kind='quicksort') of datetimes.
+
+    Median-of-three quicksort with insertion sort for small partitions and
+    heapsort past the depth limit, step for step as NumPy's generic
+    aquicksort, so equal values come out in the same (unstable) order.
+    """
+    order = list(range(len(values)))
+    if len(values) < 2:
+        return order
+    low, high = 0, len(values) - 1
+    depth = 2 * (len(values).bit_length() - 1)
+    stack: List[Tuple[int, int, int]] = []
+    while True:
+        if depth < 0:
+            _heapsort(values, order, low, high - low + 1)
+        else:
+            while high - low > SMALL_QUICKSORT:
+                # Median of three, parked next to the right end
+                mid = low + ((high - low) >> 1)
+                if values[order[mid]] < values[order[low]]:
+                    order[mid], order[low] = order[low], order[mid]
+                if values[order[high]] < values[order[mid]]:
+                    order[high], order[mid] = order[mid], order[high]
+                if values[order[mid]] < values[order[low]]:
+                    order[mid], order[low] = order[low], order[mid]
+                pivot = values[order[mid]]
+                i, j = low, high - 1
+                order[mid], order[j] = order[j], order[mid]
+                while True:
+                    i += 1
+                    while values[order[i]] < pivot:
+                        i += 1
+                    j -= 1
+                    while pivot < values[order[j]]:
+                        j -= 1
+                    if i >= j:
+                        break
+                    order[i], order[j] = order[j], order[i]
+                order[i], order[high - 1] = order[high - 1], order[i]
+
+                # Continue with the smaller side, the larger one waits on the stack
+                depth -= 1
+                if i - low < high - i:
+                    stack.append((i + 1, high, depth))
+                    high = i - 1
+                else:
+                    stack.append((low, i - 1, depth))
+                    low = i + 1
+
+            for i in range(low + 1, high + 1):
+                item = order[i]
+                value = values[item]
+                j = i
+                while j > low and value < values[order[j - 1]]:
+                    order[j] = order[j - 1]
+                    j -= 1
+                order[j] = item
+        if not stack:
+            return order
+        low, high, depth = stack.pop()
+
+def latest_scores(rows: List[Dict[str, str]], models: Dict) -> Dict[Tuple[str, str], Dict[str, str]]:
+    """Latest row per (model_id, benchmark_id) for the given models, as deduplicate_scores picks it."""
+    target = [row for row in rows if row['model_id'] in models]
+    dates = [date.fromisoformat(row['date']) for row in target]
+    latest: Dict[Tuple[str, str], Dict[str, str]] = {}
+    for position in introsort_order(dates):
+        row = target[position]
+        if row['benchmark_id']:
+            latest[row['model_id'], row['benchmark_id']] = row
+    return latest
+
+def round_half_up(value: float) -> int:
+    """Scalar round_half_up of calculate_model_ratings."""
+    whole = math.floor(value)
+    return int(whole + (value - whole >= 0.5))
+
+def rate_scores(latest: Dict[Tuple[str, str], Dict[str, str]]) -> Dict[Tuple[str, str], Tuple[float, int]]:
+    """(normalized_score, 1-5 rating) per model-benchmark pair with a valid score."""
+    by_benchmark: Dict[str, List[Tuple[Tuple[str, str], float]]] = {}
+    for key, row in latest.items():
+        score = parse_score(row['score'])
+        if score is not None:
+            by_benchmark.setdefault(key[1], []).append((key, score))
+
+    rated = {}
+    for scores in by_benchmark.values():
+        min_score = min(score for _, score in scores)
+        max_score = max(score for _, score in scores)
+
+        # Degenerate cases (single score or no spread) get a neutral rating of 3
+        if len(scores) == 1 or max_score == min_score:
+            rated.update((key, (0.5, 3)) for key, _ in scores)
+            continue
+
+        for key, score in scores:
+            normalized = (score - min_score) / (max_score - min_score)
+            rated[key] = (normalized, max(1, min(5, round_half_up(1 + 4 * normalized))))
+    return rated
+
+def category_ratings(rated: Dict[Tuple[str, str], Tuple[float, int]], models: Dict,
+                     benchmark_categories: Dict) -> Dict[str, Dict[str, Optional[float]]]:
+    """Mean 1-5 rating per model and category, as integer sum / count (None without ratings)."""
+    sums: Dict[Tuple[str, str], int] = {}
+    counts: Dict[Tuple[str, str], int] = {}
+    for (model_id, benchmark_id), (_, rating) in rated.items():
+        category = benchmark_categories.get(benchmark_id)
+        if category is None:
+            continue
+        sums[model_id, category] = sums.get((model_id, category), 0) + rating
+        counts[model_id, category] = counts.get((model_id, category), 0) + 1
+
+    all_categories = set(benchmark_categories.values())
+    return {model_id: {category: (sums[model_id, category] / counts[model_id, category]
+                                  if (model_id, category) in counts else None)
+                       for category in all_categories}
+            for model_id in models}
+
+def _rate_costs(costs: Dict[str, float], offset: float, exponent: float) -> Dict[str, float]:
+    """The log curve of calculate_pricing_ratings applied to precomputed costs."""
+    if len(costs) == 1:
+        return {model_id: 3.0 for model_id in costs}
+    log_costs = {model_id: math.log(cost + offset) for model_id, cost in costs.items()}
+    min_log, max_log = min(log_costs.values()), max(log_costs.values())
+    return {model_id: 1.0 + 4.0 * (((log_cost - min_log) / (max_log - min_log) if max_log != min_log else 0.0)
+                                   ** exponent)
+            for model_id, log_cost in log_costs.items()}
+
+def profile_pricing_ratings(models: Dict, offset: float = PRICING_LOG_OFFSET,
+                            exponent: float = PRICING_CURVE_EXPONENT,
+                            profiles: Dict[str, Dict] = PRICING_PROFILES) -> Dict[str, Dict[str, Optional[float]]]:
+    """Per-model calculate_profile_pricing_ratings of pricing_profiles.py."""
+    ratings: Dict[str, Dict[str, Optional[float]]] = {model_id: {} for model_id in models}
+    for name, profile in profiles.items():
+        input_share, hit = profile['input_share'], profile['cache_hit_ratio']
+        costs = {}
+        for model_id, model in models.items():
+            if model['input_price'] is None or model['output_price'] is None:
+                continue
+            cached = model['cached_input_price'] if model['cached_input_price'] is not None else model['input_price']
+            input_cost = hit * cached + (1 - hit) * model['input_price']
+            output_cost = model['output_price'] * (1 + profile['reasoning_overhead'] * model['reasoning_tokens'])
+            costs[model_id] = input_share * input_cost + (1 - input_share) * output_cost
+        profile_ratings = _rate_costs(costs, offset, exponent) if costs else {}
+        for model_id in models:
+            ratings[model_id][name] = profile_ratings.get(model_id)
+    return ratings
+
+def run_lite_pipeline(data_file: str = 'data/data.json',
+                      scores_file: str = 'public/data/benchmarks.csv',
+                      meta_file: str = 'public/data/benchmarks-meta.json',
+                      ratings_csv: str = 'public/data/model_ratings.csv',
+                      timer: Optional[StageTimer] = None,
+                      shard_dir: Optional[str] = None,
+                      frontier_dir: Optional[str] = None,
+                      fail_on: str = DEFAULT_FAIL_ON,
+                      validation_report: Optional[str] = None) -> Optional[Dict]:
+    """Load the inputs, rate every model and write data.json, the CSV and (with shard_dir) the shards.
+
+    The frontier files are written to frontier_dir if given. The score table
+    is validated first, as in run_ratings_pipeline: a ValidationError is
+    raised before anything is written if it has issues at or above fail_on,
+    and the report is written to validation_report if given.
+
+    Returns the computed ratings, or None if no models of the target types
+    were found.
+    """
+    timer = timer or StageTimer()
+
+    with timer.stage('load_data') as stage:
+        with open(data_file, 'r') as f:
+            companies_data = json.load(f)
+        rows = load_scores(scores_file)
+        with open(meta_file, 'r') as f:
+            benchmarks_meta = json.load(f)
+        stage['rows'] = len(rows)
+
+    with timer.stage('validate_scores') as stage:
+        report = validate_score_rows(rows, companies_data, benchmarks_meta, fail_on=fail_on)
+        stage['rows'] = report['rows']
+    print_report(report)
+    if validation_report:
+        write_report(report, validation_report)
+    if report['failed']:
+        raise ValidationError(report)
+
+    with timer.stage('extract_target_models') as stage:
+        models = extract_target_models(companies_data)
+        stage['rows'] = len(models)
+
+    if not models:
+        print("No models found of target types!")
+        return None
+
+    with timer.stage('create_benchmark_category_mapping') as stage:
+        benchmark_categories = create_benchmark_category_mapping(benchmarks_meta)
+        stage['rows'] = len(benchmark_categories)
+
+    with timer.stage('deduplicate_scores') as stage:
+        latest = latest_scores(rows, models)
+        stage['rows'] = len(latest)
+
+    with timer.stage('normalize_and_rate_benchmarks') as stage:
+        rated = rate_scores(latest)
+        stage['rows'] = len(latest)
+
+    with timer.stage('calculate_benchmark_category_ratings') as stage:
+        benchmark_ratings = category_ratings(rated, models, benchmark_categories)
+        stage['rows'] = len(benchmark_ratings)
+
+    with timer.stage('calculate_pricing_ratings') as stage:
+        pricing_ratings = calculate_pricing_ratings(models)
+        stage['rows'] = sum(rating is not None for rating in pricing_ratings.values())
+
+    with timer.stage('calculate_profile_pricing_ratings') as stage:
+        profile_ratings = profile_pricing_ratings(models)
+        stage['rows'] = len(profile_ratings)
+
+    with timer.stage('compute_frontiers') as stage:
+        frontiers = compute_frontiers(models, benchmark_ratings)
+        stage['rows'] = sum(len(cells) for cells in frontiers['annotations'].values())
+
+    with timer.stage('update_data_json_with_ratings') as stage:
+        stage['rows'] = update_data_json_with_ratings(models, benchmark_ratings, pricing_ratings,
+                                                      data_file=data_file, data=companies_data,
+                                                      profile_ratings=profile_ratings, frontiers=frontiers)
+
+    with timer.stage('output_comprehensive_csv') as stage:
+        output_comprehensive_csv(models, benchmark_ratings, pricing_ratings, output_file=ratings_csv,
+                                 profile_ratings=profile_ratings, frontiers=frontiers)
+        stage['rows'] = len(models)
+
+    if frontier_dir:
+        with timer.stage('write_frontiers') as stage:
+            changed = write_frontiers(frontiers['frontiers'], frontier_dir)
+            stage['rows'] = len(frontiers['frontiers'])
+        print(f"Frontiers for {len(frontiers['frontiers'])} categories in {frontier_dir} ({changed} files changed)")
+
+    if shard_dir:
+        from data_shards import write_shards
+
+        with timer.stage('write_shards') as stage:
+            changed = write_shards(companies_data, shard_dir)
+            stage['rows'] = len(companies_data['companies'])
+        print(f"Shards for {len(companies_data['companies'])} companies in {shard_dir} ({changed} files changed)")
+
+    print("Lite engine: leaderboards and model neighbours skipped "
+          "(run without --engine lite for these)")
+    return {
+        'models': models,
+        'benchmark_ratings': benchmark_ratings,
+        'pricing_ratings': pricing_ratings,
+        'profile_ratings': profile_ratings,
+        'frontiers': frontiers,
+    }
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+What-if sweep over the rating parameters, evaluated in parallel.
+
+calculate_pricing_ratings fixes the composite-cost weighting, the log offset
+and the curve exponent, and TARGET_MODEL_TYPES fixes which models are rated
+(which also sets every benchmark's min/max). This script evaluates a grid of
+those parameters and reports, for each combination, how much the resulting
+rankings differ from the published configuration.
+
+The deduplicated scores, prices and index arrays are built once and handed
+to each worker process a single time through the pool initializer; tasks
+only carry the parameter tuples. Benchmark ratings depend only on the model
+universe, so each worker computes them once per universe and reuses them
+across all pricing parameters.
+
+For every rating field (each benchmark category plus pricing_cost) the output
+table has, relative to the baseline:
+- spearman: Spearman rank correlation over models rated in both
+- top10: share of the baseline top 10 still in the top 10
+- max_shift: largest change in rank of any model
+- mean_abs_delta: mean absolute change in rating value
+
+Usage (from the project root):
+    python scripts/ratings_sweep.py --input-weights 0.5 0.6 0.7 0.8 \\
+        --offsets 0.001 0.01 0.1 --exponents 0.6 0.8 1.0 --universes leave-one-out
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from calculate_model_ratings import (
+    PRICING_CURVE_EXPONENT,
+    PRICING_INPUT_WEIGHT,
+    PRICING_LOG_OFFSET,
+    PRICING_OUTPUT_WEIGHT,
+    TARGET_MODEL_TYPES,
+    category_means,
+    coerce_scores,
+    create_benchmark_category_mapping,
+    deduplicate_scores,
+    extract_target_models,
+    load_data,
+    rate_benchmark_blocks,
+    rating_field_name,
+)
+
+UNIVERSE_MODES = ['fixed', 'leave-one-out', 'subsets']
+TOP_N = 10
+
+# Arrays shared by every task in a worker process, set by _init_worker
+_SHARED: Dict = {}
+_UNIVERSE_CACHE: Dict[Tuple[str, ...], np.ndarray] = {}
+
+def prepare_sweep_arrays(companies_data: Dict, benchmarks_df: pd.DataFrame,
+                         benchmarks_meta: List[Dict]) -> Dict:
+    """Build the arrays every sweep task works from."""
+    models = extract_target_models(companies_data)
+    benchmark_categories = create_benchmark_category_mapping(benchmarks_meta)
+    categories = sorted(set(benchmark_categories.values()))
+
+    # Latest score per pair, laid out in contiguous per-benchmark blocks
+    deduplicated = deduplicate_scores(benchmarks_df, models)
+    deduplicated = deduplicated[deduplicated['benchmark_id'].notna()]
+    deduplicated = deduplicated.sort_values('benchmark_id', kind='stable')
+    pair_benchmarks = deduplicated['benchmark_id'].to_numpy()
+
+    model_ids = list(models.keys())
+    types = list(TARGET_MODEL_TYPES)
+
+    def price(key):
+        return np.array([np.nan if models[m][key] is None else models[m][key] for m in model_ids])
+
+    return {
+        'model_ids': model_ids,
+        'categories': categories,
+        'types': types,
+        'model_types': np.array([types.index(models[m]['type']) for m in model_ids]),
+        'input_price': price('input_price'),
+        'output_price': price('output_price'),
+        'pair_models': pd.Index(model_ids).get_indexer(deduplicated['model_id']),
+        'pair_categories': pd.Index(categories).get_indexer(deduplicated['benchmark_id'].map(benchmark_categories)),
+        'pair_benchmarks': pd.factorize(pair_benchmarks)[0],
+        'scores': coerce_scores(deduplicated['score']),
+    }
+
+def _universe_mask(arrays: Dict, universe: Sequence[str]) -> np.ndarray:
+    codes = [arrays['types'].index(model_type) for model_type in universe]
+    return np.isin(arrays['model_types'], codes)
+
+def benchmark_ratings_for_universe(arrays: Dict, universe: Sequence[str]) -> np.ndarray:
+    """Category ratings (models x categories, NaN if unrated) when only `universe` types are rated."""
+    in_universe = _universe_mask(arrays, universe)
+    pair_in = in_universe[arrays['pair_models']]
+
+    # Drop out-of-universe pairs, keeping the per-benchmark block layout
+    scores = arrays['scores'][pair_in]
+    pair_benchmarks = arrays['pair_benchmarks'][pair_in]
+    block_starts = np.flatnonzero(np.r_[True, pair_benchmarks[1:] != pair_benchmarks[:-1]])[:len(scores)]
+
+    ratings = rate_benchmark_blocks(scores, block_starts)
+    return category_means(arrays['pair_models'][pair_in], arrays['pair_categories'][pair_in], ratings,
+                          len(arrays['model_ids']), len(arrays['categories']))
+
+def pricing_ratings_array(arrays: Dict, universe: Sequence[str], input_weight: float, output_weight: float,
+                          offset: float, exponent: float) -> np.ndarray:
+    """Vectorized calculate_pricing_ratings over the models of `universe` (NaN if unrated)."""
+    cost = (input_weight * arrays['input_price']) + (output_weight * arrays['output_price'])
+    priced = np.isfinite(cost) & _universe_mask(arrays, universe)
+    ratings = np.full(len(cost), np.nan)
+
+    if priced.sum() == 1:
+        ratings[priced] = 3.0
+    elif priced.any():
+        log_costs = np.log(cost[priced] + offset)
+        min_log, max_log = log_costs.min(), log_costs.max()
+        normalized = (log_costs - min_log) / (max_log - min_log) if max_log != min_log else np.zeros(len(log_costs))
+        ratings[priced] = 1.0 + (4.0 * normalized ** exponent)
+    return ratings
+
+def _average_ranks(values: np.ndarray) -> np.ndarray:
+    """Ranks (1 = highest value) with ties sharing their average rank."""
+    order = np.argsort(-values, kind='mergesort')
+    ordered = -values[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    ends = np.r_[starts[1:], len(values)]
+    group = np.cumsum(np.r_[True, ordered[1:] != ordered[:-1]]) - 1
+    ranks = np.empty(len(values))
+    ranks[order] = ((starts + ends + 1) / 2)[group]
+    return ranks
+
+def rank_stability(baseline: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """Compare one rating field between the baseline and a candidate configuration."""
+    common = np.isfinite(baseline) & np.isfinite(candidate)
+    if common.sum() < 2:
+        return {'spearman': np.nan, 'top10': np.nan, 'max_shift': np.nan, 'mean_abs_delta': np.nan}
+
+    base, cand = baseline[common], candidate[common]
+    base_ranks, cand_ranks = _average_ranks(base), _average_ranks(cand)
+    spearman = (np.corrcoef(base_ranks, cand_ranks)[0, 1]
+                if base_ranks.std() > 0 and cand_ranks.std() > 0 else np.nan)
+
+    top_n = min(TOP_N, len(base))
+    base_top = set(np.argsort(-base, kind='mergesort')[:top_n])
+    cand_top = set(np.argsort(-cand, kind='mergesort')[:top_n])
+
+    return {
+        'spearman': float(spearman),
+        'top10': len(base_top & cand_top) / top_n,
+        'max_shift': float(np.abs(base_ranks - cand_ranks).max()),
+        'mean_abs_delta': float(np.abs(base - cand).mean()),
+    }
+
+def evaluate_combination(arrays: Dict, baseline: np.ndarray, universe: Tuple[str, ...],
+                         input_weight: float, output_weight: float, offset: float,
+                         exponent: float, universe_cache: Optional[Dict] = None) -> Dict:
+    """Ratings for one parameter combination, summarised against the baseline."""
+    if universe_cache is not None and universe in universe_cache:
+        benchmark = universe_cache[universe]
+    else:
+        benchmark = benchmark_ratings_for_universe(arrays, universe)
+        if universe_cache is not None:
+            universe_cache[universe] = benchmark
+
+    pricing = pricing_ratings_array(arrays, universe, input_weight, output_weight, offset, exponent)
+    ratings = np.column_stack([benchmark, pricing])
+
+    row = {
+        'universe': '+'.join(universe),
+        'input_weight': input_weight,
+        'output_weight': output_weight,
+        'offset': offset,
+        'exponent': exponent,
+        'n_models': int(_universe_mask(arrays, universe).sum()),
+    }
+    fields = [rating_field_name(category) for category in arrays['categories']] + ['pricing_cost']
+    spearmans = []
+    for i, field in enumerate(fields):
+        for metric, value in rank_stability(baseline[:, i], ratings[:, i]).items():
+            row[f'{field}_{metric}'] = value
+            if metric == 'spearman' and not np.isnan(value):
+                spearmans.append(value)
+    row['min_spearman'] = min(spearmans) if spearmans else np.nan
+    return row
+
+def _init_worker(arrays: Dict, baseline: np.ndarray):
+    """Receive the shared arrays once per worker process."""
+    _SHARED['arrays'] = arrays
+    _SHARED['baseline'] = baseline
+
+def _evaluate_chunk(combinations: List[Tuple]) -> List[Dict]:
+    return [evaluate_combination(_SHARED['arrays'], _SHARED['baseline'], *combination,
+                                 universe_cache=_UNIVERSE_CACHE)
+            for combination in combinations]
+
+def model_universes(mode: str) -> List[Tuple[str, ...]]:
+    """Model-type universes to evaluate for a --universes mode."""
+    full = tuple(TARGET_MODEL_TYPES)
+    if mode == 'fixed':
+        return [full]
+    if mode == 'leave-one-out':
+        return [full] + [tuple(t for t in full if t != left_out) for left_out in full]
+    return [subset for size in range(len(full), 0, -1) for subset in itertools.combinations(full, size)]
+
+def run_sweep(arrays: Dict, universes: List[Tuple[str, ...]], input_weights: List[float],
+              offsets: List[float], exponents: List[float], workers: int = 1) -> List[Dict]:
+    """Evaluate every parameter combination, in a process pool if workers > 1."""
+    baseline = np.column_stack([
+        benchmark_ratings_for_universe(arrays, TARGET_MODEL_TYPES),
+        pricing_ratings_array(arrays, TARGET_MODEL_TYPES, PRICING_INPUT_WEIGHT, PRICING_OUTPUT_WEIGHT,
+                              PRICING_LOG_OFFSET, PRICING_CURVE_EXPONENT),
+    ])
+
+    combinations = []
+    for universe, input_weight, offset, exponent in itertools.product(universes, input_weights, offsets, exponents):
+        # Keep the output weight exact for the published 70/30 split
+        output_weight = PRICING_OUTPUT_WEIGHT if input_weight == PRICING_INPUT_WEIGHT else round(1.0 - input_weight, 12)
+        combinations.append((universe, input_weight, output_weight, offset, exponent))
+
+    if workers <= 1:
+        cache: Dict = {}
+        return [evaluate_combination(arrays, baseline, *combination, universe_cache=cache)
+                for combination in combinations]
+
+    # Group by universe so each worker reuses its benchmark ratings across chunks
+    chunk_size = max(1, len(combinations) // (workers * 4))
+    chunks = [combinations[i:i + chunk_size] for i in range(0, len(combinations), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(arrays, baseline)) as executor:
+        return [row for rows in executor.map(_evaluate_chunk, chunks) for row in rows]
+
+def write_sweep_table(rows: List[Dict], output_file: str):
+    """Write one row per parameter combination."""
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: (round(value, 6) if isinstance(value, float) else value)
+                             for key, value in row.items()})
+
+def main(argv: Optional[List[str]] = None):
+    """Run a parameter sweep and write the rank-stability table."""
+    parser = argparse.ArgumentParser(description="Sweep rating parameters and compare the resulting rankings.")
+    parser.add_argument('--input-weights', nargs='+', type=float, default=[PRICING_INPUT_WEIGHT],
+                        help="Input share of the composite cost (output share is 1 - input)")
+    parser.add_argument('--offsets', nargs='+', type=float, default=[PRICING_LOG_OFFSET],
+                        help="Offsets added before taking the log of the cost")
+    parser.add_argument('--exponents', nargs='+', type=float, default=[PRICING_CURVE_EXPONENT],
+                        help="Curve exponents applied to the normalized log cost")
+    parser.add_argument('--universes', choices=UNIVERSE_MODES, default='fixed',
+                        help="Model-type universes to evaluate (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: %(default)s)")
+    parser.add_argument('--output', default='ratings-sweep.csv', help="Output table (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    try:
+        companies_data, benchmarks_df, benchmarks_meta = load_data()
+    except FileNotFoundError as e:
+        print(f"Error: Could not find required data file - {e}")
+        print("Make sure you're running this script from the project root directory.")
+        sys.exit(1)
+
+    arrays = prepare_sweep_arrays(companies_data, benchmarks_df, benchmarks_meta)
+    universes = model_universes(args.universes)
+    rows = run_sweep(arrays, universes, args.input_weights, args.offsets, args.exponents, workers=args.workers)
+
+    write_sweep_table(rows, args.output)
+    print(f"Evaluated {len(rows)} parameter combinations; results written to {args.output}")
+
+    least_stable = min(rows, key=lambda row: (np.nan_to_num(row['min_spearman'], nan=2.0)))
+    print(f"Least stable: universe={least_stable['universe']} input_weight={least_stable['input_weight']} "
+          f"offset={least_stable['offset']} exponent={least_stable['exponent']} "
+          f"(min spearman {least_stable['min_spearman']:.3f})")
+
+if __name__ == '__main__':
+    main()
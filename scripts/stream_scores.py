@@ -0,0 +1,286 @@
+"""
+Bounded-memory loading of the benchmark score table.
+
+load_data reads the whole of benchmarks.csv into one DataFrame, including the
+notes column and every superseded score, although the ratings only ever use
+the latest score per model-benchmark pair. For very large score tables this
+module streams the file instead:
+- Only the needed columns are read (usecols), with model, company and
+  benchmark ids as categoricals and scores as float64 (or float32 on request;
+  the result is widened back to float64 through each value's shortest
+  decimal, so scores of up to 7 significant digits come out as written)
+- The file is read in chunks of chunk_rows rows; each chunk is reduced to
+  its latest row per model-benchmark pair and merged into a running table
+  through a sorted array of pair keys (model and benchmark codes packed into
+  one int64): a binary search per chunk row, and an int64 array copy for new
+  pairs, instead of re-sorting or re-hashing every pair per chunk
+- Replaced rows are only marked dead and dropped once they outnumber the
+  live ones, so peak memory stays within one chunk plus two rows per pair
+  (and the rows tied on a pair's latest date), whatever the file size
+
+The result has at most one row per pair, in file order, and can be passed
+anywhere a full score table is accepted; deduplicate_scores leaves it
+unchanged. Ties follow deduplicate_scores. Rows without a date count as the
+latest, and among them the one furthest down the file wins. Among rows
+sharing a pair's latest date, deduplicate_scores keeps whichever its
+sort_values('date') puts last, and that depends on every date in the table
+(NumPy's quicksort is not stable). So the date of every row is kept, 8
+bytes per row, and the tied rows are ranked in one argsort at the end
+(_date_ranks). The ratings sort only the rated models' rows and the
+leaderboards every model's, so when the two disagree on a rated model's
+pair the streamed row follows the ratings.
+
+The streamed table cannot show which rows were superseded, so the score
+validation runs on every chunk as it is read (on_chunk) rather than on the
+result.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from calculate_model_ratings import coerce_scores
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+SCORE_DTYPES = ['float64', 'float32']
+
+PAIR_KEY = ['model_id', 'benchmark_id']
+ID_COLUMNS = ['model_id', 'company_id', 'benchmark_id']
+RATING_COLUMNS = ['model_id', 'benchmark_id', 'score', 'date']
+# Extra columns needed for the leaderboard files (see leaderboards.py)
+LEADERBOARD_COLUMNS = ['company_id', 'source_name', 'source']
+MISSING_DATE = np.iinfo('int64').max
+
+def _date_order(dates: pd.Series) -> np.ndarray:
+    """Dates as int64 that order like sort_values: missing dates last."""
+    order = dates.to_numpy(dtype='datetime64[ns]').view('int64').copy()
+    order[dates.isna().to_numpy()] = MISSING_DATE
+    return order
+
+def _date_ranks(orders: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """Places of the given rows in sort_values('date') over rows with these date orders.
+
+    The dated rows are argsorted as datetime64, whose quicksort is NumPy's
+    introsort (int64 may take a different, vectorized sort); missing dates
+    are never asked for.
+    """
+    dated = np.flatnonzero(orders != MISSING_DATE)
+    ranks = np.empty(len(orders), dtype='int64')
+    ranks[dated[np.argsort(orders[dated].view('datetime64[ns]'), kind='quicksort')]] = np.arange(len(dated))
+    return ranks[positions]
+
+class _LatestRows:
+    """Running table of the latest row per model-benchmark pair.
+
+    Id columns are held as codes into categories that only ever grow, so a
+    pair's key never changes. keys (sorted) and slots map each pair to its
+    row in the concatenation of frames; order, position and alive describe
+    those rows. Rows dated the same as their pair's latest row are kept too
+    (tie_keys, tie_slots) until result() picks between them.
+    """
+
+    def __init__(self, categorical: List[str], rank_models: Optional[pd.Index] = None):
+        self.categories: Dict[str, pd.Index] = {column: pd.Index([], dtype=object) for column in categorical}
+        self.rank_models = rank_models
+        self.frames: List[pd.DataFrame] = []
+        self.keys = np.empty(0, dtype='int64')
+        self.slots = np.empty(0, dtype='int64')
+        self.order = np.empty(0, dtype='int64')
+        self.position = np.empty(0, dtype='int64')
+        self.alive = np.empty(0, dtype=bool)
+        self.tie_keys = np.empty(0, dtype='int64')
+        self.tie_slots = np.empty(0, dtype='int64')
+        # Date order of every row with a model id, and whether its model is in rank_models
+        self.dates: List[np.ndarray] = []
+        self.ranked: List[np.ndarray] = []
+        self.named_rows = 0
+
+    def _codes(self, column: str, values: pd.Series) -> np.ndarray:
+        """Codes of a categorical chunk column in the running categories (-1 if missing)."""
+        categories = values.cat.categories
+        known = self.categories[column]
+        self.categories[column] = known = known.append(categories[~categories.isin(known)])
+        return np.append(known.get_indexer(categories), -1)[values.cat.codes.to_numpy()]
+
+    def add(self, chunk: pd.DataFrame):
+        """Merge a chunk whose rows come after every row added so far."""
+        chunk = chunk.assign(**{column: self._codes(column, chunk[column]) for column in self.categories})
+        models = chunk['model_id'].to_numpy().astype('int64')
+        benchmarks = chunk['benchmark_id'].to_numpy().astype('int64')
+        chunk_order = chunk['order'].to_numpy()
+        keyed = (models >= 0) & (benchmarks >= 0)  # rows without ids drop out, as in groupby
+
+        # deduplicate_scores sorts every row of its models, so their dates all
+        # take part in the final tie-break
+        named = models >= 0
+        positions = self.named_rows + np.cumsum(named) - 1
+        self.named_rows += int(named.sum())
+        self.dates.append(chunk_order[named])
+        if self.rank_models is not None:
+            self.ranked.append(self.categories['model_id'].isin(self.rank_models)[models[named]])
+
+        # Latest row per pair within the chunk (the later row among equal
+        # dates), and the other rows on that date
+        keys = (models << 32) | benchmarks
+        rows = np.flatnonzero(keyed)
+        rows = rows[np.argsort(chunk_order[rows], kind='stable')]
+        latest = ~pd.Series(keys[rows]).duplicated(keep='last').to_numpy()
+        latest_order = pd.Series(chunk_order[rows]).groupby(keys[rows]).transform('max').to_numpy()
+        tied = ~latest & (chunk_order[rows] == latest_order) & (latest_order != MISSING_DATE)
+        tied_rows = rows[tied]
+        rows = rows[latest]
+        keys, order = keys[rows], chunk_order[rows]
+
+        # Look the pairs up in the running table; chunk rows win equal dates,
+        # and an equal dated row they replace stays on as a tie
+        at = np.searchsorted(self.keys, keys)
+        found = at < len(self.keys)
+        found[found] = self.keys[at[found]] == keys[found]
+        table_order = self.order[self.slots[at[found]]]
+        newer = table_order <= order[found]
+        wins = ~found
+        wins[found] = newer
+        replaced = at[found][newer]
+        still_tied = (table_order == order[found])[newer] & (order[found][newer] != MISSING_DATE)
+
+        # Ties of the winning pairs follow the chunk's latest rows in the new slots
+        tied_keys = (models[tied_rows] << 32) | benchmarks[tied_rows]
+        winning = np.isin(tied_keys, keys[wins])
+        tied_rows, tied_keys = tied_rows[winning], tied_keys[winning]
+        n_wins = int(wins.sum())
+        slots = len(self.order) + np.arange(n_wins)
+        tie_slots = len(self.order) + n_wins + np.arange(len(tied_rows))
+
+        self.tie_keys = np.concatenate([self.tie_keys, self.keys[replaced[still_tied]], tied_keys])
+        self.tie_slots = np.concatenate([self.tie_slots, self.slots[replaced[still_tied]], tie_slots])
+        self.alive[self.slots[replaced[~still_tied]]] = False
+        self.slots[replaced] = slots[found[wins]]
+
+        kept = np.concatenate([rows[wins], tied_rows])
+        self.frames.append(chunk.iloc[kept])
+        self.order = np.concatenate([self.order, chunk_order[kept]])
+        self.position = np.concatenate([self.position, positions[kept]])
+        self.alive = np.concatenate([self.alive, np.ones(len(kept), dtype=bool)])
+
+        # New pairs go into the sorted key array
+        added = ~found[wins]
+        new_keys, new_slots = keys[wins][added], slots[added]
+        sorting = np.argsort(new_keys)
+        insert_at = np.searchsorted(self.keys, new_keys[sorting])
+        self.keys = np.insert(self.keys, insert_at, new_keys[sorting])
+        self.slots = np.insert(self.slots, insert_at, new_slots[sorting])
+
+        self._drop_stale_ties()
+        if (~self.alive).sum() > self.alive.sum():
+            self._compact()
+
+    def _drop_stale_ties(self):
+        """Drop the ties of pairs that have since had a later row."""
+        if not len(self.tie_slots):
+            return
+        latest = self.order[self.slots[np.searchsorted(self.keys, self.tie_keys)]]
+        stale = self.order[self.tie_slots] != latest
+        self.alive[self.tie_slots[stale]] = False
+        self.tie_keys, self.tie_slots = self.tie_keys[~stale], self.tie_slots[~stale]
+
+    def _break_ties(self):
+        """Keep, of each pair's rows on its latest date, the one sort_values('date') puts last.
+
+        The ties of pairs of rank_models are ranked among those models' rows
+        only, the others among every row with a model id, as deduplicate_scores
+        does for the ratings and the leaderboards.
+        """
+        if not len(self.tie_slots):
+            return
+        pairs = np.unique(np.searchsorted(self.keys, self.tie_keys))
+        candidate_pairs = np.concatenate([pairs, np.searchsorted(self.keys, self.tie_keys)])
+        candidates = np.concatenate([self.slots[pairs], self.tie_slots])
+
+        dates = np.concatenate(self.dates)
+        positions = self.position[candidates]
+        in_ranked = np.zeros(len(candidates), dtype=bool)
+        if self.rank_models is not None:
+            in_ranked = self.categories['model_id'].isin(self.rank_models)[self.keys[candidate_pairs] >> 32]
+        ranks = np.empty(len(candidates), dtype='int64')
+        if not in_ranked.all():
+            ranks[~in_ranked] = _date_ranks(dates, positions[~in_ranked])
+        if in_ranked.any():
+            ranked = np.concatenate(self.ranked)
+            ranks[in_ranked] = _date_ranks(dates[ranked], (np.cumsum(ranked) - 1)[positions[in_ranked]])
+
+        best = pd.Series(ranks).groupby(candidate_pairs).idxmax()
+        self.alive[candidates] = False
+        self.alive[candidates[best.to_numpy()]] = True
+        self.slots[best.index.to_numpy()] = candidates[best.to_numpy()]
+        self.tie_keys = self.tie_slots = np.empty(0, dtype='int64')
+
+    def _compact(self):
+        """Drop replaced rows and renumber the slots."""
+        renumbered = np.cumsum(self.alive) - 1
+        self.frames = [pd.concat(self.frames, ignore_index=True)[self.alive]]
+        self.slots = renumbered[self.slots]
+        self.tie_slots = renumbered[self.tie_slots]
+        self.order = self.order[self.alive]
+        self.position = self.position[self.alive]
+        self.alive = np.ones(len(self.order), dtype=bool)
+
+    def result(self, columns: List[str]) -> pd.DataFrame:
+        """The latest rows in file order, with sorted categorical id columns."""
+        self._break_ties()
+        self._compact()
+        latest = self.frames[0].sort_values('row').reset_index(drop=True)
+        for column, categories in self.categories.items():
+            # Sorted categories make categorical columns sort like the plain strings
+            values = pd.Categorical.from_codes(latest[column].to_numpy(), categories)
+            latest[column] = values.set_categories(sorted(categories))
+        return latest[columns]
+
+def load_latest_scores(scores_file: str = 'public/data/benchmarks.csv',
+                       model_ids: Optional[Iterable[str]] = None,
+                       extra_columns: Iterable[str] = (),
+                       chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                       score_dtype: str = 'float64',
+                       on_chunk: Optional[Callable[[pd.DataFrame], None]] = None,
+                       rank_models: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Stream scores_file and return the latest score per model-benchmark pair.
+
+    If model_ids is given, rows of other models are dropped as they are read.
+    Same-date ties of rank_models' pairs are broken as deduplicate_scores
+    does over those models only (pass the rated models), the others as it
+    does over every model (see the module docstring).
+    on_chunk, if given, is called with every chunk as read from the file,
+    before any filtering or conversion; its index is the row position in the
+    file.
+    """
+    if score_dtype not in SCORE_DTYPES:
+        raise ValueError(f"Unknown score dtype: {score_dtype}")
+
+    header = pd.read_csv(scores_file, nrows=0).columns
+    columns = RATING_COLUMNS + [column for column in extra_columns if column in header]
+    categorical = [column for column in columns if column in ID_COLUMNS]
+    keep_models = None if model_ids is None else pd.Index(list(model_ids))
+
+    latest = _LatestRows(categorical, None if rank_models is None else pd.Index(list(rank_models)))
+    reader = pd.read_csv(scores_file, usecols=columns, chunksize=chunk_rows,
+                         dtype={column: 'category' for column in categorical})
+    for chunk in reader:
+        if on_chunk is not None:
+            on_chunk(chunk)
+        if keep_models is not None:
+            chunk = chunk[chunk['model_id'].isin(keep_models)]
+        dates = pd.to_datetime(chunk['date'])
+        latest.add(chunk.assign(
+            score=coerce_scores(chunk['score']).astype(score_dtype, copy=False),
+            date=dates,
+            row=chunk.index.to_numpy(),
+            order=_date_order(dates),
+        ))
+
+    if not latest.frames:
+        return pd.DataFrame({column: pd.Series(dtype=np.float64 if column == 'score' else object)
+                             for column in columns})
+    result = latest.result(columns)
+    if score_dtype == 'float32':
+        result['score'] = result['score'].to_numpy().astype(str).astype('float64')
+    return result
@@ -0,0 +1,397 @@
+"""
+Schema and referential-integrity checks on the score table before rating.
+
+The rating steps are deliberately forgiving: unparseable scores are left
+unrated, scores of benchmarks missing from benchmarks-meta.json drop out of
+the category averages and scores of models missing from data.json are
+ignored. validate_scores reports all of these instead of letting them pass
+silently:
+
+    check                  severity  rows flagged
+    missing_column         error     all, if model_id, benchmark_id, score or date is absent
+    missing_company_id     warning   all, if the company_id column is absent
+    unknown_benchmark_id   error     benchmark_id not in benchmarks-meta.json
+    unparseable_score      error     score that float() rejects, or missing
+    unparseable_date       error     date that is not a YYYY-MM-DD date
+    out_of_range           error     score outside its benchmark's score_min / score_max
+    unknown_model_id       warning   model_id not in data.json
+    unknown_company_id     warning   company_id not in data.json
+    company_mismatch       warning   company_id differs from the model's company, or is missing
+    duplicate_same_date    warning   several scores for one model, benchmark and date
+                                     (the latest-score rule cannot choose between them)
+
+Every check runs as whole-column NumPy operations on factorized id columns
+(membership and dates are tested once per distinct value), so a million rows
+take about half a second, most of it hashing the string columns once each.
+The report is a JSON-friendly dict:
+
+    {"rows": 1734, "fail_on": "error", "failed": false,
+     "summary": {"error": 0, "warning": 142},
+     "issues": {"unknown_model_id": {"severity": "warning", "count": 10,
+                                     "examples": [{"row": 12, "model_id": "human", ...}, ...]}, ...}}
+
+where "row" is the 0-based position in the score table. Example scores are
+shown as the finite float float() reads from them, or else as written, so
+they do not depend on how the column was typed. The checks that
+read an absent column are skipped rather than flagging every row again; the
+missing_* examples name the column instead of a row's values. A table streamed
+in chunks (--stream) is validated one chunk at a time, with first_row set to
+the chunk's position, and the reports merged with combine_reports; same-date
+duplicates split across two chunks are then not reported. pandas and NumPy
+are imported on first use, so ValidationError can be caught without them.
+
+validate_score_rows runs the same checks with the standard library only, on
+the rows of benchmarks.csv as csv.DictReader gives them (--engine lite). It
+reads cells the way pd.read_csv does (its default missing-value strings), so
+the two give the same report for the same file.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from calculate_model_ratings import coerce_scores
+
+SEVERITIES = ['warning', 'error']
+FAIL_ON_CHOICES = SEVERITIES + ['never']
+DEFAULT_FAIL_ON = 'error'
+MAX_EXAMPLES = 5
+
+CHECK_SEVERITIES = {
+    'missing_column': 'error',
+    'missing_company_id': 'warning',
+    'unknown_benchmark_id': 'error',
+    'unparseable_score': 'error',
+    'unparseable_date': 'error',
+    'out_of_range': 'error',
+    'unknown_model_id': 'warning',
+    'unknown_company_id': 'warning',
+    'company_mismatch': 'warning',
+    'duplicate_same_date': 'warning',
+}
+
+# Scores are percentages unless benchmarks-meta gives the benchmark a
+# score_min / score_max (Elo ratings, dollars earned have no upper bound)
+DEFAULT_SCORE_RANGE = (0.0, 100.0)
+REQUIRED_COLUMNS = ['model_id', 'benchmark_id', 'score', 'date']
+
+# Cells pd.read_csv reads as missing (its default na_values)
+CSV_NA_VALUES = {'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                 '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'}
+
+# Checks that read each column, skipped when it is absent
+COLUMN_CHECKS = {
+    'model_id': ['unknown_model_id', 'company_mismatch', 'duplicate_same_date'],
+    'company_id': ['unknown_company_id', 'company_mismatch'],
+    'benchmark_id': ['unknown_benchmark_id', 'out_of_range', 'duplicate_same_date'],
+    'score': ['unparseable_score', 'out_of_range'],
+    'date': ['unparseable_date', 'duplicate_same_date'],
+}
+
+class ValidationError(ValueError):
+    """Raised when the score table has issues at or above the fail_on severity."""
+
+    def __init__(self, report: Dict):
+        failing = {check: issue['count'] for check, issue in report['issues'].items()
+                   if SEVERITIES.index(issue['severity']) >= SEVERITIES.index(report['fail_on'])}
+        super().__init__("Score validation failed: "
+                         + ', '.join(f"{count} {check}" for check, count in failing.items()))
+        self.report = report
+
+def benchmark_score_ranges(benchmarks_meta: List[Dict]) -> Dict[str, Tuple]:
+    """(low, high) score bounds per benchmark from its score_min / score_max in benchmarks-meta.
+
+    A benchmark with neither field gets DEFAULT_SCORE_RANGE; otherwise a
+    missing or null side is unbounded (None).
+    """
+    def bound(value):
+        return None if value is None or (isinstance(value, float) and math.isnan(value)) else float(value)
+
+    return {benchmark['benchmark_id']: (bound(benchmark.get('score_min')), bound(benchmark.get('score_max')))
+            for benchmark in benchmarks_meta
+            if 'score_min' in benchmark or 'score_max' in benchmark}
+
+def _unknown(column: pd.Series, known) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+    """Mask of rows whose value is missing or not in known, plus the column's factor codes and uniques."""
+    import numpy as np
+    import pandas as pd
+
+    codes, uniques = pd.factorize(column)
+    uniques = pd.Index(uniques)
+    unknown = np.append(~uniques.isin(list(known)), True)  # code -1 marks missing values
+    return unknown[codes], codes, uniques
+
+def _example_value(value):
+    """Keep strings and numbers as they are, show anything else as text."""
+    import pandas as pd
+
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (str, int, float)):
+        return value
+    return value.item() if hasattr(value, 'item') else str(value)
+
+def _example_score(value):
+    """A score as the finite float float() reads from it, otherwise as written (None if missing)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    try:
+        score = float(value)
+    except (ValueError, TypeError):
+        return value if isinstance(value, str) else _example_value(value)
+    return score if math.isfinite(score) else str(value)
+
+def _parse_dates(dates: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Mask of unparseable dates plus factor codes of the parsed dates (-1 where unparseable)."""
+    import numpy as np
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        codes, _ = pd.factorize(dates)
+        return codes < 0, codes
+
+    # Parse each distinct value once
+    codes, uniques = pd.factorize(dates)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format='%Y-%m-%d', errors='coerce')
+    _, date_codes = np.unique(parsed.to_numpy(dtype='datetime64[ns]'), return_inverse=True)
+    date_codes = np.append(np.where(parsed.isna(), -1, date_codes.ravel()), -1)[codes]
+    return date_codes < 0, date_codes
+
+def validate_scores(benchmarks_df: pd.DataFrame, companies_data: Dict, benchmarks_meta: List[Dict],
+                    fail_on: str = DEFAULT_FAIL_ON,
+                    score_ranges: Optional[Dict[str, Tuple]] = None, first_row: int = 0) -> Dict:
+    """Run every check on the score table and return the report (see module docstring).
+
+    The report is marked failed if any issue has at least the fail_on
+    severity ('never' never fails); callers raise ValidationError on it.
+    Example rows are numbered from first_row. score_ranges defaults to
+    benchmark_score_ranges(benchmarks_meta).
+    """
+    import numpy as np
+    import pandas as pd
+
+    if fail_on not in FAIL_ON_CHOICES:
+        raise ValueError(f"Unknown fail_on severity: {fail_on}")
+    score_ranges = benchmark_score_ranges(benchmarks_meta) if score_ranges is None else score_ranges
+
+    # Stand an all-missing column in for each absent one so the checks below run unchanged
+    missing = [column for column in REQUIRED_COLUMNS + ['company_id'] if column not in benchmarks_df.columns]
+    if missing:
+        benchmarks_df = benchmarks_df.assign(**{column: None for column in missing})
+
+    model_company = {model['id']: company['id']
+                     for company in companies_data['companies'] for model in company.get('models', [])}
+    company_ids = {company['id'] for company in companies_data['companies']}
+    benchmark_ids = {benchmark['benchmark_id'] for benchmark in benchmarks_meta}
+
+    unknown_model, model_codes, model_uniques = _unknown(benchmarks_df['model_id'], model_company)
+    unknown_company, company_codes, company_uniques = _unknown(benchmarks_df['company_id'], company_ids)
+    unknown_benchmark, benchmark_codes, benchmark_uniques = _unknown(benchmarks_df['benchmark_id'],
+                                                                     benchmark_ids)
+
+    # Company code that owns each distinct model in data.json (-2 if the model is
+    # unknown, -3 if its company is in no row, so a missing company_id differs too)
+    owners = [model_company.get(model_id) for model_id in model_uniques]
+    owner_codes = company_uniques.get_indexer(owners)
+    owner_codes = np.where([owner is None for owner in owners], -2, np.where(owner_codes < 0, -3, owner_codes))
+    owner_codes = np.append(owner_codes, -2)[model_codes]
+    mismatch = (owner_codes != -2) & (owner_codes != company_codes)
+
+    scores = coerce_scores(benchmarks_df['score'])
+    unparseable_score = ~np.isfinite(scores)
+
+    # Per-row bounds from the per-benchmark ranges
+    ranges = [score_ranges.get(benchmark_id, DEFAULT_SCORE_RANGE) for benchmark_id in benchmark_uniques]
+    low = np.array([np.nan if r[0] is None else r[0] for r in ranges] + [np.nan])[benchmark_codes]
+    high = np.array([np.nan if r[1] is None else r[1] for r in ranges] + [np.nan])[benchmark_codes]
+    with np.errstate(invalid='ignore'):
+        out_of_range = ~unparseable_score & ((scores < low) | (scores > high))
+
+    unparseable_date, date_codes = _parse_dates(benchmarks_df['date'])
+
+    # Same model, benchmark and date: combine the factor codes into one int64 key
+    keyed = (model_codes >= 0) & (benchmark_codes >= 0) & (date_codes >= 0)
+    key = ((model_codes.astype('int64') * (benchmark_codes.max() + 1) + benchmark_codes)
+           * (date_codes.max() + 1) + date_codes)
+    duplicate = np.zeros(len(benchmarks_df), dtype=bool)
+    duplicate[keyed] = pd.Series(key[keyed]).duplicated(keep=False).to_numpy()
+
+    masks = {
+        'unknown_benchmark_id': unknown_benchmark,
+        'unparseable_score': unparseable_score,
+        'unparseable_date': unparseable_date,
+        'out_of_range': out_of_range,
+        'unknown_model_id': unknown_model,
+        'unknown_company_id': unknown_company,
+        'company_mismatch': mismatch,
+        'duplicate_same_date': duplicate,
+    }
+    for column in missing:
+        for check in COLUMN_CHECKS[column]:
+            masks[check] = np.zeros(len(benchmarks_df), dtype=bool)
+
+    issues = {}
+    for check, columns in [('missing_column', [column for column in missing if column in REQUIRED_COLUMNS]),
+                           ('missing_company_id', [column for column in missing if column == 'company_id'])]:
+        if columns and len(benchmarks_df):
+            issues[check] = {
+                'severity': CHECK_SEVERITIES[check],
+                'count': len(benchmarks_df),
+                'examples': [{'row': first_row, 'column': column} for column in columns],
+            }
+
+    example_columns = [column for column in ['model_id', 'company_id', 'benchmark_id', 'score', 'date']
+                       if column not in missing]
+    for check, mask in masks.items():
+        count = int(mask.sum())
+        if not count:
+            continue
+        rows = np.flatnonzero(mask)[:MAX_EXAMPLES]
+        examples = benchmarks_df.iloc[rows][example_columns].to_dict(orient='records')
+        issues[check] = {
+            'severity': CHECK_SEVERITIES[check],
+            'count': count,
+            'examples': [{'row': first_row + int(row),
+                          **{column: (_example_score if column == 'score' else _example_value)(value)
+                             for column, value in record.items()}}
+                         for row, record in zip(rows, examples)],
+        }
+
+    return _report(len(benchmarks_df), issues, fail_on)
+
+def validate_score_rows(rows: List[Dict[str, str]], companies_data: Dict, benchmarks_meta: List[Dict],
+                        fail_on: str = DEFAULT_FAIL_ON,
+                        score_ranges: Optional[Dict[str, Tuple]] = None, first_row: int = 0) -> Dict:
+    """validate_scores on csv.DictReader rows, with the standard library only.
+
+    Gives the report validate_scores gives for pd.read_csv of the same file.
+    """
+    if fail_on not in FAIL_ON_CHOICES:
+        raise ValueError(f"Unknown fail_on severity: {fail_on}")
+    score_ranges = benchmark_score_ranges(benchmarks_meta) if score_ranges is None else score_ranges
+
+    present = set(rows[0]) if rows else set()
+    missing = [column for column in REQUIRED_COLUMNS + ['company_id'] if column not in present]
+    cells = {column: [None if row.get(column) is None or row[column] in CSV_NA_VALUES else row[column]
+                      for row in rows]
+             for column in ['model_id', 'company_id', 'benchmark_id', 'score', 'date']}
+
+    model_company = {model['id']: company['id']
+                     for company in companies_data['companies'] for model in company.get('models', [])}
+    company_ids = {company['id'] for company in companies_data['companies']}
+    benchmark_ids = {benchmark['benchmark_id'] for benchmark in benchmarks_meta}
+
+    # Parse each distinct date once
+    dates: Dict[str, Optional[datetime]] = {}
+    for text in set(cells['date']) - {None}:
+        try:
+            dates[text] = datetime.strptime(text, '%Y-%m-%d')
+        except ValueError:
+            dates[text] = None
+
+    flagged: Dict[str, List[int]] = {check: [] for check in CHECK_SEVERITIES}
+    same_date: Dict[Tuple, List[int]] = {}
+    columns = zip(cells['model_id'], cells['company_id'], cells['benchmark_id'], cells['score'], cells['date'])
+    for row, (model_id, company_id, benchmark_id, score, date) in enumerate(columns):
+        if benchmark_id not in benchmark_ids:
+            flagged['unknown_benchmark_id'].append(row)
+        try:
+            score = float(score)
+        except (ValueError, TypeError):
+            score = math.nan
+        if not math.isfinite(score):
+            flagged['unparseable_score'].append(row)
+        elif benchmark_id is not None:
+            low, high = score_ranges.get(benchmark_id, DEFAULT_SCORE_RANGE)
+            if (low is not None and score < low) or (high is not None and score > high):
+                flagged['out_of_range'].append(row)
+        parsed = None if date is None else dates[date]
+        if parsed is None:
+            flagged['unparseable_date'].append(row)
+        if model_id not in model_company:
+            flagged['unknown_model_id'].append(row)
+        if company_id not in company_ids:
+            flagged['unknown_company_id'].append(row)
+        owner = model_company.get(model_id)
+        if owner is not None and owner != company_id:
+            flagged['company_mismatch'].append(row)
+        if model_id is not None and benchmark_id is not None and parsed is not None:
+            same_date.setdefault((model_id, benchmark_id, parsed), []).append(row)
+    flagged['duplicate_same_date'] = sorted(row for group in same_date.values() if len(group) > 1 for row in group)
+    for column in missing:
+        for check in COLUMN_CHECKS[column]:
+            flagged[check] = []
+
+    issues = {}
+    for check, columns in [('missing_column', [column for column in missing if column in REQUIRED_COLUMNS]),
+                           ('missing_company_id', [column for column in missing if column == 'company_id'])]:
+        if columns and rows:
+            issues[check] = {
+                'severity': CHECK_SEVERITIES[check],
+                'count': len(rows),
+                'examples': [{'row': first_row, 'column': column} for column in columns],
+            }
+
+    example_columns = [column for column in ['model_id', 'company_id', 'benchmark_id', 'score', 'date']
+                       if column not in missing]
+    for check, flagged_rows in flagged.items():
+        if not flagged_rows:
+            continue
+        issues[check] = {
+            'severity': CHECK_SEVERITIES[check],
+            'count': len(flagged_rows),
+            'examples': [{'row': first_row + row,
+                          **{column: _example_score(cells[column][row]) if column == 'score' else cells[column][row]
+                             for column in example_columns}}
+                         for row in flagged_rows[:MAX_EXAMPLES]],
+        }
+
+    return _report(len(rows), issues, fail_on)
+
+def _report(rows: int, issues: Dict, fail_on: str) -> Dict:
+    """Assemble a report from its issues, with the summary and the failed flag."""
+    summary = {severity: sum(issue['count'] for issue in issues.values() if issue['severity'] == severity)
+               for severity in SEVERITIES}
+    failed = fail_on != 'never' and any(SEVERITIES.index(issue['severity']) >= SEVERITIES.index(fail_on)
+                                        for issue in issues.values())
+    return {'rows': rows, 'fail_on': fail_on, 'failed': failed, 'summary': summary, 'issues': issues}
+
+def combine_reports(reports: List[Dict], fail_on: str = DEFAULT_FAIL_ON) -> Dict:
+    """Merge the reports of consecutive chunks of one score table into one report."""
+    if fail_on not in FAIL_ON_CHOICES:
+        raise ValueError(f"Unknown fail_on severity: {fail_on}")
+    issues: Dict[str, Dict] = {}
+    for report in reports:
+        for check, issue in report['issues'].items():
+            merged = issues.setdefault(check, {'severity': issue['severity'], 'count': 0, 'examples': []})
+            merged['count'] += issue['count']
+            merged['examples'] += issue['examples'][:MAX_EXAMPLES - len(merged['examples'])]
+    # Checks in their declared order, as validate_scores reports them
+    issues = {check: issues[check] for check in CHECK_SEVERITIES if check in issues}
+    return _report(sum(report['rows'] for report in reports), issues, fail_on)
+
+def print_report(report: Dict):
+    """Print a one-line summary per check."""
+    if not report['issues']:
+        print(f"Validated {report['rows']} score rows: no issues")
+        return
+    print(f"Validated {report['rows']} score rows: "
+          + ', '.join(f"{count} {severity}s" for severity, count in report['summary'].items()))
+    for check, issue in report['issues'].items():
+        example = issue['examples'][0]
+        if 'column' in example:
+            # Chunked reports repeat the column once per chunk
+            columns = dict.fromkeys(example['column'] for example in issue['examples'])
+            detail = 'no ' + ', '.join(columns) + ' column'
+        else:
+            detail = f"e.g. row {example['row']}: {example.get('model_id')} / {example.get('benchmark_id')}"
+        print(f"  {issue['severity']:<8} {check:<22} {issue['count']:>7} rows ({detail})")
+
+def write_report(report: Dict, path: str):
+    """Write the report as JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Validation report written to {path}")
@@ -0,0 +1,15 @@
+"""
+Pytest setup for the data pipeline checks.
+
+The pipeline modules live in scripts/ and import each other by module name
+(they are run as `python scripts/<name>.py`), so scripts/ goes on sys.path
+here. Run from the project root:
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'scripts'))
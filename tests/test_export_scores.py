@@ -0,0 +1,101 @@
+"""GXSC files decoded back from the layout in export_scores.py give the score table they were written from."""
+
+import gzip
+import json
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+from calculate_model_ratings import coerce_scores
+from conftest import PROJECT_ROOT
+from export_scores import ALIGNMENT, FORMAT_VERSION, MAGIC, encode_columnar_scores, write_columnar_scores
+
+def decode_columnar_scores(data):
+    """Read a GXSC file as the front-end does: header, then typed-array views of each column."""
+    assert data[:4] == MAGIC
+    version, header_len = struct.unpack_from('<II', data, 4)
+    assert version == FORMAT_VERSION
+    header = json.loads(data[12:12 + header_len])
+    rows = header['rows']
+    epoch = np.datetime64(header['epoch'], 'D')
+
+    columns = {}
+    for column in header['columns']:
+        assert column['offset'] % ALIGNMENT == 0
+        values = np.frombuffer(data, dtype=np.dtype(column['type']).newbyteorder('<'), count=rows,
+                               offset=column['offset'])
+        if 'table' in column:
+            table = header['tables'][column['table']]
+            columns[column['name']] = [None if code == column['null'] else table[code] for code in values]
+        elif column['name'] == 'date':
+            columns['date'] = [None if days == column['null'] else str(epoch + int(days)) for days in values]
+        else:
+            columns[column['name']] = values
+    return columns
+
+def expected_columns(df):
+    """The score table as GXSC stores it: strings or None, float32 scores and YYYY-MM-DD dates."""
+    expected = {column: [None if pd.isna(value) else str(value) for value in df[column]]
+                for column in df.columns if column not in ('score', 'date')}
+    expected['score'] = coerce_scores(df['score']).astype('float32')
+    dates = pd.to_datetime(df['date'], errors='coerce')
+    expected['date'] = [None if pd.isna(date) else date.strftime('%Y-%m-%d') for date in dates]
+    return expected
+
+def assert_round_trips(df):
+    decoded = decode_columnar_scores(encode_columnar_scores(df))
+    expected = expected_columns(df)
+    assert decoded.keys() == expected.keys()
+    for column, values in expected.items():
+        if column == 'score':
+            np.testing.assert_array_equal(decoded['score'], values)
+        else:
+            assert decoded[column] == values, column
+
+def test_checked_in_scores():
+    assert_round_trips(pd.read_csv(os.path.join(PROJECT_ROOT, 'public', 'data', 'benchmarks.csv')))
+
+def test_checked_in_file_is_current():
+    df = pd.read_csv(os.path.join(PROJECT_ROOT, 'public', 'data', 'benchmarks.csv'))
+    with open(os.path.join(PROJECT_ROOT, 'public', 'data', 'benchmarks.bin'), 'rb') as f:
+        assert f.read() == encode_columnar_scores(df)
+
+def test_missing_and_unusual_values():
+    df = pd.DataFrame({
+        'model_id': ['gpt-5', None, 'claude-4-opus', 'gpt-5'],
+        'company_id': ['openai', 'openai', None, 'openai'],
+        'benchmark_id': ['aime-2025', 'mmlu', 'mmlu', 'aime-2025'],
+        'score': ['94.6', 'n/a', None, 1e6],
+        'date': ['2025-08-07', None, 'not a date', '1969-12-31'],
+        'notes': [None, 'Élo – “quoted”', '日本語', ''],
+        'source_name': ['A', 'B', 'C', 'D'],
+        'source': [None, None, None, None],
+    })
+    assert_round_trips(df)
+
+def test_wide_string_tables():
+    # More distinct values than uint16 codes can hold switch the column to uint32
+    n = 70_000
+    df = pd.DataFrame({
+        'model_id': [f'model-{i}' for i in range(n)],
+        'benchmark_id': 'mmlu',
+        'score': np.arange(n) / 7,
+        'date': '2025-01-01',
+    })
+    encoded = encode_columnar_scores(df)
+    header_len = struct.unpack_from('<I', encoded, 8)[0]
+    header = json.loads(encoded[12:12 + header_len])
+    assert {column['name']: column['type'] for column in header['columns']}['model_id'] == 'uint32'
+    assert_round_trips(df)
+
+def test_compressed_copies(tmp_path):
+    df = pd.read_csv(os.path.join(PROJECT_ROOT, 'public', 'data', 'benchmarks.csv'))
+    bin_file = str(tmp_path / 'benchmarks.bin')
+    sizes = write_columnar_scores(df, bin_file)
+    with open(bin_file, 'rb') as f:
+        encoded = f.read()
+    with open(bin_file + '.gz', 'rb') as f:
+        assert gzip.decompress(f.read()) == encoded
+    assert sizes[bin_file] == len(encoded)
@@ -0,0 +1,95 @@
+"""rate_incrementally against a full run, across runs that change the scores and models."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_pipeline import generate_dataset
+from calculate_model_ratings import (
+    calculate_benchmark_category_ratings,
+    create_benchmark_category_mapping,
+    deduplicate_scores,
+    extract_target_models,
+    normalize_and_rate_benchmarks,
+)
+from incremental_ratings import rate_incrementally
+
+def full_run(deduplicated_df, models, benchmark_categories):
+    rated_df, _ = normalize_and_rate_benchmarks(deduplicated_df)
+    return rated_df, calculate_benchmark_category_ratings(rated_df, models, benchmark_categories)
+
+def by_pair(rated_df):
+    return (rated_df.set_index(['model_id', 'benchmark_id'])[['normalized_score', 'rating_1_to_5']]
+            .sort_index())
+
+def assert_matches_full_run(deduplicated_df, models, benchmark_categories, state_file):
+    rated_df, ratings = rate_incrementally(deduplicated_df, models, benchmark_categories, state_file=state_file)
+    expected_rated, expected = full_run(deduplicated_df, models, benchmark_categories)
+    assert list(ratings) == list(expected)
+    assert ratings == expected
+    pd.testing.assert_frame_equal(by_pair(rated_df), by_pair(expected_rated), check_dtype=False)
+
+@pytest.fixture
+def dataset():
+    companies_data, benchmarks_df, benchmarks_meta = generate_dataset(300, 40, seed=1)
+    models = extract_target_models(companies_data)
+    benchmark_categories = create_benchmark_category_mapping(benchmarks_meta)
+    return deduplicate_scores(benchmarks_df, models).reset_index(drop=True), models, benchmark_categories
+
+def test_changed_scores(dataset, tmp_path, capsys):
+    deduplicated, models, benchmark_categories = dataset
+    state_file = str(tmp_path / 'state.pkl')
+    assert_matches_full_run(deduplicated, models, benchmark_categories, state_file)
+
+    rng = np.random.default_rng(0)
+    for _ in range(3):
+        deduplicated = deduplicated.copy()
+        changed = rng.random(len(deduplicated)) < 0.02
+        deduplicated.loc[changed, 'score'] = np.round(rng.uniform(0, 100, int(changed.sum())), 1)
+        assert_matches_full_run(deduplicated, models, benchmark_categories, state_file)
+    # The later runs patched the previous state rather than starting over
+    assert capsys.readouterr().out.count('no usable previous state') == 1
+
+def test_extremes_move(dataset, tmp_path):
+    # A new benchmark maximum renormalizes every other score of that benchmark
+    deduplicated, models, benchmark_categories = dataset
+    state_file = str(tmp_path / 'state.pkl')
+    assert_matches_full_run(deduplicated, models, benchmark_categories, state_file)
+
+    deduplicated = deduplicated.astype({'score': object})
+    first = deduplicated.index[deduplicated['benchmark_id'] == deduplicated['benchmark_id'].iloc[0]]
+    deduplicated.loc[first[0], 'score'] = 1000.0
+    deduplicated.loc[first[1], 'score'] = 'n/a'
+    assert_matches_full_run(deduplicated, models, benchmark_categories, state_file)
+
+def test_added_and_removed_scores(dataset, tmp_path):
+    deduplicated, models, benchmark_categories = dataset
+    state_file = str(tmp_path / 'state.pkl')
+    held_back = deduplicated.sample(frac=0.05, random_state=0).index
+    assert_matches_full_run(deduplicated.drop(held_back), models, benchmark_categories, state_file)
+    assert_matches_full_run(deduplicated, models, benchmark_categories, state_file)
+    assert_matches_full_run(deduplicated.drop(deduplicated.index[::17]), models, benchmark_categories, state_file)
+
+def test_models_join_and_leave(dataset, tmp_path):
+    deduplicated, models, benchmark_categories = dataset
+    state_file = str(tmp_path / 'state.pkl')
+    model_ids = list(models)
+    fewer = {model_id: models[model_id] for model_id in model_ids if model_id not in model_ids[::5]}
+    assert_matches_full_run(deduplicated[deduplicated['model_id'].isin(fewer)], fewer, benchmark_categories,
+                            state_file)
+    assert_matches_full_run(deduplicated, models, benchmark_categories, state_file)
+    assert_matches_full_run(deduplicated[deduplicated['model_id'].isin(fewer)], fewer, benchmark_categories,
+                            state_file)
+
+def test_new_category_mapping(dataset, tmp_path):
+    deduplicated, models, benchmark_categories = dataset
+    state_file = str(tmp_path / 'state.pkl')
+    assert_matches_full_run(deduplicated, models, benchmark_categories, state_file)
+    remapped = {benchmark_id: 'coding' for benchmark_id in benchmark_categories}
+    assert_matches_full_run(deduplicated, models, remapped, state_file)
+
+def test_unreadable_state(dataset, tmp_path):
+    deduplicated, models, benchmark_categories = dataset
+    state_file = tmp_path / 'state.pkl'
+    state_file.write_bytes(b'\x80\x04\x8c\x0bmissing_mod\x94\x8c\x03Foo\x94\x93\x94.')
+    assert_matches_full_run(deduplicated, models, benchmark_categories, str(state_file))
@@ -0,0 +1,167 @@
+"""The standard-library engine against the pandas one: row choice, ratings, outputs and validation."""
+
+import csv
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ratings_lite
+from benchmark_pipeline import generate_dataset, write_dataset
+from calculate_model_ratings import (
+    calculate_benchmark_category_ratings,
+    create_benchmark_category_mapping,
+    deduplicate_scores,
+    extract_target_models,
+    normalize_and_rate_benchmarks,
+    run_ratings_pipeline,
+)
+from conftest import PROJECT_ROOT
+from ratings_lite import category_ratings, introsort_order, latest_scores, load_scores, rate_scores, run_lite_pipeline
+from validate_scores import validate_score_rows, validate_scores
+
+def numpy_order(values):
+    """The order sort_values('date') gives: argsort of a datetime64 column."""
+    return np.argsort(np.array(values, dtype='datetime64[D]'), kind='quicksort').tolist()
+
+@pytest.mark.parametrize('n', [0, 1, 2, 15, 16, 17, 100, 1000, 5000])
+def test_introsort_order_matches_numpy(n):
+    rng = np.random.default_rng(n)
+    for distinct in [1, 3, max(1, n // 10), max(1, n)]:
+        days = rng.integers(0, distinct, n).tolist()
+        assert introsort_order(days) == numpy_order(days), distinct
+
+class _Adversary:
+    """McIlroy's quicksort adversary: values fixed lazily so that every pivot is a bad one."""
+
+    def __init__(self, n):
+        self.values = [n] * n  # n is 'gas', not yet fixed
+        self.solid = 0
+        self.candidate = None
+
+    def compare(self, x, y):
+        gas = len(self.values)
+        if self.values[x] == gas and self.values[y] == gas:
+            fixed = x if x == self.candidate else y
+            self.values[fixed] = self.solid
+            self.solid += 1
+        if self.values[x] == gas:
+            self.candidate = x
+        elif self.values[y] == gas:
+            self.candidate = y
+        return self.values[x] - self.values[y]
+
+    def items(self):
+        adversary = self
+
+        class Item:
+            def __init__(self, index):
+                self.index = index
+
+            def __lt__(self, other):
+                return adversary.compare(self.index, other.index) < 0
+
+        return [Item(i) for i in range(len(self.values))]
+
+def test_introsort_order_heapsort_fallback(monkeypatch):
+    # An input that defeats median-of-three partitioning reaches the depth limit
+    adversary = _Adversary(2000)
+    introsort_order(adversary.items())
+    calls = []
+    heapsort = ratings_lite._heapsort
+    monkeypatch.setattr(ratings_lite, '_heapsort', lambda *args: calls.append(args) or heapsort(*args))
+    assert introsort_order(adversary.values) == numpy_order(adversary.values)
+    assert calls
+
+@pytest.fixture
+def dataset(tmp_path):
+    # Many extra rows, half of them on the pair's date, so same-date ties are common
+    companies_data, benchmarks_df, benchmarks_meta = generate_dataset(400, 40, duplicate_ratio=0.3, seed=2)
+    paths = write_dataset(str(tmp_path / 'inputs'), companies_data, benchmarks_df, benchmarks_meta)
+    return companies_data, pd.read_csv(paths['scores_file']), benchmarks_meta, paths
+
+def test_same_rows_and_ratings(dataset):
+    companies_data, benchmarks_df, benchmarks_meta, paths = dataset
+    models = extract_target_models(companies_data)
+    benchmark_categories = create_benchmark_category_mapping(benchmarks_meta)
+
+    deduplicated = deduplicate_scores(benchmarks_df, models)
+    latest = latest_scores(load_scores(paths['scores_file']), models)
+    expected_rows = {(row.model_id, row.benchmark_id): (row.score, row.date.strftime('%Y-%m-%d'))
+                     for row in deduplicated.itertuples()}
+    assert {key: (float(row['score']), row['date']) for key, row in latest.items()} == expected_rows
+
+    rated_df, _ = normalize_and_rate_benchmarks(deduplicated)
+    expected = calculate_benchmark_category_ratings(rated_df, models, benchmark_categories)
+    assert category_ratings(rate_scores(latest), models, benchmark_categories) == expected
+
+def _outputs(root):
+    return {name: open(os.path.join(root, *name.split('/')), 'rb').read()
+            for name in ['data/data.json', 'public/data/model_ratings.csv']}
+
+def test_same_output_files(dataset, tmp_path):
+    companies_data, benchmarks_df, benchmarks_meta, paths = dataset
+    lite_root = str(tmp_path / 'lite')
+    lite_paths = write_dataset(lite_root, companies_data, benchmarks_df, benchmarks_meta)
+    pandas_root = str(tmp_path / 'pandas')
+    pandas_paths = write_dataset(pandas_root, companies_data, benchmarks_df, benchmarks_meta)
+
+    run_lite_pipeline(data_file=lite_paths['data_file'], scores_file=lite_paths['scores_file'],
+                      meta_file=lite_paths['meta_file'],
+                      ratings_csv=os.path.join(lite_root, 'public', 'data', 'model_ratings.csv'),
+                      fail_on='never')
+    with open(pandas_paths['data_file']) as f:
+        pandas_companies = json.load(f)
+    run_ratings_pipeline(pandas_companies, pd.read_csv(pandas_paths['scores_file']), benchmarks_meta,
+                         data_file=pandas_paths['data_file'],
+                         ratings_csv=os.path.join(pandas_root, 'public', 'data', 'model_ratings.csv'),
+                         fail_on='never')
+    assert _outputs(lite_root) == _outputs(pandas_root)
+
+def _rows(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+def _assert_same_report(path, companies_data, benchmarks_meta, **kwargs):
+    expected = validate_scores(pd.read_csv(path), companies_data, benchmarks_meta, **kwargs)
+    assert validate_score_rows(_rows(path), companies_data, benchmarks_meta, **kwargs) == expected
+
+def test_validation_checked_in_data():
+    with open(os.path.join(PROJECT_ROOT, 'data', 'data.json')) as f:
+        companies_data = json.load(f)
+    with open(os.path.join(PROJECT_ROOT, 'public', 'data', 'benchmarks-meta.json')) as f:
+        benchmarks_meta = json.load(f)
+    _assert_same_report(os.path.join(PROJECT_ROOT, 'public', 'data', 'benchmarks.csv'), companies_data,
+                        benchmarks_meta, fail_on='warning')
+
+def test_validation_of_bad_rows(dataset, tmp_path):
+    companies_data, benchmarks_df, benchmarks_meta, _ = dataset
+    benchmarks_meta = [dict(benchmarks_meta[0], score_min=10, score_max=None)] + benchmarks_meta[1:]
+    bad = benchmarks_df.astype(object)
+    bad.loc[3, 'score'] = 'abc'
+    bad.loc[4, 'score'] = 'NA'
+    bad.loc[5, 'score'] = 'inf'
+    bad.loc[6, 'score'] = -5
+    bad.loc[7, 'date'] = '2025-13-01'
+    bad.loc[8, 'date'] = None
+    bad.loc[9, 'model_id'] = 'no-such-model'
+    bad.loc[10, 'company_id'] = None
+    bad.loc[11, 'company_id'] = 'company-999'
+    bad.loc[12, 'benchmark_id'] = 'no-such-benchmark'
+    bad.loc[13, 'benchmark_id'] = None
+    bad.loc[14, 'benchmark_id'] = benchmarks_meta[0]['benchmark_id']
+    bad.loc[14, 'score'] = 5
+    path = str(tmp_path / 'bad.csv')
+    bad.to_csv(path, index=False)
+    _assert_same_report(path, companies_data, benchmarks_meta, fail_on='error')
+
+    bad.drop(columns=['company_id', 'date']).to_csv(path, index=False)
+    _assert_same_report(path, companies_data, benchmarks_meta, fail_on='never', first_row=100)
+
+def test_validation_of_integer_scores(dataset, tmp_path):
+    companies_data, benchmarks_df, benchmarks_meta, _ = dataset
+    path = str(tmp_path / 'integers.csv')
+    benchmarks_df.assign(score=benchmarks_df['score'].round().astype(int) + 101).to_csv(path, index=False)
+    _assert_same_report(path, companies_data, benchmarks_meta, fail_on='error')
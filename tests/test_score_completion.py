@@ -0,0 +1,102 @@
+"""complete_scores against a per-model brute-force computation of the completed cells."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import score_completion
+from calculate_model_ratings import (
+    create_benchmark_category_mapping,
+    deduplicate_scores,
+    extract_target_models,
+    load_data,
+    normalize_and_rate_benchmarks,
+    round_half_up,
+)
+from conftest import PROJECT_ROOT
+from score_completion import MIN_BENCHMARK_SCORES, MIN_MODEL_SCORES, complete_scores, fit_low_rank, predict
+
+def brute_force_completion(rated_df, models, benchmark_categories, rank):
+    """Completed category cells and predicted benchmarks, one model and benchmark at a time."""
+    valid = rated_df[(rated_df['rating_1_to_5'] > 0) & rated_df['model_id'].isin(models.keys())]
+    model_ids = list(models)
+    rows = pd.Index(model_ids).get_indexer(valid['model_id'])
+    cols, benchmark_ids = pd.factorize(valid['benchmark_id'], sort=True)
+    fit = fit_low_rank(rows, cols, valid['normalized_score'].to_numpy(dtype='float64'),
+                       len(model_ids), len(benchmark_ids), rank=rank)
+
+    measured = {(row, col): rating for row, col, rating in zip(rows, cols, valid['rating_1_to_5'])}
+    model_counts = np.bincount(rows, minlength=len(model_ids))
+    benchmark_counts = np.bincount(cols, minlength=len(benchmark_ids))
+
+    completed, predicted_benchmarks = {}, {}
+    for row, model_id in enumerate(model_ids):
+        if model_counts[row] < MIN_MODEL_SCORES:
+            continue
+        sums, counts, predicted_n, predicted = {}, {}, {}, set()
+        for col, benchmark_id in enumerate(benchmark_ids):
+            if (row, col) in measured:
+                rating, is_predicted = measured[row, col], False
+            elif benchmark_counts[col] >= MIN_BENCHMARK_SCORES:
+                normalized = np.clip(predict(fit, np.array([row]), np.array([col])), 0, 1)
+                rating, is_predicted = int(np.clip(round_half_up(1 + 4 * normalized), 1, 5)[0]), True
+                predicted.add(benchmark_id)
+            else:
+                continue
+            category = benchmark_categories.get(benchmark_id)
+            if category is None:
+                continue
+            sums[category] = sums.get(category, 0) + rating
+            counts[category] = counts.get(category, 0) + 1
+            predicted_n[category] = predicted_n.get(category, 0) + is_predicted
+        completed[model_id] = {category: {'rating': sums[category] / counts[category],
+                                          'predicted_n': predicted_n[category]} for category in counts}
+        predicted_benchmarks[model_id] = predicted
+    return completed, predicted_benchmarks
+
+def assert_matches_brute_force(rated_df, models, benchmark_categories, rank=2):
+    completion = complete_scores(rated_df, models, benchmark_categories, rank=rank)
+    completed, predicted = brute_force_completion(rated_df, models, benchmark_categories, rank)
+
+    assert completion['completed'].keys() == completed.keys()
+    for model_id, cells in completed.items():
+        assert completion['completed'][model_id].keys() == cells.keys(), model_id
+        for category, cell in cells.items():
+            got = completion['completed'][model_id][category]
+            assert got['predicted_n'] == cell['predicted_n'], (model_id, category)
+            assert got['rating'] == pytest.approx(cell['rating']), (model_id, category)
+        assert set(completion['scores'][model_id]) == predicted[model_id], model_id
+
+def synthetic_rated(seed=0):
+    """A rated score table where models with too few scores sit between supported ones."""
+    rng = np.random.default_rng(seed)
+    n_models, n_benchmarks = 40, 12
+    records = []
+    for i in range(n_models):
+        # Every third model has fewer than MIN_MODEL_SCORES scores
+        n_scores = 1 if i % 3 == 1 else int(rng.integers(MIN_MODEL_SCORES, n_benchmarks))
+        for j in rng.choice(n_benchmarks, n_scores, replace=False):
+            records.append({'model_id': f'model-{i}', 'benchmark_id': f'bench-{j:02d}',
+                            'score': round(float(rng.uniform(0, 100)), 1), 'date': '2025-01-01'})
+    benchmarks_df = pd.DataFrame(records)
+    rated_df, _ = normalize_and_rate_benchmarks(benchmarks_df)
+    models = {f'model-{i}': {} for i in range(n_models)}
+    benchmark_categories = {f'bench-{j:02d}': ['coding', 'reasoning', 'STEM'][j % 3] for j in range(n_benchmarks)}
+    return rated_df, models, benchmark_categories
+
+@pytest.mark.parametrize('block_elements', [score_completion.BLOCK_ELEMENTS, 12 * 5, 12])
+def test_unsupported_models_between_supported_ones(monkeypatch, block_elements):
+    # Small blocks put unsupported models inside and at the edges of each block
+    monkeypatch.setattr(score_completion, 'BLOCK_ELEMENTS', block_elements)
+    assert_matches_brute_force(*synthetic_rated())
+
+def test_checked_in_data():
+    companies_data, benchmarks_df, benchmarks_meta = load_data(
+        os.path.join(PROJECT_ROOT, 'data', 'data.json'),
+        os.path.join(PROJECT_ROOT, 'public', 'data', 'benchmarks.csv'),
+        os.path.join(PROJECT_ROOT, 'public', 'data', 'benchmarks-meta.json'))
+    models = extract_target_models(companies_data)
+    rated_df, _ = normalize_and_rate_benchmarks(deduplicate_scores(benchmarks_df, models))
+    assert_matches_brute_force(rated_df, models, create_benchmark_category_mapping(benchmarks_meta), rank=4)
@@ -0,0 +1,121 @@
+"""Streamed loading and validation against the in-memory table: same rows, same report."""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_pipeline import generate_dataset, write_dataset
+from calculate_model_ratings import deduplicate_scores, extract_target_models, load_data
+from conftest import PROJECT_ROOT
+from stream_scores import load_latest_scores
+from validate_scores import combine_reports, validate_scores
+
+CHUNK_ROWS = [10**9, 1000, 333, 50, 7]
+
+def rows_by_pair(df):
+    """The rating columns keyed and sorted by pair, with plain string ids."""
+    df = df.assign(model_id=df['model_id'].astype(str), benchmark_id=df['benchmark_id'].astype(str),
+                   date=pd.to_datetime(df['date']), score=df['score'].astype('float64'))
+    return (df.sort_values(['model_id', 'benchmark_id'])[['model_id', 'benchmark_id', 'score', 'date']]
+            .reset_index(drop=True))
+
+@pytest.fixture(scope='module')
+def scores_file(tmp_path_factory):
+    # Many same-date ties, plus rows without a date or a benchmark id
+    companies_data, benchmarks_df, benchmarks_meta = generate_dataset(200, 30, duplicate_ratio=0.3, seed=3)
+    benchmarks_df.loc[benchmarks_df.sample(frac=0.02, random_state=1).index, 'date'] = np.nan
+    benchmarks_df.loc[benchmarks_df.sample(frac=0.01, random_state=2).index, 'benchmark_id'] = np.nan
+    paths = write_dataset(str(tmp_path_factory.mktemp('stream')), companies_data, benchmarks_df, benchmarks_meta)
+    return paths['scores_file'], extract_target_models(companies_data)
+
+@pytest.mark.parametrize('chunk_rows', CHUNK_ROWS)
+def test_rated_models_match_deduplicate_scores(scores_file, chunk_rows):
+    path, models = scores_file
+    expected = rows_by_pair(deduplicate_scores(pd.read_csv(path), models))
+    streamed = load_latest_scores(path, model_ids=models.keys(), chunk_rows=chunk_rows)
+    pd.testing.assert_frame_equal(rows_by_pair(streamed), expected)
+
+@pytest.mark.parametrize('chunk_rows', CHUNK_ROWS)
+def test_all_models_with_rank_models(scores_file, chunk_rows):
+    # As load_data streams: every model, ties of the rated models broken as the ratings break them
+    path, models = scores_file
+    full = pd.read_csv(path)
+    all_models = dict.fromkeys(full['model_id'].dropna().unique())
+    streamed = rows_by_pair(load_latest_scores(path, chunk_rows=chunk_rows, rank_models=models.keys()))
+    rated = streamed['model_id'].isin(models.keys())
+
+    pd.testing.assert_frame_equal(streamed[rated].reset_index(drop=True),
+                                  rows_by_pair(deduplicate_scores(full, models)))
+    others = rows_by_pair(deduplicate_scores(full, all_models))
+    pd.testing.assert_frame_equal(streamed[~rated].reset_index(drop=True),
+                                  others[~others['model_id'].isin(models.keys())].reset_index(drop=True))
+
+def test_float32_scores_read_as_written(scores_file):
+    path, models = scores_file
+    expected = rows_by_pair(deduplicate_scores(pd.read_csv(path), models))
+    streamed = load_latest_scores(path, model_ids=models.keys(), chunk_rows=100, score_dtype='float32')
+    pd.testing.assert_frame_equal(rows_by_pair(streamed), expected)
+
+def within_chunk_duplicates(df, chunk_rows):
+    """Rows sharing model, benchmark and date with another row of their own chunk."""
+    dates = pd.to_datetime(df['date'], format='%Y-%m-%d', errors='coerce')
+    keyed = df['model_id'].notna() & df['benchmark_id'].notna() & dates.notna()
+    key = pd.DataFrame({'model_id': df['model_id'], 'benchmark_id': df['benchmark_id'], 'date': dates,
+                        'chunk': np.arange(len(df)) // chunk_rows})[keyed]
+    return key.index[key.duplicated(keep=False)].tolist()
+
+@pytest.mark.parametrize('chunk_rows', [10**9, 500, 97])
+def test_streamed_validation_matches_in_memory(chunk_rows):
+    data_file = os.path.join(PROJECT_ROOT, 'data', 'data.json')
+    scores_file = os.path.join(PROJECT_ROOT, 'public', 'data', 'benchmarks.csv')
+    meta_file = os.path.join(PROJECT_ROOT, 'public', 'data', 'benchmarks-meta.json')
+    with open(data_file) as f:
+        companies_data = json.load(f)
+    with open(meta_file) as f:
+        benchmarks_meta = json.load(f)
+    full = pd.read_csv(scores_file)
+    expected = validate_scores(full, companies_data, benchmarks_meta, fail_on='warning')
+
+    chunk_reports = []
+    load_data(data_file, scores_file, meta_file, chunk_rows=chunk_rows, chunk_reports=chunk_reports)
+    report = combine_reports(chunk_reports, fail_on='warning')
+
+    assert report['rows'] == expected['rows']
+    assert report['failed'] == expected['failed']
+    duplicates = report['issues'].pop('duplicate_same_date', None)
+    expected_duplicates = expected['issues'].pop('duplicate_same_date', None)
+    assert report['issues'] == expected['issues']
+
+    # Same-date duplicates are found within each chunk (see validate_scores.py)
+    flagged = within_chunk_duplicates(full, chunk_rows)
+    assert (duplicates['count'] if duplicates else 0) == len(flagged)
+    if duplicates:
+        assert [example['row'] for example in duplicates['examples']] == flagged[:len(duplicates['examples'])]
+    if chunk_rows >= len(full):
+        assert duplicates == expected_duplicates
+
+def test_streamed_validation_of_bad_rows(tmp_path):
+    companies_data, benchmarks_df, benchmarks_meta = generate_dataset(100, 20, seed=4)
+    bad = benchmarks_df.astype(object)
+    bad.loc[3, 'score'] = 'abc'
+    bad.loc[5, 'score'] = 250
+    bad.loc[8, 'date'] = None
+    bad.loc[9, 'model_id'] = 'no-such-model'
+    bad.loc[60, 'company_id'] = None
+    bad.loc[61, 'company_id'] = 'company-999'
+    bad.loc[120, 'benchmark_id'] = 'no-such-benchmark'
+    bad.loc[121, 'benchmark_id'] = None
+    paths = write_dataset(str(tmp_path), companies_data, bad, benchmarks_meta)
+    expected = validate_scores(pd.read_csv(paths['scores_file']), companies_data, benchmarks_meta)
+
+    chunk_reports = []
+    load_data(paths['data_file'], paths['scores_file'], paths['meta_file'], chunk_rows=50,
+              chunk_reports=chunk_reports)
+    report = combine_reports(chunk_reports)
+    assert report['failed'] and expected['failed']
+    report['issues'].pop('duplicate_same_date', None)
+    expected['issues'].pop('duplicate_same_date', None)
+    assert report['issues'] == expected['issues']